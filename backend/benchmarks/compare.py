@@ -0,0 +1,69 @@
+# benchmarks/compare.py
+"""
+benchmarks.load が出力した2つのJSONを比較し、ルートごとの変化を表示する
+
+    p95 レイテンシが --threshold（%）以上悪化したルート、または1リクエストあたりのSQL実行数が
+    --query-threshold 以上増えたルートを「悪化」として表示し、1件でもあれば終了コード 1 で終了する（CIでの検出用）
+
+使い方（backend ディレクトリで実行）:
+    python -m benchmarks.compare before.json after.json [--threshold 10]
+"""
+import argparse
+import json
+import sys
+from typing import Optional
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+# 変化率（%）
+def change(before: float, after: float) -> Optional[float]:
+    if not before:
+        return None
+    return (after - before) / before * 100
+
+def format_change(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:+.1f}%"
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ベンチマーク結果を比較する")
+    parser.add_argument("before", help="比較元のJSON")
+    parser.add_argument("after", help="比較先のJSON")
+    parser.add_argument("--threshold", type=float, default=10, help="悪化とみなす p95 の増加率（%）")
+    parser.add_argument("--query-threshold", type=float, default=0.5, help="悪化とみなす1リクエストあたりのSQL実行数の増加")
+    args = parser.parse_args()
+
+    before, after = load(args.before), load(args.after)
+    print(f"{before['meta'].get('commit')} -> {after['meta'].get('commit')}")
+    print(f"{'ルート':<40} {'req/s':>9} {'p95':>9} {'p99':>9} {'SQL':>11}")
+
+    regressions = []
+    for route in sorted(set(before["routes"]) | set(after["routes"])):
+        old, new = before["routes"].get(route), after["routes"].get(route)
+        if old is None or new is None:
+            print(f"{route:<40} {'追加' if old is None else '未計測'}")
+            continue
+
+        p95 = change(old["latency_ms"]["p95"], new["latency_ms"]["p95"])
+        old_queries, new_queries = old["sql_queries_per_request"], new["sql_queries_per_request"]
+        queries = "-" if old_queries is None or new_queries is None else f"{old_queries:g}->{new_queries:g}"
+        print(
+            f"{route:<40} {format_change(change(old['throughput_rps'], new['throughput_rps'])):>9} "
+            f"{format_change(p95):>9} {format_change(change(old['latency_ms']['p99'], new['latency_ms']['p99'])):>9} "
+            f"{queries:>11}"
+        )
+
+        if p95 is not None and p95 >= args.threshold:
+            regressions.append(f"{route}: p95 {format_change(p95)}")
+        if old_queries is not None and new_queries is not None and new_queries - old_queries >= args.query_threshold:
+            regressions.append(f"{route}: SQL {old_queries:g} -> {new_queries:g}")
+
+    if regressions:
+        print("\n悪化したルート:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/json_encode.py
+"""
+1ページ分のツイート一覧のJSONエンコード時間を比較するベンチマーク
+
+    標準: FastAPI の serialize_response（response_model で検証・辞書化）+ JSONResponse（json.dumps）
+    TypeAdapter: 作成済みの TypeAdapter で検証してそのままJSON化
+    orjson: crud の出力をモデルの項目に合わせて整形し、検証せずに orjson でエンコード（FAST_JSON_RESPONSES=true の動作）
+
+使い方（backend ディレクトリで実行）:
+    python -m benchmarks.json_encode [--page-size 100] [--repeat 200]
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from statistics import median
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from src.api import responses
+from src.tweets.schemas import TweetList
+
+# crud.get_tweets と同じ形のダミーのページを作成
+def build_page(page_size: int) -> dict:
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    tweets = [
+        {
+            "tweet_id": 100000 - i,
+            "user_id": f"user{i % 50}",
+            "user_name": f"ユーザー{i % 50}",
+            "tweet_content": "今日はいい天気ですね。FastAPI と SQLAlchemy で Twitter クローンを作っています。" * 2,
+            "created_at": now - timedelta(seconds=i),
+            "updated_at": now - timedelta(seconds=i),
+            "like_count": i * 3,
+            "retweet_count": i,
+            "bookmark_count": i // 2,
+            "view_count": i * 40,
+            "unique_viewer_estimate": i * 25,
+            "is_liked": i % 2 == 0,
+            "is_retweeted": False,
+            "is_bookmarked": i % 5 == 0,
+        }
+        for i in range(page_size)
+    ]
+    return {"tweets": tweets, "total": 12345, "page": 1, "page_size": page_size, "next_cursor": "abc"}
+
+# 関数を repeat 回実行し、1回あたりの時間（ミリ秒）の中央値を返す
+def measure(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return median(timings)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ツイート一覧のJSONエンコード時間を比較する")
+    parser.add_argument("--page-size", type=int, default=100, help="1ページのツイート数")
+    parser.add_argument("--repeat", type=int, default=200, help="計測回数")
+    args = parser.parse_args()
+
+    page = build_page(args.page_size)
+    field = create_response_field(name="response", type_=TweetList)
+    loop = asyncio.new_event_loop()
+
+    def standard():
+        content = loop.run_until_complete(serialize_response(field=field, response_content=page))
+        return JSONResponse(content).body
+
+    def type_adapter():
+        adapter = responses.get_type_adapter(TweetList)
+        return adapter.dump_json(adapter.validate_python(page))
+
+    cases = {"標準（FastAPI + json.dumps）": standard, "TypeAdapter": type_adapter}
+    if responses.orjson is not None:
+        cases["orjson（検証なし）"] = lambda: responses.encode_json(TweetList, page)
+
+    # 全ての方法で同じJSONになることを確認
+    expected = json.loads(standard())
+    for name, fn in cases.items():
+        assert json.loads(fn()) == expected, name
+
+    results = {name: measure(fn, args.repeat) for name, fn in cases.items()}
+    baseline = results["標準（FastAPI + json.dumps）"]
+    print(f"ツイート {args.page_size} 件/ページ、{args.repeat} 回の中央値")
+    for name, elapsed in results.items():
+        print(f"  {name}: {elapsed:.3f} ms（{baseline / elapsed:.1f} 倍）")
+    loop.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+# benchmarks/load.py
+"""
+api_router の全ルートに同時接続のクライアントからリクエストを送り、ルートごとの性能を計測する
+
+    ルートごとに スループット（req/s）、レイテンシ（平均・p50・p95・p99・最大）、
+    ステータスコードの内訳、1リクエストあたりのSQL実行数 を計測し、JSONで出力する
+    既定ではアプリケーションをプロセス内で起動して ASGI で直接呼び出す（SQL実行数はこの場合のみ計測）
+    --base-url を指定すると起動済みのサーバーに送る（SECRET_KEY と DB は同じ設定にすること）
+
+事前に benchmarks.seed でデータを投入しておく（対象のID等は同じDBから取得する）
+出力したJSONは benchmarks.compare でコミット間の比較に使える
+
+使い方（backend ディレクトリで実行）:
+    DB_URL=sqlite:///./bench.db python -m benchmarks.load [--requests 200] [--concurrency 16] [--output result.json]
+    python -m benchmarks.load --routes "GET /tweets/" "GET /tweets/home"
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+from fastapi.routing import APIRoute
+from sqlalchemy import func
+
+from src.config.settings import settings
+from src.database.session import SessionLocal, engine
+from src.database.instrumentation import QueryStats, track_queries
+from src.api.routes.router import api_router
+from src.auth.schemas import SessionData
+from src.auth.utils import encrypt_session_data
+from src.models.reply import Reply
+from src.models.tweet import Tweet
+from src.models.user import User, UserStats
+from benchmarks.seed import SEED_PASSWORD, WORDS
+
+# 計測しないルートと理由
+SKIPPED_ROUTES = {
+    "GET /tweets/stream": "接続を保持し続けるストリームのため",
+}
+
+# bcrypt を計算するルート（既定では件数を減らす）
+SLOW_ROUTES = {"POST /auth/register", "POST /auth/login"}
+
+@dataclass
+class Call:
+    """1リクエスト分の内容"""
+    method: str
+    url: str
+    user_id: Optional[str] = None  # ログイン状態で送る場合のユーザー
+    json: Optional[dict] = None
+    on_response: Optional[Callable[[httpx.Response], None]] = None
+
+@dataclass
+class BenchContext:
+    """シナリオが使う対象のIDと、書き込み系ルートで作成したデータ"""
+    user_ids: List[str]
+    tweet_ids: List[int]
+    replied_tweet_ids: List[int]
+    reply_ids: List[int]
+    rng: random.Random
+    tokens: Dict[str, str] = field(default_factory=dict)
+    created: Dict[str, List[tuple]] = field(default_factory=lambda: defaultdict(list))
+    sequence: int = 0
+
+    def user(self) -> str:
+        return self.rng.choice(self.user_ids)
+
+    def tweet(self) -> int:
+        return self.rng.choice(self.tweet_ids)
+
+    def next_id(self) -> int:
+        self.sequence += 1
+        return self.sequence
+
+    def remember(self, kind: str, user_id: str, value=None, key: Optional[str] = None) -> Callable[[httpx.Response], None]:
+        """
+        成功したリクエストの (ユーザー, 対象) を削除系ルートで使うために記録するコールバック
+        key を指定した場合は対象をレスポンスの値から取得する（作成されたIDなど）
+        """
+        def callback(response: httpx.Response) -> None:
+            if response.status_code == 200:
+                self.created[kind].append((user_id, response.json()[key] if key else value))
+        return callback
+
+    def take(self, kind: str) -> Optional[tuple]:
+        return self.created[kind].pop() if self.created[kind] else None
+
+# 投入済みのデータから対象のIDを読み込む
+def load_context(seed: int, sample_size: int = 1000) -> BenchContext:
+    rng = random.Random(seed)
+    db = SessionLocal()
+    try:
+        # フォロー数の多いユーザー（ホームタイムラインが重い）を優先して選ぶ
+        user_ids = [
+            user_id for user_id, in
+            db.query(User.user_id).outerjoin(UserStats, User.user_id == UserStats.user_id)
+            .order_by(func.coalesce(UserStats.following_count, 0).desc(), User.user_id)
+            .limit(sample_size).all()
+        ]
+        tweet_ids = [tweet_id for tweet_id, in db.query(Tweet.tweet_id).order_by(Tweet.tweet_id.desc()).limit(sample_size * 10).all()]
+        replied_tweet_ids = [
+            tweet_id for tweet_id, in
+            db.query(Reply.tweet_id).group_by(Reply.tweet_id).order_by(func.count().desc()).limit(sample_size).all()
+        ]
+        reply_ids = [reply_id for reply_id, in db.query(Reply.reply_id).order_by(Reply.reply_id.desc()).limit(sample_size * 10).all()]
+    finally:
+        db.close()
+
+    if not user_ids or not tweet_ids:
+        raise SystemExit("データがありません。先に python -m benchmarks.seed を実行してください")
+    return BenchContext(
+        user_ids=user_ids,
+        tweet_ids=tweet_ids,
+        replied_tweet_ids=replied_tweet_ids or tweet_ids,
+        reply_ids=reply_ids or [0],
+        rng=rng,
+    )
+
+# 削除系ルートで、対応する作成系ルートの記録がなければ存在しない対象に送る
+def _take_or_missing(ctx: BenchContext, kind: str) -> tuple:
+    return ctx.take(kind) or (ctx.user(), 0)
+
+def _interaction(kind: str):
+    def add(ctx: BenchContext) -> Call:
+        user_id, tweet_id = ctx.user(), ctx.tweet()
+        return Call("POST", f"/tweets/{tweet_id}/{kind}", user_id, on_response=ctx.remember(kind, user_id, tweet_id))
+
+    def remove(ctx: BenchContext) -> Call:
+        user_id, tweet_id = _take_or_missing(ctx, kind)
+        return Call("DELETE", f"/tweets/{tweet_id}/{kind}", user_id)
+    return add, remove
+
+def _register(ctx: BenchContext) -> Call:
+    name = f"bench{int(time.time())}{ctx.next_id()}"
+    return Call("POST", "/auth/register", json={
+        "e_mail": f"{name}@example.com", "password": SEED_PASSWORD, "user_id": name, "user_name": name,
+    })
+
+def _post_tweet(ctx: BenchContext) -> Call:
+    user_id = ctx.user()
+    return Call(
+        "POST", "/tweets/", user_id,
+        json={"tweet_content": f"{ctx.rng.choice(WORDS)}のベンチマーク"},
+        on_response=ctx.remember("tweet", user_id, key="tweet_id"),
+    )
+
+def _post_reply(ctx: BenchContext) -> Call:
+    user_id = ctx.user()
+    return Call(
+        "POST", f"/tweets/{ctx.rng.choice(ctx.replied_tweet_ids)}/replies", user_id,
+        json={"reply_content": "ベンチマーク"},
+        on_response=ctx.remember("reply", user_id, key="reply_id"),
+    )
+
+def _remove_tweet(ctx: BenchContext) -> Call:
+    user_id, tweet_id = _take_or_missing(ctx, "tweet")
+    return Call("DELETE", f"/tweets/{tweet_id}", user_id)
+
+def _remove_reply(ctx: BenchContext) -> Call:
+    user_id, reply_id = _take_or_missing(ctx, "reply")
+    return Call("DELETE", f"/replies/{reply_id}", user_id)
+
+def _follow(ctx: BenchContext) -> Call:
+    user_id, target = ctx.rng.sample(ctx.user_ids, 2)
+    return Call("POST", f"/users/{target}/follow", user_id, on_response=ctx.remember("follow", user_id, target))
+
+def _unfollow(ctx: BenchContext) -> Call:
+    user_id, target = _take_or_missing(ctx, "follow")
+    return Call("DELETE", f"/users/{target}/follow", user_id)
+
+def _interaction_batch(ctx: BenchContext) -> Call:
+    operations = [
+        {"tweet_id": ctx.tweet(), "type": ctx.rng.choice(["like", "retweet", "bookmark"]), "action": ctx.rng.choice(["add", "remove"])}
+        for _ in range(10)
+    ]
+    return Call("POST", "/tweets/interactions", ctx.user(), json={"operations": operations})
+
+_like, _unlike = _interaction("like")
+_retweet, _unretweet = _interaction("retweet")
+_bookmark, _unbookmark = _interaction("bookmark")
+
+# ルート（"メソッド パス"）ごとのリクエストの作り方
+SCENARIOS: Dict[str, Callable[[BenchContext], Call]] = {
+    "POST /auth/register": _register,
+    "POST /auth/login": lambda ctx: Call("POST", "/auth/login", json={"e_mail": f"{ctx.user()}@example.com", "password": SEED_PASSWORD}),
+    "POST /auth/logout": lambda ctx: Call("POST", "/auth/logout", ctx.user()),
+    "GET /auth/me": lambda ctx: Call("GET", "/auth/me", ctx.user()),
+    "GET /tweets/": lambda ctx: Call("GET", f"/tweets/?page={ctx.rng.randint(1, 5)}&page_size=20", ctx.user()),
+    "GET /tweets/home": lambda ctx: Call("GET", "/tweets/home?page_size=20", ctx.user()),
+    "GET /tweets/search": lambda ctx: Call("GET", f"/tweets/search?q={ctx.rng.choice(WORDS)}&page_size=20", ctx.user()),
+    "GET /tweets/trending": lambda ctx: Call("GET", "/tweets/trending?window=24h&limit=20", ctx.user()),
+    "GET /tweets/batch": lambda ctx: Call("GET", "/tweets/batch?ids=" + ",".join(str(ctx.tweet()) for _ in range(20)), ctx.user()),
+    "GET /tweets/{tweet_id}": lambda ctx: Call("GET", f"/tweets/{ctx.tweet()}", ctx.user()),
+    "POST /tweets/": _post_tweet,
+    "POST /tweets/interactions": _interaction_batch,
+    "DELETE /tweets/{tweet_id}": _remove_tweet,
+    "POST /tweets/{tweet_id}/like": _like,
+    "DELETE /tweets/{tweet_id}/like": _unlike,
+    "POST /tweets/{tweet_id}/retweet": _retweet,
+    "DELETE /tweets/{tweet_id}/retweet": _unretweet,
+    "POST /tweets/{tweet_id}/bookmark": _bookmark,
+    "DELETE /tweets/{tweet_id}/bookmark": _unbookmark,
+    "GET /tweets/{tweet_id}/replies": lambda ctx: Call("GET", f"/tweets/{ctx.rng.choice(ctx.replied_tweet_ids)}/replies", ctx.user()),
+    "GET /tweets/{tweet_id}/thread": lambda ctx: Call("GET", f"/tweets/{ctx.rng.choice(ctx.replied_tweet_ids)}/thread", ctx.user()),
+    "GET /replies/{reply_id}": lambda ctx: Call("GET", f"/replies/{ctx.rng.choice(ctx.reply_ids)}", ctx.user()),
+    "POST /tweets/{tweet_id}/replies": _post_reply,
+    "DELETE /replies/{reply_id}": _remove_reply,
+    "GET /users/{user_id}": lambda ctx: Call("GET", f"/users/{ctx.user()}", ctx.user()),
+    "GET /users/{user_id}/tweets": lambda ctx: Call("GET", f"/users/{ctx.user()}/tweets?page_size=20", ctx.user()),
+    "POST /users/{user_id}/follow": _follow,
+    "DELETE /users/{user_id}/follow": _unfollow,
+}
+
+# api_router のルートを登録順に列挙（作成系のルートが対応する削除系より先に並ぶ）
+def list_routes() -> List[str]:
+    return [
+        f"{method} {route.path}"
+        for route in api_router.routes if isinstance(route, APIRoute)
+        for method in sorted(route.methods)
+    ]
+
+# 昇順に並んだ値の百分位数（最近傍順位法）
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    rank = max(1, int(round(q / 100 * len(values) + 0.5)))
+    return values[min(rank, len(values)) - 1]
+
+def summarize(latencies: List[float], statuses: Counter, elapsed: float, queries: Optional[int]) -> dict:
+    latencies = sorted(latencies)
+    total = len(latencies)
+    return {
+        "requests": total,
+        "errors": sum(count for status, count in statuses.items() if status >= 500 or status == 0),
+        "status_codes": {str(status): count for status, count in sorted(statuses.items())},
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / total, 3) if total else 0.0,
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(latencies[-1], 3) if total else 0.0,
+        },
+        "sql_queries_per_request": round(queries / total, 2) if queries is not None and total else None,
+    }
+
+class LoadRunner:
+    def __init__(self, client: httpx.AsyncClient, ctx: BenchContext, counter: Optional[QueryStats]):
+        self.client = client
+        self.ctx = ctx
+        self.counter = counter
+
+    def _headers(self, user_id: Optional[str]) -> dict:
+        if not user_id:
+            return {}
+        token = self.ctx.tokens.get(user_id)
+        if token is None:
+            token = self.ctx.tokens[user_id] = encrypt_session_data(SessionData(user_id=user_id))
+        return {"Cookie": f"{settings.SESSION_COOKIE_NAME}={token}"}
+
+    async def _send(self, call: Call) -> Tuple[float, int]:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(
+                call.method, settings.API_PREFIX + call.url, json=call.json, headers=self._headers(call.user_id)
+            )
+        except httpx.HTTPError:
+            return (time.perf_counter() - start) * 1000, 0
+        elapsed = (time.perf_counter() - start) * 1000
+        if call.on_response:
+            call.on_response(response)
+        return elapsed, response.status_code
+
+    async def run_route(self, route: str, requests: int, concurrency: int) -> dict:
+        scenario = SCENARIOS[route]
+        await self._send(scenario(self.ctx))  # ウォームアップ（接続・キャッシュの初期化）
+
+        latencies: List[float] = []
+        statuses: Counter = Counter()
+        remaining = iter(range(requests))
+
+        async def worker() -> None:
+            for _ in remaining:
+                elapsed, status = await self._send(scenario(self.ctx))
+                latencies.append(elapsed)
+                statuses[status] += 1
+
+        queries_before = self.counter.count if self.counter else None
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+        elapsed = time.perf_counter() - started
+        queries = self.counter.count - queries_before if self.counter else None
+        return summarize(latencies, statuses, elapsed, queries)
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run(args) -> dict:
+    ctx = load_context(args.seed)
+    routes = [route for route in list_routes() if not args.routes or route in args.routes]
+    skipped = {route: reason for route, reason in SKIPPED_ROUTES.items() if route in routes}
+    skipped.update({route: "シナリオ未定義" for route in routes if route not in SCENARIOS and route not in skipped})
+
+    counter = None
+    stack = ExitStack()
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+        app = None
+    else:
+        from main import app  # プロセス内で起動する場合のみ読み込む
+        from src.ratelimit.limiter import rate_limiter
+        rate_limiter.enabled = False  # 同じユーザー・IPから繰り返し送るため、レート制限と負荷制限は外して計測する
+        rate_limiter.max_concurrent_writes = 0
+        counter = stack.enter_context(track_queries("benchmark"))
+        await app.router.startup()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=args.timeout)
+
+    results = {}
+    try:
+        runner = LoadRunner(client, ctx, counter)
+        for route in routes:
+            if route in skipped:
+                continue
+            requests = min(args.requests, args.slow_requests) if route in SLOW_ROUTES else args.requests
+            results[route] = await runner.run_route(route, requests, args.concurrency)
+            print(f"{route}: {results[route]['throughput_rps']} req/s, p95 {results[route]['latency_ms']['p95']} ms", file=sys.stderr)
+    finally:
+        await client.aclose()
+        if app is not None:
+            await app.router.shutdown()
+        stack.close()
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "started_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "target": args.base_url or "in-process",
+            "database": engine.dialect.name,
+            "db_async": settings.DB_ASYNC,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+        },
+        "routes": results,
+        "skipped": skipped,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="api_router の全ルートの性能を計測する")
+    parser.add_argument("--requests", type=int, default=200, help="ルートごとのリクエスト数")
+    parser.add_argument("--slow-requests", type=int, default=20, help="bcrypt を計算するルート（登録・ログイン）のリクエスト数")
+    parser.add_argument("--concurrency", type=int, default=16, help="同時に送るクライアント数")
+    parser.add_argument("--routes", nargs="*", help="計測するルート（例: \"GET /tweets/\"）。未指定時は全ルート")
+    parser.add_argument("--base-url", help="起動済みサーバーのURL（例: http://localhost:5001）。未指定時はプロセス内で起動")
+    parser.add_argument("--timeout", type=float, default=30, help="リクエストのタイムアウト（秒）")
+    parser.add_argument("--seed", type=int, default=0, help="対象の選び方の乱数シード")
+    parser.add_argument("--output", help="結果のJSONの出力先（未指定時は標準出力）")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    output = json.dumps(result, ensure_ascii=False, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        print(f"{args.output} に出力しました", file=sys.stderr)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
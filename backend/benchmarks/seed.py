@@ -0,0 +1,271 @@
+# benchmarks/seed.py
+"""
+ベンチマーク用の合成データを投入する
+
+    ユーザー、ツイート、フォロー、いいね・リツイート・ブックマーク、入れ子のリプライを作成する
+    投稿数・フォロワー数・インタラクション数は人気の偏り（べき乗分布）を持たせる
+    集計カウンター（TweetStats / UserStats）、ホームタイムライン、リプライの経路、検索インデックスも
+    アプリケーションの書き込み時と同じ状態になるように作成する
+    全ユーザーのパスワードは SEED_PASSWORD（ログインのベンチマークで使用）
+
+接続先は DB_URL（未指定時は MySQL の設定）に従う
+
+使い方（backend ディレクトリで実行）:
+    python -m benchmarks.seed [--users 500] [--tweets 5000] [--reset]
+    DB_URL=sqlite:///./bench.db python -m benchmarks.seed --users 200 --tweets 2000
+"""
+import argparse
+import bisect
+import itertools
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Sequence
+
+from sqlalchemy import delete, func, insert
+
+import src.models  # noqa: F401  全モデルをメタデータに登録
+from src.config.settings import settings
+from src.database.session import Base, SessionLocal, engine
+from src.auth.utils import get_password_hash
+from src.crud.replies import build_reply_path
+from src.crud.search import rebuild_search_index
+from src.models.follow import Follow
+from src.models.interactions import Bookmark, Like, Retweet
+from src.models.reply import Reply
+from src.models.timeline import HomeTimelineEntry
+from src.models.tweet import Tweet, TweetStats
+from src.models.user import User, UserStats
+
+SEED_PASSWORD = "password123"
+
+# 本文に使う語（検索のベンチマークで同じ語を使う）
+WORDS = [
+    "今日", "天気", "ランチ", "カフェ", "仕事", "会議", "週末", "旅行", "映画", "音楽",
+    "FastAPI", "Python", "SQL", "ラーメン", "コーヒー", "散歩", "読書", "ゲーム", "ニュース", "写真",
+]
+
+@dataclass
+class SeedOptions:
+    users: int = 500
+    tweets: int = 5000
+    follows: int = 20  # 1ユーザーあたりの平均フォロー数
+    likes: int = 20000
+    retweets: int = 5000
+    bookmarks: int = 3000
+    replies: int = 3000
+    max_reply_depth: int = 4
+    alpha: float = 1.1  # べき乗分布の指数（大きいほど偏る）
+    days: int = 30  # ツイートの作成日時を散らばらせる日数
+    seed: int = 42
+
+class PowerLawSampler:
+    """順位 k の要素を 1 / k^alpha に比例した確率で選ぶ"""
+
+    def __init__(self, items: Sequence, alpha: float, rng: random.Random):
+        self.items = list(items)
+        self.rng = rng
+        self.cumulative = list(itertools.accumulate(1 / (rank ** alpha) for rank in range(1, len(self.items) + 1)))
+
+    def sample(self):
+        point = self.rng.random() * self.cumulative[-1]
+        return self.items[bisect.bisect_left(self.cumulative, point)]
+
+    def sample_distinct(self, count: int, exclude=None) -> set:
+        """重複なしで count 件選ぶ（候補が足りない場合は選べた分だけ返す）"""
+        chosen = set()
+        for _ in range(count * 10):
+            if len(chosen) >= count:
+                break
+            item = self.sample()
+            if item != exclude:
+                chosen.add(item)
+        return chosen
+
+# 投入する全テーブルの行を作成
+def generate_dataset(options: SeedOptions, hashed_password: str) -> Dict[str, List[dict]]:
+    rng = random.Random(options.seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    start = now - timedelta(days=options.days)
+
+    user_ids = [f"user{i:06d}" for i in range(1, options.users + 1)]
+    users = [
+        {"user_id": user_id, "e_mail": f"{user_id}@example.com", "user_name": f"ユーザー{i}", "password": hashed_password}
+        for i, user_id in enumerate(user_ids, start=1)
+    ]
+    # 投稿数・フォロワー数の偏りは同じ順位を使う（よく投稿するユーザーほどフォローされやすい）
+    popular_users = PowerLawSampler(user_ids, options.alpha, rng)
+
+    # ツイート（ID順に作成日時が新しくなる）
+    span = (now - start).total_seconds()
+    tweets = []
+    for tweet_id in range(1, options.tweets + 1):
+        words = rng.sample(WORDS, 3)
+        tweets.append({
+            "tweet_id": tweet_id,
+            "user_id": popular_users.sample(),
+            "tweet_content": f"{words[0]}の{words[1]}について。{words[2]} #{tweet_id}",
+            "created_at": start + timedelta(seconds=span * tweet_id / (options.tweets + 1)),
+        })
+
+    # フォロー（フォロー数はユーザーごとにばらつかせる）
+    follows = []
+    for user_id in user_ids:
+        count = min(len(user_ids) - 1, int(rng.expovariate(1 / options.follows)) if options.follows else 0)
+        for followed_user_id in sorted(popular_users.sample_distinct(count, exclude=user_id)):
+            follows.append({"follower_user_id": user_id, "followed_user_id": followed_user_id})
+
+    # インタラクション（新しいツイートほど選ばれやすい）
+    popular_tweets = PowerLawSampler([tweet["tweet_id"] for tweet in reversed(tweets)], options.alpha, rng)
+    interactions = {}
+    for name, total in (("likes", options.likes), ("retweets", options.retweets), ("bookmarks", options.bookmarks)):
+        pairs = set()
+        for _ in range(total * 2):
+            if len(pairs) >= total:
+                break
+            pairs.add((rng.choice(user_ids), popular_tweets.sample()))
+        interactions[name] = [{"user_id": user_id, "tweet_id": tweet_id} for user_id, tweet_id in sorted(pairs)]
+
+    # リプライ（既存のリプライへの返信を混ぜて入れ子にする）
+    tweet_created = {tweet["tweet_id"]: tweet["created_at"] for tweet in tweets}
+    replies = []
+    by_tweet: Dict[int, List[dict]] = defaultdict(list)
+    for reply_id in range(1, options.replies + 1):
+        tweet_id = popular_tweets.sample()
+        candidates = [reply for reply in by_tweet[tweet_id] if reply["depth"] < options.max_reply_depth]
+        parent = rng.choice(candidates) if candidates and rng.random() < 0.6 else None
+        base_time = parent["created_at"] if parent else tweet_created[tweet_id]
+        reply = {
+            "reply_id": reply_id,
+            "user_id": rng.choice(user_ids),
+            "tweet_id": tweet_id,
+            "parent_reply_id": parent["reply_id"] if parent else None,
+            "reply_content": f"{rng.choice(WORDS)}ですね #{reply_id}",
+            "path": build_reply_path(parent["path"] if parent else None, reply_id),
+            "depth": parent["depth"] + 1 if parent else 0,
+            "child_reply_count": 0,
+            "created_at": min(now, base_time + timedelta(seconds=rng.randint(1, 3600))),
+        }
+        if parent:
+            parent["child_reply_count"] += 1
+        by_tweet[tweet_id].append(reply)
+        replies.append(reply)
+
+    # 集計カウンター
+    tweet_stats = {tweet["tweet_id"]: {"tweet_id": tweet["tweet_id"], "like_count": 0, "retweet_count": 0, "bookmark_count": 0} for tweet in tweets}
+    for name, column in (("likes", "like_count"), ("retweets", "retweet_count"), ("bookmarks", "bookmark_count")):
+        for row in interactions[name]:
+            tweet_stats[row["tweet_id"]][column] += 1
+    user_stats = {
+        user_id: {"user_id": user_id, "follower_count": 0, "following_count": 0, "tweet_count": 0, "like_count": 0}
+        for user_id in user_ids
+    }
+    for follow in follows:
+        user_stats[follow["follower_user_id"]]["following_count"] += 1
+        user_stats[follow["followed_user_id"]]["follower_count"] += 1
+    for tweet in tweets:
+        user_stats[tweet["user_id"]]["tweet_count"] += 1
+    for row in interactions["likes"]:
+        user_stats[row["user_id"]]["like_count"] += 1
+
+    # ホームタイムライン（fan_out_tweet と同じく、フォロワー数が閾値未満の投稿者のみ実体化）
+    tweets_by_author: Dict[str, List[dict]] = defaultdict(list)
+    for tweet in tweets:
+        tweets_by_author[tweet["user_id"]].append(tweet)
+    followees: Dict[str, List[str]] = defaultdict(list)
+    for follow in follows:
+        if user_stats[follow["followed_user_id"]]["follower_count"] < settings.FANOUT_FOLLOWER_THRESHOLD:
+            followees[follow["follower_user_id"]].append(follow["followed_user_id"])
+    home_timelines = []
+    for user_id in user_ids:
+        entries = [tweet for author in [user_id, *followees[user_id]] for tweet in tweets_by_author[author]]
+        entries.sort(key=lambda tweet: (tweet["created_at"], tweet["tweet_id"]), reverse=True)
+        home_timelines.extend(
+            {"user_id": user_id, "tweet_id": tweet["tweet_id"], "author_user_id": tweet["user_id"], "created_at": tweet["created_at"]}
+            for tweet in entries[:settings.HOME_TIMELINE_MAX_ENTRIES]
+        )
+
+    return {
+        "users": users,
+        "user_stats": list(user_stats.values()),
+        "tweets": tweets,
+        "tweet_stats": list(tweet_stats.values()),
+        "follows": follows,
+        "likes": interactions["likes"],
+        "retweets": interactions["retweets"],
+        "bookmarks": interactions["bookmarks"],
+        "replies": replies,
+        "home_timelines": home_timelines,
+    }
+
+# 投入先のテーブル（親テーブルから順に投入する）
+TABLES = [
+    ("users", User),
+    ("user_stats", UserStats),
+    ("tweets", Tweet),
+    ("tweet_stats", TweetStats),
+    ("follows", Follow),
+    ("likes", Like),
+    ("retweets", Retweet),
+    ("bookmarks", Bookmark),
+    ("replies", Reply),
+    ("home_timelines", HomeTimelineEntry),
+]
+
+# 全テーブルの行を削除（子テーブルから順に削除する）
+def reset_database(db) -> None:
+    for table in reversed(Base.metadata.sorted_tables):
+        db.execute(delete(table))
+    db.commit()
+
+# 行を batch_size 件ずつまとめて INSERT する
+def insert_dataset(db, dataset: Dict[str, List[dict]], batch_size: int = 2000) -> None:
+    for name, model in TABLES:
+        rows = dataset[name]  # リプライは親の方が reply_id が小さいため、そのままの順で投入できる
+        for i in range(0, len(rows), batch_size):
+            db.execute(insert(model), rows[i:i + batch_size])
+        db.commit()
+
+def main() -> None:
+    defaults = SeedOptions()
+    parser = argparse.ArgumentParser(description="ベンチマーク用の合成データを投入する")
+    parser.add_argument("--users", type=int, default=defaults.users, help="ユーザー数")
+    parser.add_argument("--tweets", type=int, default=defaults.tweets, help="ツイート数")
+    parser.add_argument("--follows", type=int, default=defaults.follows, help="1ユーザーあたりの平均フォロー数")
+    parser.add_argument("--likes", type=int, default=defaults.likes, help="いいね数")
+    parser.add_argument("--retweets", type=int, default=defaults.retweets, help="リツイート数")
+    parser.add_argument("--bookmarks", type=int, default=defaults.bookmarks, help="ブックマーク数")
+    parser.add_argument("--replies", type=int, default=defaults.replies, help="リプライ数")
+    parser.add_argument("--max-reply-depth", type=int, default=defaults.max_reply_depth, help="リプライの最大階層")
+    parser.add_argument("--alpha", type=float, default=defaults.alpha, help="人気の偏り（べき乗分布の指数）")
+    parser.add_argument("--days", type=int, default=defaults.days, help="ツイートの作成日時を散らばらせる日数")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="乱数のシード")
+    parser.add_argument("--reset", action="store_true", help="投入前に全テーブルの行を削除する")
+    args = parser.parse_args()
+    options = SeedOptions(**{key: value for key, value in vars(args).items() if key != "reset"})
+
+    # SQLite などテーブルが未作成の場合のみ作成される
+    Base.metadata.create_all(engine)
+
+    db = SessionLocal()
+    try:
+        if args.reset:
+            reset_database(db)
+        elif db.query(func.count(User.id)).scalar():
+            parser.error("既にデータが存在します。--reset を指定すると削除してから投入します")
+
+        started = time.perf_counter()
+        dataset = generate_dataset(options, get_password_hash(SEED_PASSWORD))
+        insert_dataset(db, dataset)
+        indexed = rebuild_search_index(db)
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+
+    counts = "、".join(f"{name} {len(rows)}" for name, rows in dataset.items())
+    print(f"{elapsed:.1f} 秒で投入しました（{counts}、検索インデックス {indexed} 件）")
+
+if __name__ == "__main__":
+    main()
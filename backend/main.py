@@ -1,14 +1,32 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from src.config.settings import settings
+from src.api.middleware import QueryStatsMiddleware, MetricsMiddleware, RateLimitMiddleware
+from src.ratelimit.limiter import rate_limiter
+from src.metrics.definitions import registry
+from src.database.session import replica_set
 from src.api.routes.router import api_router
+from src.internal.router import router as internal_router
+from src.auth.hashing import password_hasher
+from src.tweets.write_buffer import interaction_buffer
+from src.tweets.impressions import impression_counter
+from src.stream.broadcaster import tweet_broadcaster
+from src.trending.tracker import trending_tracker
+from src.outbox.worker import outbox_pool
 
 app = FastAPI(
     title="Twitter App API",
     description="Twitter App API with FastAPI",
 )
 
+# ルートごとのレート制限と書き込みの負荷制限（拒否したレスポンスにもCORSヘッダーが付くようCORSより内側に置く）
+app.add_middleware(
+    RateLimitMiddleware, limiter=rate_limiter, trust_forwarded_for=settings.RATE_LIMIT_TRUST_FORWARDED_FOR
+)
+
 # CORS設定
 app.add_middleware(
     CORSMiddleware,
@@ -18,25 +36,89 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# リクエストごとのSQL実行回数・時間を集計（本番環境以外ではレスポンスヘッダーでも返す）
+app.add_middleware(QueryStatsMiddleware, expose_headers=settings.ENVIRONMENT != "production")
+
+# ルートごとのリクエスト数・処理時間などを記録（GET /internal/metrics で出力）
+app.add_middleware(MetricsMiddleware)
+
 # APIルーターを登録
 app.include_router(api_router, prefix=settings.API_PREFIX)
 
+# 運用向けの内部エンドポイントを登録（OpenAPIには載せない）
+app.include_router(internal_router, prefix="/internal", include_in_schema=False)
+
 # ルートエンドポイント
 @app.get("/")
 def root():
     return {"message": "Welcome to Twitter Clone API"}
 
+# メトリクスを定期的に書き出す（終了時にキャンセルされる）
+async def flush_metrics(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        registry.write_snapshot()
+
 # アプリケーション起動時のイベント
 @app.on_event("startup")
 async def startup_event():
-    # 起動時の処理があれば追加
-    pass
+    # 常駐させるバックグラウンドタスク（終了時にキャンセルする）
+    app.state.background_tasks = []
+    
+    # レプリカのヘルスチェックを定期実行
+    if replica_set:
+        app.state.background_tasks.append(
+            asyncio.create_task(replica_set.monitor(settings.DB_REPLICA_HEALTH_CHECK_INTERVAL))
+        )
+    
+    # 複数ワーカーの場合はメトリクスを定期的に共有ディレクトリへ書き出す
+    if settings.METRICS_MULTIPROC_DIR:
+        app.state.background_tasks.append(
+            asyncio.create_task(flush_metrics(settings.METRICS_FLUSH_INTERVAL))
+        )
+    
+    # トレンドのスコアを直近のエンゲージメントから計算し、定期的に再計算する
+    if trending_tracker.enabled:
+        app.state.background_tasks.append(
+            asyncio.create_task(trending_tracker.maintain(settings.TRENDING_REBUILD_INTERVAL))
+        )
+    
+    # インタラクションの write-behind 書き込みを開始
+    interaction_buffer.start()
+    
+    # 表示回数の定期書き込みを開始
+    impression_counter.start()
+    
+    # 新着ツイートのストリーム配信を開始
+    await tweet_broadcaster.start()
+    
+    # アウトボックスのイベント処理を開始
+    await outbox_pool.start()
 
 # アプリケーション終了時のイベント
 @app.on_event("shutdown")
 async def shutdown_event():
-    # 終了時の処理があれば追加
-    pass
+    # バッファに残っているインタラクションを書き込む
+    await interaction_buffer.stop()
+    
+    # 集計中の表示回数を書き込む
+    await impression_counter.stop()
+    
+    # 接続中のストリームを終了
+    await tweet_broadcaster.stop()
+    
+    # 処理中のイベントを終えてアウトボックスのワーカーを停止
+    await outbox_pool.stop()
+    
+    # バックグラウンドタスクを停止
+    for task in getattr(app.state, "background_tasks", []):
+        task.cancel()
+    
+    # 終了時点のメトリクスを書き出す（停止したワーカーのカウンターも合算に残す）
+    registry.write_snapshot()
+    
+    # パスワードハッシュ計算用のプロセスを停止
+    password_hasher.shutdown()
 
 if __name__ == "__main__":
     import uvicorn
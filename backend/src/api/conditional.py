@@ -0,0 +1,54 @@
+# src/api/conditional.py
+import hashlib
+from typing import Any, Optional, Type
+
+from fastapi import Request, Response
+
+from src.api.responses import respond
+
+# ユーザーごとに内容が異なるため共有キャッシュには保存させず、毎回 ETag で再検証させる
+CACHE_CONTROL = "private, no-cache"
+
+# バージョン情報から強い ETag を作成
+def compute_etag(*parts: Any) -> str:
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+# If-None-Match に ETag が含まれるか
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+class ConditionalGet:
+    """
+    ETag / If-None-Match による条件付きGETの依存関係
+    ルートでは軽量なバージョン情報だけを先に取得して check() に渡し、
+    一致した場合はレスポンスを組み立てずに 304 を返す
+    """
+
+    def __init__(self, request: Request, response: Response):
+        self.request = request
+        self.response = response
+        self.etag: Optional[str] = None
+
+    def check(self, user_id: Optional[str], version: Any) -> Optional[Response]:
+        """ETag を確定し、クライアントのキャッシュが最新なら 304 レスポンスを返す"""
+        self.etag = compute_etag(self.request.url.path, str(self.request.query_params), user_id, version)
+        if etag_matches(self.request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=self.headers())
+        return None
+
+    def headers(self) -> dict:
+        headers = {"Cache-Control": CACHE_CONTROL}
+        if self.etag:
+            headers["ETag"] = self.etag
+        return headers
+
+    def respond(self, model: Type, content: Any) -> Any:
+        """ETag と Cache-Control を付けてレスポンスを返す"""
+        result = respond(model, content)
+        target = result if isinstance(result, Response) else self.response
+        target.headers.update(self.headers())
+        return result
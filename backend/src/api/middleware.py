@@ -0,0 +1,165 @@
+# src/api/middleware.py
+import math
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config.settings import settings
+from src.auth.utils import get_current_user_session
+from src.database.instrumentation import request_queries
+from src.ratelimit.limiter import RateLimiter
+from src.metrics.definitions import (
+    http_requests_total, http_request_duration_seconds, http_requests_in_flight, http_response_size_bytes,
+    http_requests_rate_limited_total, http_requests_shed_total
+)
+
+# ルートに一致しなかったリクエストのラベル（任意のパスでラベルが増え続けないようにまとめる）
+UNMATCHED_ROUTE = "unmatched"
+
+# 書き込みとみなさないメソッド
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# リクエストに一致するルートのパステンプレート（例: /api/tweets/{tweet_id}）
+def route_template(scope: Scope) -> str:
+    """複数のミドルウェアから呼ばれるため、結果をスコープに保持して照合は1回で済ませる"""
+    if "route_template" in scope:
+        return scope["route_template"]
+    partial = None
+    template = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            template = route.path
+            break
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path  # パスは一致したがメソッドが異なる（405）
+    scope["route_template"] = template or partial or UNMATCHED_ROUTE
+    return scope["route_template"]
+
+class QueryStatsMiddleware:
+    """
+    リクエストごとにSQLの実行回数と合計時間を集計する
+    expose_headers が True の場合は X-DB-Queries / X-DB-Time（ミリ秒）ヘッダーで返す
+    （ヘッダーはレスポンスの送信開始時点の値）
+    """
+
+    def __init__(self, app: ASGIApp, expose_headers: bool = True):
+        self.app = app
+        self.expose_headers = expose_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with request_queries(f"{scope['method']} {scope['path']}") as stats:
+            async def send_with_stats(message: Message) -> None:
+                if message["type"] == "http.response.start" and self.expose_headers:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Queries"] = str(stats.count)
+                    headers["X-DB-Time"] = f"{stats.duration * 1000:.1f}"
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+
+class MetricsMiddleware:
+    """ルートのテンプレートごとにリクエスト数・処理時間・処理中の件数・レスポンスサイズを記録する"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope)
+        status_code = 500  # レスポンスを返す前に例外が発生した場合
+        size = 0
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        http_requests_in_flight.inc(method=method, route=route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            http_requests_in_flight.dec(method=method, route=route)
+            http_request_duration_seconds.observe(time.perf_counter() - start, method=method, route=route)
+            http_response_size_bytes.observe(size, method=method, route=route)
+            http_requests_total.inc(method=method, route=route, status=str(status_code))
+
+class RateLimitMiddleware:
+    """
+    /api 配下のリクエストにルートごとのレート制限と書き込みの負荷制限をかける
+    予算を使い切ったクライアントには 429、書き込みの同時実行数が上限に達している場合は 503 を
+    Retry-After ヘッダー付きで返し、ルートの処理（DB接続の取得）まで進ませない
+    """
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter, trust_forwarded_for: bool = False):
+        self.app = app
+        self.limiter = limiter
+        self.trust_forwarded_for = trust_forwarded_for
+
+    def client_key(self, scope: Scope) -> str:
+        """
+        ログイン中はユーザーID、それ以外はクライアントのIP
+        プロキシ配下では X-Forwarded-For の末尾（信頼するプロキシが追加した接続元）を使う
+        先頭側はクライアントが自由に指定できるため使わない
+        """
+        request = Request(scope)
+        session_data = get_current_user_session(request)
+        if session_data:
+            return f"user:{session_data.user_id}"
+        forwarded = request.headers.get("x-forwarded-for") if self.trust_forwarded_for else None
+        if forwarded and forwarded.split(",")[-1].strip():
+            return f"ip:{forwarded.split(',')[-1].strip()}"
+        return f"ip:{request.client.host if request.client else '-'}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(settings.API_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        budget = self.limiter.budget_for(method, route_template(scope))
+        if budget is not None:
+            retry_after = await self.limiter.check(budget, self.client_key(scope))
+            if retry_after > 0:
+                http_requests_rate_limited_total.inc(budget=budget[0])
+                response = JSONResponse(
+                    {"detail": "リクエストが多すぎます。しばらくしてから再度お試しください"},
+                    status_code=429,
+                    headers={"Retry-After": str(math.ceil(retry_after))},
+                )
+                await response(scope, receive, send)
+                return
+
+        if method in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        if not self.limiter.acquire_write():
+            http_requests_shed_total.inc()
+            response = JSONResponse(
+                {"detail": "混雑しています。しばらくしてから再度お試しください"},
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release_write()
@@ -0,0 +1,19 @@
+# src/api/pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+# キーセットページネーション用カーソル（created_at と ID を不透明な文字列に変換）
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    payload = json.dumps([created_at.isoformat(), item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+# カーソル文字列を (created_at, ID) に復元する（不正な値は ValueError）
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("カーソルが不正です") from e
@@ -0,0 +1,92 @@
+# src/api/responses.py
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union, get_args, get_origin
+
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+
+from src.config.settings import settings
+
+try:
+    import orjson  # 任意の依存関係（未インストール時は pydantic のシリアライザを使う）
+except ImportError:  # pragma: no cover
+    orjson = None
+
+class FastJSONResponse(Response):
+    """エンコード済みのJSON（bytes）をそのまま返すレスポンス"""
+
+    media_type = "application/json"
+
+# レスポンスモデルごとの TypeAdapter（初回のみ作成して使い回す）
+@lru_cache(maxsize=None)
+def get_type_adapter(model: Type) -> TypeAdapter:
+    return TypeAdapter(model)
+
+Shaper = Callable[[Any], Any]
+
+# 型ごとの整形関数（整形が不要な型は None）。自己参照するモデルのため作成途中の関数も登録する
+_shapers: Dict[Any, Optional[Shaper]] = {}
+
+# レスポンスモデルの定義どおりに辞書を整形する関数を取得
+def get_shaper(annotation: Any) -> Optional[Shaper]:
+    """
+    モデルの項目だけを定義順に取り出し、省略された項目には既定値を入れる（値の検証・変換はしない）
+    response_model で辞書化した場合と同じキーの集合になる
+    """
+    if annotation in _shapers:
+        return _shapers[annotation]
+
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        fields: List[Tuple[str, Any, Optional[Shaper]]] = []
+
+        def shape_model(value: Any) -> Any:
+            if not isinstance(value, dict):
+                return value
+            shaped = {}
+            for name, field, nested in fields:
+                if name in value:
+                    item = value[name]
+                    shaped[name] = nested(item) if nested is not None and item is not None else item
+                elif field.is_required():
+                    raise KeyError(f"{annotation.__name__}.{name} がありません")
+                else:
+                    shaped[name] = field.get_default(call_default_factory=True)
+            return shaped
+
+        _shapers[annotation] = shape_model
+        for name, field in annotation.model_fields.items():
+            fields.append((name, field, get_shaper(field.annotation)))
+        return shape_model
+
+    origin, args = get_origin(annotation), get_args(annotation)
+    shaper: Optional[Shaper] = None
+    if origin in (list, List) and args:
+        item_shaper = get_shaper(args[0])
+        if item_shaper is not None:
+            shaper = lambda value: [item_shaper(item) for item in value]
+    elif origin is Union:
+        # Optional[X] のみ対応（None は呼び出し元でそのまま返す）
+        candidates = [arg for arg in args if arg is not type(None)]
+        if len(candidates) == 1:
+            shaper = get_shaper(candidates[0])
+    _shapers[annotation] = shaper
+    return shaper
+
+# crud が返した辞書をJSONにエンコード
+def encode_json(model: Type, content: Any) -> bytes:
+    """
+    orjson がある場合は crud の出力をモデルの項目に合わせて整形するだけで、検証せずにエンコードする
+    ない場合は作成済みの TypeAdapter で検証とエンコードを1回ずつ行う
+    （FastAPI 標準の検証 → 辞書化 → json.dumps よりも少ない処理で済む）
+    """
+    if orjson is not None:
+        shaper = get_shaper(model)
+        return orjson.dumps(shaper(content) if shaper is not None else content)
+    adapter = get_type_adapter(model)
+    return adapter.dump_json(adapter.validate_python(content))
+
+# レスポンスを返す（FAST_JSON_RESPONSES 有効時は response_model による再検証を省く）
+def respond(model: Type, content: Any) -> Any:
+    if settings.FAST_JSON_RESPONSES:
+        return FastJSONResponse(content=encode_json(model, content))
+    return content
@@ -3,6 +3,7 @@ from fastapi import APIRouter
 from src.auth.router import router as auth_router
 from src.tweets.router import router as tweets_router
 from src.replies.router import router as replies_router
+from src.users.router import router as users_router
 
 # メインAPIルーターを作成
 api_router = APIRouter()
@@ -11,3 +12,4 @@ api_router = APIRouter()
 api_router.include_router(auth_router, prefix="/auth", tags=["認証"])
 api_router.include_router(tweets_router, prefix="/tweets", tags=["ツイート"])
 api_router.include_router(replies_router, tags=["リプライ"])
+api_router.include_router(users_router, prefix="/users", tags=["ユーザー"])
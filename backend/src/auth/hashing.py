@@ -0,0 +1,74 @@
+# src/auth/hashing.py
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from src.config.settings import settings
+from src.auth.utils import get_password_hash, verify_and_update_password
+
+class PasswordHasherBusy(Exception):
+    """ハッシュ計算の待ち行列が上限に達している"""
+
+class PasswordHasher:
+    """
+    bcrypt の計算をプロセスプールで行う（GIL とリクエスト処理用スレッドを占有しない）
+    実行中・待機中の件数が上限を超えた場合は待たせずに PasswordHasherBusy を送出する
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Optional[Executor]:
+        # 初回利用時にプロセスを起動する
+        if self.workers > 0 and self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def _submit(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+
+        self.pending += 1
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                return await run_in_threadpool(fn, *args)
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """パスワードをハッシュ化"""
+        return await self._submit(get_password_hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        パスワードを検証し、(一致したか, 再ハッシュ後のハッシュ) を返す
+        コストなどが現在の設定と異なる場合のみ2つ目に新しいハッシュが入る
+        """
+        return await self._submit(verify_and_update_password, password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
@@ -1,33 +1,60 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
-from sqlalchemy.orm import Session
 
-from src.database.session import get_db
-from src.crud.users import create_user, authenticate_user, get_user_by_email, get_user_by_user_id
+from src.database.session import DBSession, get_db_session
+from src.crud.users import create_user, get_user_by_email, get_user_by_user_id, update_user_password
 from src.auth.schemas import UserCreate, UserLogin, UserResponse, SessionData
-from src.auth.utils import set_session_cookie, delete_session_cookie, get_current_user_session, require_authenticated_user
+from src.auth.utils import (
+    set_session_cookie, delete_session_cookie, get_current_user_session, require_authenticated_user
+)
+from src.auth.hashing import password_hasher, PasswordHasherBusy
 
 router = APIRouter()
 
+# ハッシュ計算の待ち行列が上限に達している場合のエラー
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="現在混み合っています。しばらくしてから再度お試しください",
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/register", response_model=UserResponse)
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user: UserCreate, db: DBSession = Depends(get_db_session)):
     """ユーザー登録エンドポイント"""
     # メールアドレスが既に使用されているか確認
-    db_user = get_user_by_email(db, email=user.e_mail)
+    db_user = await db.run(get_user_by_email, email=user.e_mail)
     if db_user:
         raise HTTPException(status_code=400, detail="このメールアドレスは既に登録されています")
     
     # ユーザーIDが既に使用されているか確認
-    db_user = get_user_by_user_id(db, user_id=user.user_id)
+    db_user = await db.run(get_user_by_user_id, user_id=user.user_id)
     if db_user:
         raise HTTPException(status_code=400, detail="このユーザーIDは既に使用されています")
     
-    # ユーザー作成
-    return create_user(db=db, user=user)
+    # ユーザー作成（bcrypt はプロセスプールで計算）
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    return await db.run(create_user, user=user, hashed_password=hashed_password)
 
 @router.post("/login")
-def login(response: Response, user_login: UserLogin, db: Session = Depends(get_db)):
+async def login(response: Response, user_login: UserLogin, db: DBSession = Depends(get_db_session)):
     """ログインエンドポイント"""
-    user = authenticate_user(db, user_login.e_mail, user_login.password)
+    user = await db.run(get_user_by_email, email=user_login.e_mail)
+    
+    # パスワード検証（bcrypt はプロセスプールで計算）
+    if user:
+        try:
+            verified, new_hash = await password_hasher.verify_and_update(user_login.password, user.password)
+        except PasswordHasherBusy:
+            raise _hasher_busy()
+        if not verified:
+            user = None
+        elif new_hash:
+            # コスト設定が変わっていた場合は新しい設定でハッシュを保存し直す
+            await db.run(update_user_password, user_id=user.user_id, hashed_password=new_hash)
+    
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -44,18 +71,18 @@ def login(response: Response, user_login: UserLogin, db: Session = Depends(get_d
     return {"message": "ログインに成功しました"}
 
 @router.post("/logout")
-def logout(response: Response):
+async def logout(response: Response):
     """ログアウトエンドポイント"""
     delete_session_cookie(response)
     return {"message": "ログアウトしました"}
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user(
-    db: Session = Depends(get_db), 
+async def get_current_user(
+    db: DBSession = Depends(get_db_session), 
     session_data: SessionData = Depends(require_authenticated_user)
 ):
     """現在ログインしているユーザーの情報を取得するエンドポイント"""
-    user = get_user_by_user_id(db, user_id=session_data.user_id)
+    user = await db.run(get_user_by_user_id, user_id=session_data.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="ユーザーが見つかりません")
     return user
@@ -1,5 +1,5 @@
 # src/auth/schemas.py
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, ConfigDict
 from typing import Optional
 from datetime import date, datetime
 
@@ -40,5 +40,4 @@ class UserResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True  # ORMモデルからの変換を可能に
+    model_config = ConfigDict(from_attributes=True)  # ORMモデルからの変換を可能に
@@ -9,8 +9,8 @@ import json
 from src.config.settings import settings
 from src.auth.schemas import SessionData
 
-# パスワードハッシュ化のコンテキスト
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# パスワードハッシュ化のコンテキスト（コストと異なるハッシュは needs_update で検出される）
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 # セッションの有効期限を計算する関数
 def get_session_expiry():
@@ -24,9 +24,13 @@ def get_password_hash(password):
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
+# パスワードを検証し、現在の設定で再ハッシュが必要なら新しいハッシュも返す関数
+def verify_and_update_password(plain_password, hashed_password):
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 # セッションデータをJWTに暗号化する
 def encrypt_session_data(session_data: SessionData) -> str:
-    to_encode = session_data.dict()
+    to_encode = session_data.model_dump()
     to_encode.update({"exp": get_session_expiry()})  # 有効期限を追加
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
 
@@ -0,0 +1,152 @@
+# src/cache/backends.py
+import pickle
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+class CacheBackend(ABC):
+    """キャッシュの保存先の共通インターフェース"""
+
+    @abstractmethod
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def set_many(self, items: Dict[str, Any], ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def delete_many(self, keys: Iterable[str]) -> None:
+        ...
+
+    def stats(self) -> dict:
+        return {}
+
+class InMemoryLRUCache(CacheBackend):
+    """
+    プロセス内の LRU キャッシュ（件数上限と有効期限つき）
+    上限を超えた場合は最も長く参照されていないエントリから追い出す
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (期限, 値)
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at <= now:
+                    del self._entries[key]
+                    self.expirations += 1
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = value
+        return found
+
+    def set_many(self, items: Dict[str, Any], ttl: float) -> None:
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+class InMemoryKeyValueStore:
+    """
+    外部KVS（Redis互換の mget / set / delete）のローカル用代替
+    複数ワーカーでは共有されないため、開発・テスト用に使う
+    """
+
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def mget(self, keys):
+        now = time.monotonic()
+        with self._lock:
+            values = []
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is None or (entry[0] is not None and entry[0] <= now):
+                    self._data.pop(key, None)
+                    values.append(None)
+                else:
+                    values.append(entry[1])
+            return values
+
+    def set(self, key, value, ex: Optional[float] = None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ex if ex else None, value)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+class KeyValueStoreCache(CacheBackend):
+    """
+    外部KVSを保存先にするキャッシュ（値は pickle で直列化）
+    件数上限と追い出しはKVS側の設定（maxmemory-policy など）に任せる
+    """
+
+    def __init__(self, client, prefix: str = ""):
+        self.client = client
+        self.prefix = prefix
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = self.client.mget([self.prefix + key for key in keys])
+        return {key: pickle.loads(value) for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, items: Dict[str, Any], ttl: float) -> None:
+        for key, value in items.items():
+            self.client.set(self.prefix + key, pickle.dumps(value), ex=max(1, int(ttl)))
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        keys = [self.prefix + key for key in keys]
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self) -> dict:
+        return {"backend": type(self.client).__name__}
+
+# 設定に応じてキャッシュの保存先を作成
+def create_backend(kind: str, max_entries: int, url: Optional[str] = None, prefix: str = "") -> CacheBackend:
+    if kind == "memory":
+        return InMemoryLRUCache(max_entries)
+    if kind == "kvs-local":
+        return KeyValueStoreCache(InMemoryKeyValueStore(), prefix=prefix)
+    if kind == "redis":
+        import redis  # 任意の依存関係（redis を使う場合のみ必要）
+        return KeyValueStoreCache(redis.Redis.from_url(url), prefix=prefix)
+    raise ValueError(f"未対応のキャッシュバックエンドです: {kind}")
@@ -0,0 +1,86 @@
+# src/cache/tweets.py
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+from src.config.settings import settings
+from src.cache.backends import CacheBackend, create_backend
+
+class TweetCache:
+    """
+    ツイート詳細のうち閲覧者に依存しない部分（本文、ユーザー名、各カウント）のキャッシュ
+    閲覧者ごとの is_liked などは含めない
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(tweet_id: int) -> str:
+        return f"tweet:{tweet_id}"
+
+    def get_many(self, tweet_ids: Iterable[int]) -> Tuple[Dict[int, dict], List[int]]:
+        """キャッシュ済みのツイートと、キャッシュになかったツイートIDを返す"""
+        tweet_ids = list(tweet_ids)
+        if not self.enabled:
+            return {}, tweet_ids
+
+        found = self.backend.get_many([self._key(tweet_id) for tweet_id in tweet_ids])
+        cached = {}
+        missing = []
+        for tweet_id in tweet_ids:
+            value = found.get(self._key(tweet_id))
+            if value is None:
+                missing.append(tweet_id)
+            else:
+                cached[tweet_id] = value
+
+        with self._lock:
+            self.hits += len(cached)
+            self.misses += len(missing)
+        return cached, missing
+
+    def set_many(self, tweets: Dict[int, dict]) -> None:
+        if self.enabled and tweets:
+            self.backend.set_many(
+                {self._key(tweet_id): tweet for tweet_id, tweet in tweets.items()}, self.ttl
+            )
+
+    def invalidate(self, tweet_ids: Iterable[int]) -> None:
+        """書き込み後に呼び出し、該当ツイートのキャッシュを破棄する"""
+        tweet_ids = list(tweet_ids)
+        if not self.enabled or not tweet_ids:
+            return
+        self.backend.delete_many([self._key(tweet_id) for tweet_id in tweet_ids])
+        with self._lock:
+            self.invalidations += len(tweet_ids)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            data = {
+                "enabled": self.enabled,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else None,
+                "invalidations": self.invalidations,
+            }
+        data.update(self.backend.stats())
+        return data
+
+tweet_cache = TweetCache(
+    create_backend(
+        settings.TWEET_CACHE_BACKEND,
+        max_entries=settings.TWEET_CACHE_MAX_ENTRIES,
+        url=settings.TWEET_CACHE_URL,
+        prefix="twitter_app:",
+    ),
+    ttl=settings.TWEET_CACHE_TTL_SECONDS,
+    enabled=settings.TWEET_CACHE_ENABLED,
+)
@@ -0,0 +1,27 @@
+# src/commands/rebuild_reply_tree.py
+"""
+Replies の経路（path）・階層（depth）・子リプライ数を parent_reply_id から再計算するコマンド
+
+使い方（backend ディレクトリで実行）:
+    python -m src.commands.rebuild_reply_tree [--batch-size 1000]
+"""
+import argparse
+
+from src.database.session import SessionLocal
+from src.crud.replies import rebuild_reply_tree
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="リプライの経路・階層・子リプライ数を再計算する")
+    parser.add_argument("--batch-size", type=int, default=1000, help="1回のUPDATEで処理するリプライ数")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        updated = rebuild_reply_tree(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    print(f"{updated} 件のリプライを更新しました")
+
+if __name__ == "__main__":
+    main()
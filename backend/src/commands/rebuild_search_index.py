@@ -0,0 +1,27 @@
+# src/commands/rebuild_search_index.py
+"""
+ツイート検索用の n-gram インデックス（TweetSearchTokens）を既存ツイートから作り直すコマンド
+
+使い方（backend ディレクトリで実行）:
+    python -m src.commands.rebuild_search_index [--batch-size 1000]
+"""
+import argparse
+
+from src.database.session import SessionLocal
+from src.crud.search import rebuild_search_index
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ツイート検索用のインデックスを作り直す")
+    parser.add_argument("--batch-size", type=int, default=1000, help="1回のコミットで登録するツイート数")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        indexed = rebuild_search_index(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    print(f"{indexed} 件のツイートを登録しました")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+# src/commands/reconcile_tweet_stats.py
+"""
+TweetStats のカウンターを Likes / Retweets / Bookmarks から再計算するコマンド
+
+使い方（backend ディレクトリで実行）:
+    python -m src.commands.reconcile_tweet_stats [--batch-size 1000] [--tweet-id 1 --tweet-id 2]
+"""
+import argparse
+
+from src.database.session import SessionLocal
+from src.crud.tweet_stats import reconcile_tweet_stats
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="TweetStats のカウンターを再計算する")
+    parser.add_argument("--batch-size", type=int, default=1000, help="1回のUPDATEで処理するツイート数")
+    parser.add_argument("--tweet-id", type=int, action="append", dest="tweet_ids", help="対象ツイートID（複数指定可）")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        fixed = reconcile_tweet_stats(db, tweet_ids=args.tweet_ids, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    print(f"{fixed} 件の集計行を修正しました")
+
+if __name__ == "__main__":
+    main()
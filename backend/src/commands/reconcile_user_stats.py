@@ -0,0 +1,28 @@
+# src/commands/reconcile_user_stats.py
+"""
+UserStats のカウンター（フォロワー数・フォロー数・ツイート数・いいね数）を Follows / Tweets / Likes から再計算するコマンド
+列の追加前から存在するユーザーの移行にも使用する
+
+使い方（backend ディレクトリで実行）:
+    python -m src.commands.reconcile_user_stats [--batch-size 1000]
+"""
+import argparse
+
+from src.database.session import SessionLocal
+from src.crud.user_stats import reconcile_user_stats
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="UserStats のカウンターを再計算する")
+    parser.add_argument("--batch-size", type=int, default=1000, help="1回のUPDATEで処理するユーザー数")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        fixed = reconcile_user_stats(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    print(f"{fixed} 件の集計行を修正しました")
+
+if __name__ == "__main__":
+    main()
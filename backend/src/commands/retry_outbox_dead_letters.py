@@ -0,0 +1,27 @@
+# src/commands/retry_outbox_dead_letters.py
+"""
+処理に失敗して dead になったアウトボックスのイベントを未処理に戻すコマンド（起動中のワーカーが再度処理する）
+
+使い方（backend ディレクトリで実行）:
+    python -m src.commands.retry_outbox_dead_letters [--event-id 1 --event-id 2]
+"""
+import argparse
+
+from src.database.session import SessionLocal
+from src.crud.outbox import retry_dead_events
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="dead になったアウトボックスのイベントを未処理に戻す")
+    parser.add_argument("--event-id", type=int, action="append", help="対象のイベントID（未指定の場合はすべて）")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        retried = retry_dead_events(db, event_ids=args.event_id)
+    finally:
+        db.close()
+
+    print(f"{retried} 件のイベントを未処理に戻しました")
+
+if __name__ == "__main__":
+    main()
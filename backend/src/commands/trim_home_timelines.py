@@ -0,0 +1,30 @@
+# src/commands/trim_home_timelines.py
+"""
+ホームタイムラインを HOME_TIMELINE_MAX_ENTRIES 件に切り詰めるコマンド
+配信・フォロー時の取り込みでは切り詰めないため、cron 等で定期的に実行する
+
+使い方（backend ディレクトリで実行）:
+    python -m src.commands.trim_home_timelines [--max-entries 800]
+"""
+import argparse
+
+from src.database.session import SessionLocal
+from src.models.timeline import HomeTimelineEntry
+from src.crud.timelines import trim_home_timelines
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ホームタイムラインを最大件数に切り詰める")
+    parser.add_argument("--max-entries", type=int, default=None, help="ユーザーごとに保持する件数")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user_ids = [row.user_id for row in db.query(HomeTimelineEntry.user_id).distinct()]
+        removed = trim_home_timelines(db, user_ids, max_entries=args.max_entries)
+    finally:
+        db.close()
+
+    print(f"{removed} 件のエントリを削除しました")
+
+if __name__ == "__main__":
+    main()
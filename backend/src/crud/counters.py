@@ -0,0 +1,12 @@
+# src/crud/counters.py
+from sqlalchemy import case
+
+# 非正規化カウンター（UNSIGNED 列）の加減算式
+def add_to_counter(column, delta: int):
+    """
+    減算は CASE で 0 を下限にする
+    ずれて 0 になっているカウンターを減算しても、MySQL の strict モードで範囲外エラーにならない
+    """
+    if delta >= 0:
+        return column + delta
+    return case((column > -delta, column + delta), else_=0)
@@ -0,0 +1,75 @@
+# src/crud/follows.py
+from sqlalchemy.orm import Session
+from sqlalchemy import and_
+
+from src.config.settings import settings
+from src.models.follow import Follow
+from src.models.user import User, UserStats
+from src.crud.upsert import insert_ignore
+from src.crud.user_stats import ensure_user_stats, increment_user_stat
+from src.crud.timelines import is_fanout_on_read, backfill_home_timeline, remove_author_from_timeline
+from src.crud.outbox import enqueue_event, user_aggregate_id
+from src.metrics.definitions import follows_total
+
+# フォロー中か確認
+def is_following(db: Session, follower_user_id: str, followed_user_id: str) -> bool:
+    return db.query(Follow).filter(
+        and_(Follow.follower_user_id == follower_user_id, Follow.followed_user_id == followed_user_id)
+    ).first() is not None
+
+# フォロー追加
+def follow_user(db: Session, follower_user_id: str, followed_user_id: str) -> bool:
+    if follower_user_id == followed_user_id:
+        raise ValueError("自分自身をフォローすることはできません")
+    
+    # フォロー対象の存在確認
+    target = db.query(User.user_id).filter(User.user_id == followed_user_id).first()
+    if not target:
+        return False
+    
+    # フォロー追加（同時に同じフォローが来ても重複は無視し、実際に追加できた場合のみカウンターを更新）
+    added = db.execute(
+        insert_ignore(db, Follow).values(follower_user_id=follower_user_id, followed_user_id=followed_user_id)
+    ).rowcount
+    if not added:
+        db.rollback()
+        return True  # 既にフォローしていた場合は成功とみなす
+    
+    # フォロー数・フォロワー数の更新
+    ensure_user_stats(db, [follower_user_id, followed_user_id])
+    increment_user_stat(db, follower_user_id, "following_count", 1)
+    increment_user_stat(db, followed_user_id, "follower_count", 1)
+    
+    # 書き込み時配信の対象ユーザーであれば直近ツイートをタイムラインに取り込む
+    if not is_fanout_on_read(db, followed_user_id):
+        backfill_home_timeline(db, follower_user_id, followed_user_id)
+    
+    db.commit()
+    follows_total.inc(action="follow")
+    return True
+
+# フォロー解除
+def unfollow_user(db: Session, follower_user_id: str, followed_user_id: str) -> bool:
+    deleted = db.query(Follow).filter(
+        and_(Follow.follower_user_id == follower_user_id, Follow.followed_user_id == followed_user_id)
+    ).delete(synchronize_session=False)
+    
+    if not deleted:
+        return False
+    
+    # 実際に削除できた場合のみカウンターを減算し、タイムラインから相手のツイートを除く
+    increment_user_stat(db, follower_user_id, "following_count", -1)
+    increment_user_stat(db, followed_user_id, "follower_count", -1)
+    remove_author_from_timeline(db, follower_user_id, followed_user_id)
+    
+    # フォロワー数が閾値を下回った場合は、読み込み時に合成していた間のツイートを残りのフォロワーに配信する
+    # （カウンターの UPDATE で行ロックを取っているため、同時にアンフォローされても1回だけ記録される）
+    follower_count = db.query(UserStats.follower_count)\
+        .filter(UserStats.user_id == followed_user_id)\
+        .scalar()
+    if follower_count == settings.FANOUT_FOLLOWER_THRESHOLD - 1:
+        enqueue_event(db, "fanout_on_write_restored", user_aggregate_id(followed_user_id), {"user_id": followed_user_id})
+    
+    db.commit()
+    follows_total.inc(action="unfollow")
+    return True
@@ -0,0 +1,66 @@
+# src/crud/impressions.py
+from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, func, select, update
+from typing import Dict, Optional, Tuple
+
+from src.models.tweet import Tweet, TweetImpressions
+from src.crud.upsert import insert_ignore
+from src.tweets.hyperloglog import HyperLogLog
+
+# プロセス内で集計した表示回数をまとめて加算
+def flush_impressions(db: Session, changes: Dict[int, Tuple[int, Optional[HyperLogLog]]]) -> int:
+    """
+    changes は tweet_id -> (表示回数の増分, 閲覧者のスケッチ（重複排除しない場合は None）)
+    1. 集計行のないツイートの行を INSERT IGNORE ... SELECT で1文で作成（削除済みのツイートは対象外）
+    2. 保存済みのスケッチを行ロックを取って読み、プロセス内のスケッチと合算（複数ワーカーの同時書き込みで値を失わない）
+    3. 表示回数の加算とスケッチの書き戻しを executemany の UPDATE 1回で行う
+    全体で1トランザクション。戻り値は更新したツイート数
+    """
+    if not changes:
+        return 0
+    tweet_ids = sorted(changes)  # ロック順を揃える
+
+    db.execute(
+        insert_ignore(db, TweetImpressions).from_select(
+            ["tweet_id"], select(Tweet.tweet_id).where(Tweet.tweet_id.in_(tweet_ids))
+        )
+    )
+    stored = dict(db.execute(
+        select(TweetImpressions.tweet_id, TweetImpressions.viewer_sketch)
+        .where(TweetImpressions.tweet_id.in_(tweet_ids))
+        .order_by(TweetImpressions.tweet_id)
+        .with_for_update()
+    ).all())
+    if not stored:
+        db.commit()
+        return 0
+
+    params = []
+    for tweet_id in sorted(stored):
+        views, viewers = changes[tweet_id]
+        sketch, unique_viewers = stored[tweet_id], None
+        if viewers is not None:
+            merged = HyperLogLog(registers=sketch)
+            merged.merge(viewers)
+            sketch, unique_viewers = merged.to_bytes(), merged.estimate()
+        params.append({
+            "b_tweet_id": tweet_id,
+            "b_views": views,
+            "b_sketch": sketch,
+            "b_unique_viewers": unique_viewers,
+        })
+
+    # スケッチを更新しない行は unique_viewers も据え置く（テーブルに対する UPDATE で executemany にする）
+    table = TweetImpressions.__table__
+    db.execute(
+        update(table)
+        .where(table.c.tweet_id == bindparam("b_tweet_id"))
+        .values(
+            view_count=table.c.view_count + bindparam("b_views"),
+            viewer_sketch=bindparam("b_sketch"),
+            unique_viewers=func.coalesce(bindparam("b_unique_viewers"), table.c.unique_viewers),
+        ),
+        params,
+    )
+    db.commit()
+    return len(params)
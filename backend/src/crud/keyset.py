@@ -0,0 +1,16 @@
+# src/crud/keyset.py
+from sqlalchemy import or_, and_
+from typing import Tuple
+from datetime import datetime
+
+# キーセットページネーションの条件（(created_at, id) < カーソル位置）
+def keyset_before(cursor: Tuple[datetime, int], created_at_column, id_column):
+    """
+    行値比較 (created_at, id) < (...) と同値の条件を、
+    (created_at, id) インデックスのレンジスキャンになる形で組み立てる
+    """
+    created_at, item_id = cursor
+    return or_(
+        created_at_column < created_at,
+        and_(created_at_column == created_at, id_column < item_id)
+    )
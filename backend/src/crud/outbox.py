@@ -0,0 +1,203 @@
+# src/crud/outbox.py
+import json
+import math
+import logging
+import time
+import zlib
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, insert, or_, update
+from typing import Iterable, List, Optional, Tuple
+
+from src.config.settings import settings
+from src.models.outbox import OutboxEvent, OutboxLease, OutboxWorkerHeartbeat
+from src.crud.upsert import insert_ignore
+from src.outbox.handlers import HANDLERS
+
+logger = logging.getLogger(__name__)
+
+# 現在時刻（エポックミリ秒）
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+# ユーザー単位のイベントの aggregate_id（user_id の CRC32。同じユーザーのイベントは同じパーティションで順に処理する）
+def user_aggregate_id(user_id: str) -> int:
+    return zlib.crc32(user_id.encode("utf-8"))
+
+# 副作用のイベントを記録（書き込みと同じトランザクションで呼び出し、コミットは呼び出し元で行う）
+def enqueue_event(db: Session, event_type: str, aggregate_id: int, payload: Optional[dict] = None) -> None:
+    """
+    aggregate_id が同じイベントは記録した順に処理される
+    OUTBOX_ENABLED=false の場合はその場でハンドラーを実行する（従来どおり書き込みと同じトランザクションで反映）
+    """
+    if event_type not in HANDLERS:
+        raise ValueError(f"未対応のイベント種別です: {event_type}")
+    if not settings.OUTBOX_ENABLED:
+        HANDLERS[event_type](db, aggregate_id, payload or {})
+        return
+    now = now_ms()
+    db.execute(insert(OutboxEvent).values(
+        event_type=event_type,
+        aggregate_id=aggregate_id,
+        partition_no=aggregate_id % settings.OUTBOX_PARTITIONS,
+        payload=json.dumps(payload or {}),
+        created_at_ms=now,
+        available_at_ms=now,
+    ))
+
+# 処理するパーティションの排他を取得・延長し、保持しているパーティションを返す
+def acquire_partitions(db: Session, owner: str, partitions: int, lease_ms: int) -> List[int]:
+    """
+    稼働中のプロセス数で割った件数（切り上げ）までを担当し、不足分だけ期限切れのパーティションを取得する
+    担当数を超えて保持しているパーティションは延長せず、期限切れ後に他のプロセスが引き継ぐ
+    （処理中のバッチと重ならないよう、その場では手放さない）
+    他のプロセスが保持しているパーティションは期限が切れるまで処理しない
+    """
+    now = now_ms()
+    expires_at_ms = now + lease_ms
+    
+    # 自分の生存を記録し、稼働中のプロセス数から担当数を決める（停止したプロセスの行は削除する）
+    db.execute(delete(OutboxWorkerHeartbeat).where(OutboxWorkerHeartbeat.expires_at_ms < now))
+    db.execute(insert_ignore(db, OutboxWorkerHeartbeat).values(owner=owner, expires_at_ms=expires_at_ms))
+    db.execute(
+        update(OutboxWorkerHeartbeat)
+        .where(OutboxWorkerHeartbeat.owner == owner)
+        .values(expires_at_ms=expires_at_ms)
+    )
+    live_owners = db.query(func.count(OutboxWorkerHeartbeat.owner)).scalar()
+    share = math.ceil(partitions / max(live_owners, 1))
+    
+    db.execute(
+        insert_ignore(db, OutboxLease).values([
+            {"partition_no": partition_no, "owner": "", "expires_at_ms": 0} for partition_no in range(partitions)
+        ])
+    )
+    held = [
+        partition_no for partition_no, in
+        db.query(OutboxLease.partition_no)
+        .filter(OutboxLease.partition_no < partitions)
+        .filter(OutboxLease.owner == owner, OutboxLease.expires_at_ms >= now)
+        .order_by(OutboxLease.partition_no)
+        .all()
+    ]
+    claim = held[:share]
+    if len(claim) < share:
+        claim += [
+            partition_no for partition_no, in
+            db.query(OutboxLease.partition_no)
+            .filter(OutboxLease.partition_no < partitions, OutboxLease.expires_at_ms < now)
+            .order_by(OutboxLease.partition_no)
+            .limit(share - len(claim))
+            .all()
+        ]
+    
+    # 同時に他のプロセスが取得した場合は条件に一致せず更新されない
+    if claim:
+        db.execute(
+            update(OutboxLease)
+            .where(OutboxLease.partition_no.in_(claim))
+            .where(or_(OutboxLease.owner == owner, OutboxLease.expires_at_ms < now))
+            .values(owner=owner, expires_at_ms=expires_at_ms)
+        )
+    db.commit()
+    return [
+        partition_no for partition_no, in
+        db.query(OutboxLease.partition_no)
+        .filter(OutboxLease.owner == owner, OutboxLease.expires_at_ms == expires_at_ms)
+        .order_by(OutboxLease.partition_no)
+        .all()
+    ]
+
+# 保持しているパーティションを手放す（終了時）
+def release_partitions(db: Session, owner: str) -> None:
+    db.execute(update(OutboxLease).where(OutboxLease.owner == owner).values(owner="", expires_at_ms=0))
+    db.execute(delete(OutboxWorkerHeartbeat).where(OutboxWorkerHeartbeat.owner == owner))
+    db.commit()
+
+# 再試行までの待ち時間（指数バックオフ）
+def retry_delay_ms(attempts: int) -> int:
+    return int(min(settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.OUTBOX_RETRY_MAX_SECONDS) * 1000)
+
+# パーティションの未処理イベントを古い順に処理
+def process_outbox_batch(db: Session, partition_no: int, batch_size: int, max_attempts: int) -> List[Tuple[str, str, float]]:
+    """
+    最大 batch_size 件を event_id 順に取り出し、1件ずつハンドラーの実行とイベント行の削除を1トランザクションで行う
+    失敗したイベントは待ち時間を置いて再試行し、max_attempts 回失敗したら dead にする（デッドレター）
+    失敗・待機中のイベントがある aggregate_id の後続イベントは、順序を保つためこのバッチでは処理しない
+    戻り値は処理したイベントごとの (種別, success / retry / dead, 記録から処理までの秒数)
+    """
+    events = (
+        db.query(OutboxEvent)
+        .filter(OutboxEvent.partition_no == partition_no, OutboxEvent.status == "pending")
+        .order_by(OutboxEvent.event_id)
+        .limit(batch_size)
+        .all()
+    )
+    db.expunge_all()  # 以降のコミット・ロールバックで読み直さない
+    db.commit()
+
+    results = []
+    blocked = set()
+    for event in events:
+        if event.aggregate_id in blocked:
+            continue
+        now = now_ms()
+        if event.available_at_ms > now:
+            blocked.add(event.aggregate_id)
+            continue
+        lag = (now - event.created_at_ms) / 1000
+        try:
+            # 削除できなかった場合は他のプロセスが処理済み
+            deleted = db.execute(
+                delete(OutboxEvent)
+                .where(OutboxEvent.event_id == event.event_id, OutboxEvent.status == "pending")
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not deleted:
+                db.rollback()
+                continue
+            HANDLERS[event.event_type](db, event.aggregate_id, json.loads(event.payload))
+            db.commit()
+            results.append((event.event_type, "success", lag))
+        except Exception as e:
+            db.rollback()
+            attempts = event.attempts + 1
+            dead = attempts >= max_attempts
+            db.execute(
+                update(OutboxEvent)
+                .where(OutboxEvent.event_id == event.event_id)
+                .values(
+                    attempts=attempts,
+                    status="dead" if dead else "pending",
+                    last_error=repr(e)[:2000],
+                    available_at_ms=now_ms() + retry_delay_ms(attempts),
+                )
+            )
+            db.commit()
+            if dead:
+                logger.error("イベント %d（%s）の処理を %d 回失敗したため中止しました: %r", event.event_id, event.event_type, attempts, e)
+            else:
+                blocked.add(event.aggregate_id)
+                logger.warning("イベント %d（%s）の処理に失敗しました（%d 回目）: %r", event.event_id, event.event_type, attempts, e)
+            results.append((event.event_type, "dead" if dead else "retry", lag))
+    return results
+
+# 未処理・デッドレターの件数と、最も古い未処理イベントの経過秒数
+def get_outbox_status(db: Session) -> dict:
+    counts = dict(
+        db.query(OutboxEvent.status, func.count()).group_by(OutboxEvent.status).all()
+    )
+    oldest = db.query(func.min(OutboxEvent.created_at_ms)).filter(OutboxEvent.status == "pending").scalar()
+    return {
+        "pending": counts.get("pending", 0),
+        "dead": counts.get("dead", 0),
+        "oldest_pending_seconds": (now_ms() - oldest) / 1000 if oldest else None,
+    }
+
+# デッドレターを未処理に戻す
+def retry_dead_events(db: Session, event_ids: Optional[Iterable[int]] = None) -> int:
+    query = update(OutboxEvent).where(OutboxEvent.status == "dead")
+    if event_ids:
+        query = query.where(OutboxEvent.event_id.in_(list(event_ids)))
+    retried = db.execute(query.values(status="pending", attempts=0, available_at_ms=now_ms())).rowcount
+    db.commit()
+    return retried
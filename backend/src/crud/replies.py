@@ -1,11 +1,37 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, desc, case
-from typing import List, Optional, Tuple
+from sqlalchemy import func, and_, desc, select, update, union_all
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
 
 from src.models.reply import Reply
 from src.models.user import User
 from src.models.tweet import Tweet
 from src.replies.schemas import ReplyCreate
+from src.crud.keyset import keyset_before
+from src.crud.tweet_stats import touch_reply_version
+from src.metrics.definitions import replies_created_total
+from src.trending.tracker import trending_tracker
+
+# 経路の区切り文字
+PATH_SEPARATOR = "/"
+
+# リプライの経路（祖先のリプライIDの連結）を作成
+def build_reply_path(parent_path: Optional[str], reply_id: int) -> str:
+    return f"{parent_path or ''}{reply_id}{PATH_SEPARATOR}"
+
+# リプライとユーザー名をレスポンス用の辞書に整形
+def _format_reply(reply: Reply, user_name: str) -> dict:
+    return {
+        "reply_id": reply.reply_id,
+        "user_id": reply.user_id,
+        "user_name": user_name,
+        "tweet_id": reply.tweet_id,
+        "parent_reply_id": reply.parent_reply_id,
+        "reply_content": reply.reply_content,
+        "created_at": reply.created_at,
+        "updated_at": reply.updated_at,
+        "child_reply_count": reply.child_reply_count
+    }
 
 # ツイートに対するリプライ一覧を取得
 def get_replies_for_tweet(
@@ -29,8 +55,7 @@ def get_replies_for_tweet(
         .join(User, Reply.user_id == User.user_id)
         .filter(Reply.tweet_id == tweet_id)
         .filter(Reply.parent_reply_id == parent_reply_id)
-        .group_by(Reply.reply_id, User.user_name)
-        .order_by(desc(Reply.created_at))
+        .order_by(desc(Reply.created_at), desc(Reply.reply_id))
     )
     
     # 総リプライ数の取得
@@ -42,28 +67,94 @@ def get_replies_for_tweet(
     # ページネーション適用
     replies_with_user = query.offset(skip).limit(limit).all()
     
-    # 結果をリストに整形
-    result = []
-    for reply, user_name in replies_with_user:
-        # 子リプライの数を個別に取得
-        child_reply_count = db.query(func.count(Reply.reply_id))\
-            .filter(Reply.parent_reply_id == reply.reply_id)\
-            .scalar()
-        
-        result.append({
-            "reply_id": reply.reply_id,
-            "user_id": reply.user_id,
-            "user_name": user_name,
-            "tweet_id": reply.tweet_id,
-            "parent_reply_id": reply.parent_reply_id,
-            "reply_content": reply.reply_content,
-            "created_at": reply.created_at,
-            "updated_at": reply.updated_at,
-            "child_reply_count": child_reply_count
-        })
+    # 結果をリストに整形（子リプライ数は Replies.child_reply_count のカウンターを使用）
+    result = [_format_reply(reply, user_name) for reply, user_name in replies_with_user]
     
     return result, total
 
+# リプライスレッドを階層ごとに取得
+def get_reply_thread(
+    db: Session,
+    tweet_id: int,
+    root_reply_id: Optional[int] = None,
+    depth: int = 3,
+    limit: int = 20,
+    child_limit: int = 5,
+    max_nodes: int = 500,
+    cursor: Optional[Tuple[datetime, int]] = None
+) -> Tuple[List[dict], Optional[Tuple[datetime, int]]]:
+    """
+    root_reply_id の直下（None の場合はツイートへの直接リプライ）から depth 階層分のリプライを木構造で返す
+    最上位は limit 件ずつカーソルでページングし、それより下の階層は親ごとに新しい順で child_limit 件まで含める
+    返すリプライは合計 max_nodes 件までで、浅い階層を優先する
+    クエリ数は階層数に比例し、リプライの総数には依存しない
+    戻り値は (リプライの木, 最上位の次ページの起点 (created_at, reply_id))
+    """
+    if root_reply_id is not None:
+        root = db.query(Reply.tweet_id).filter(Reply.reply_id == root_reply_id).first()
+        if not root or root.tweet_id != tweet_id:
+            raise ValueError("リプライが存在しないか、指定されたツイートに属していません")
+    
+    # 最上位の階層（キーセットページネーション）
+    page_size = min(limit, max_nodes)
+    top = db.query(Reply.reply_id, Reply.created_at)\
+        .filter(Reply.tweet_id == tweet_id)\
+        .filter(Reply.parent_reply_id == root_reply_id)
+    if cursor:
+        top = top.filter(keyset_before(cursor, Reply.created_at, Reply.reply_id))
+    top = top.order_by(desc(Reply.created_at), desc(Reply.reply_id)).limit(page_size).all()
+    
+    # max_nodes で件数を絞った場合も、返した最後のリプライから続きを取得できるようにする
+    next_position = None
+    if len(top) == page_size:
+        next_position = (top[-1].created_at, top[-1].reply_id)
+    
+    # 下の階層は親ごとに LIMIT child_limit の SELECT を UNION ALL して1階層1クエリで取得
+    # （読み込む行数は 親の数 × child_limit までで、スレッド全体の大きさには依存しない）
+    levels = [[row.reply_id for row in top]]
+    remaining = max_nodes - len(levels[0])
+    while len(levels) < depth and levels[-1] and remaining > 0:
+        per_parent = [
+            select(Reply.reply_id, Reply.parent_reply_id, Reply.created_at)
+            .where(Reply.tweet_id == tweet_id, Reply.parent_reply_id == parent_id)
+            .order_by(desc(Reply.created_at), desc(Reply.reply_id))
+            .limit(child_limit)
+            .subquery()
+            for parent_id in levels[-1]
+        ]
+        rows = db.execute(union_all(*[select(subquery) for subquery in per_parent])).all()
+        
+        # 親の並び順、同じ親の中では新しい順に並べ、残り件数分だけ採用
+        order = {parent_id: index for index, parent_id in enumerate(levels[-1])}
+        rows.sort(key=lambda row: (row.created_at, row.reply_id), reverse=True)
+        rows.sort(key=lambda row: order[row.parent_reply_id])
+        levels.append([row.reply_id for row in rows[:remaining]])
+        remaining -= len(levels[-1])
+    reply_ids = [reply_id for level in levels for reply_id in level]
+    
+    # 本文とユーザー名をまとめて取得し、木構造に組み立てる
+    if not reply_ids:
+        return [], next_position
+    
+    rows = (
+        db.query(Reply, User.user_name)
+        .join(User, Reply.user_id == User.user_id)
+        .filter(Reply.reply_id.in_(reply_ids))
+        .all()
+    )
+    nodes: Dict[int, dict] = {
+        reply.reply_id: {**_format_reply(reply, user_name), "replies": []}
+        for reply, user_name in rows
+    }
+    for level in levels[1:]:
+        for reply_id in level:
+            node = nodes.get(reply_id)
+            parent = nodes.get(node["parent_reply_id"]) if node else None
+            if parent:
+                parent["replies"].append(node)
+    
+    return [nodes[reply_id] for reply_id in levels[0] if reply_id in nodes], next_position
+
 # リプライを取得（ID指定）
 def get_reply(db: Session, reply_id: int) -> Optional[dict]:
     reply_data = (
@@ -78,22 +169,7 @@ def get_reply(db: Session, reply_id: int) -> Optional[dict]:
     
     reply, user_name = reply_data
     
-    # 子リプライの数を取得
-    child_reply_count = db.query(func.count(Reply.reply_id))\
-        .filter(Reply.parent_reply_id == reply_id)\
-        .scalar()
-    
-    return {
-        "reply_id": reply.reply_id,
-        "user_id": reply.user_id,
-        "user_name": user_name,
-        "tweet_id": reply.tweet_id,
-        "parent_reply_id": reply.parent_reply_id,
-        "reply_content": reply.reply_content,
-        "created_at": reply.created_at,
-        "updated_at": reply.updated_at,
-        "child_reply_count": child_reply_count
-    }
+    return _format_reply(reply, user_name)
 
 # リプライを作成
 def create_reply(
@@ -103,6 +179,7 @@ def create_reply(
     user_id: str
 ) -> Reply:
     # 親リプライがある場合、存在確認
+    parent_reply = None
     if reply.parent_reply_id:
         parent_reply = db.query(Reply).filter(Reply.reply_id == reply.parent_reply_id).first()
         if not parent_reply or parent_reply.tweet_id != tweet_id:
@@ -118,12 +195,30 @@ def create_reply(
         user_id=user_id,
         tweet_id=tweet_id,
         parent_reply_id=reply.parent_reply_id,
-        reply_content=reply.reply_content
+        reply_content=reply.reply_content,
+        depth=parent_reply.depth + 1 if parent_reply else 0
     )
     
     db.add(db_reply)
+    db.flush()
+    
+    # 採番されたIDで経路を確定し、親リプライの子リプライ数を加算
+    db_reply.path = build_reply_path(parent_reply.path if parent_reply else None, db_reply.reply_id)
+    if len(db_reply.path) > Reply.path.type.length:
+        db.rollback()
+        raise ValueError("リプライの階層が深すぎます")
+    if parent_reply:
+        db.execute(
+            update(Reply)
+            .where(Reply.reply_id == parent_reply.reply_id)
+            .values(child_reply_count=Reply.child_reply_count + 1)
+            .execution_options(synchronize_session=False)
+        )
+    touch_reply_version(db, tweet_id)
     db.commit()
     db.refresh(db_reply)
+    replies_created_total.inc()
+    trending_tracker.record(tweet_id, "reply")
     
     return db_reply
 
@@ -137,8 +232,73 @@ def delete_reply(db: Session, reply_id: int, user_id: str) -> bool:
     if not reply:
         return False
     
-    # リプライを削除（カスケード削除で子リプライも削除される）
-    db.delete(reply)
+    # 経路の前方一致で子孫のリプライもまとめて削除
+    if reply.path:
+        db.query(Reply).filter(Reply.path.startswith(reply.path, autoescape=True))\
+            .delete(synchronize_session=False)
+    else:
+        db.delete(reply)  # 経路が未設定（rebuild_reply_paths 実行前）の場合は本人のみ削除
+    
+    # 親リプライの子リプライ数を減算
+    if reply.parent_reply_id:
+        db.execute(
+            update(Reply)
+            .where(Reply.reply_id == reply.parent_reply_id)
+            .values(child_reply_count=Reply.child_reply_count - 1)
+            .execution_options(synchronize_session=False)
+        )
+    touch_reply_version(db, reply.tweet_id)
     db.commit()
     
     return True
+
+# 既存のリプライの経路・階層・子リプライ数を再計算
+def rebuild_reply_tree(db: Session, batch_size: int = 1000) -> int:
+    """
+    parent_reply_id をもとに Replies.path / depth / child_reply_count を計算し直す
+    （列を追加する前から存在するリプライの移行や、ずれの修正に使用）
+    戻り値は更新した行数
+    """
+    parents = dict(db.query(Reply.reply_id, Reply.parent_reply_id).order_by(Reply.reply_id).all())
+    
+    paths: Dict[int, str] = {}
+    depths: Dict[int, int] = {}
+    child_counts: Dict[int, int] = {reply_id: 0 for reply_id in parents}
+    
+    # 親を先に処理する（親が削除済みの場合はツイートへの直接リプライとして扱う）
+    def resolve(reply_id: int) -> None:
+        chain = []
+        while reply_id not in paths:
+            chain.append(reply_id)
+            parent_id = parents[reply_id]
+            if parent_id is None or parent_id not in parents:
+                break
+            reply_id = parent_id
+        for current in reversed(chain):
+            parent_id = parents[current]
+            parent_path = paths.get(parent_id) if parent_id is not None else None
+            paths[current] = build_reply_path(parent_path, current)
+            depths[current] = depths[parent_id] + 1 if parent_path else 0
+    
+    for reply_id, parent_id in parents.items():
+        resolve(reply_id)
+        if parent_id in child_counts:
+            child_counts[parent_id] += 1
+    
+    reply_ids = list(parents)
+    for i in range(0, len(reply_ids), batch_size):
+        db.execute(
+            update(Reply),
+            [
+                {
+                    "reply_id": reply_id,
+                    "path": paths[reply_id],
+                    "depth": depths[reply_id],
+                    "child_reply_count": child_counts[reply_id],
+                }
+                for reply_id in reply_ids[i:i + batch_size]
+            ]
+        )
+        db.commit()
+    
+    return len(reply_ids)
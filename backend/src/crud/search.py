@@ -0,0 +1,132 @@
+# src/crud/search.py
+import unicodedata
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import desc, delete
+from typing import List, Optional, Set, Tuple
+from datetime import datetime
+
+from src.models.tweet import Tweet
+from src.models.search import TweetSearchToken
+from src.crud.keyset import keyset_before
+from src.crud.upsert import insert_ignore
+
+# 文字列を検索用に正規化（全角・半角の統一と小文字化）
+def normalize_text(text: str) -> str:
+    return unicodedata.normalize("NFKC", text).lower()
+
+# 本文をインデックス用のトークン集合に分割
+def tokenize(text: str) -> Set[str]:
+    """
+    空白で区切った各語の2文字ずつ（bigram）と、語の末尾1文字をトークンにする
+    末尾1文字を含めることで、1文字の検索語も前方一致で探せる
+    """
+    tokens = set()
+    for word in normalize_text(text).split():
+        tokens.update(word[i:i + 2] for i in range(len(word) - 1))
+        tokens.add(word[-1])
+    return tokens
+
+# 検索語を正規化して分割（空白区切りで AND 条件）
+def parse_query(query: str) -> List[str]:
+    return list(dict.fromkeys(normalize_text(query).split()))
+
+# ツイートをインデックスに追加（コミットは呼び出し元で行う）
+def index_tweet(db: Session, tweet_id: int, tweet_content: str, created_at: datetime) -> None:
+    """
+    インデックスの再構築とアウトボックスからの登録が重なることがあるため、既にあるトークンは無視する
+    """
+    tokens = tokenize(tweet_content)
+    if tokens:
+        db.execute(
+            insert_ignore(db, TweetSearchToken),
+            [{"token": token, "tweet_id": tweet_id, "created_at": created_at} for token in tokens]
+        )
+
+# ツイートをインデックスから削除（コミットは呼び出し元で行う）
+def unindex_tweet(db: Session, tweet_id: int) -> None:
+    db.execute(delete(TweetSearchToken).where(TweetSearchToken.tweet_id == tweet_id))
+
+# 検索語の条件を満たす候補ツイートを新しい順に取得
+def search_candidates(
+    db: Session,
+    terms: List[str],
+    limit: int,
+    cursor: Optional[Tuple[datetime, int]] = None
+) -> List[Tuple[int, datetime]]:
+    """
+    各検索語のトークンをすべて含むツイートを (tweet_id, created_at) で返す
+    1つのトークンの索引を新しい順に辿り、残りのトークンは (token, tweet_id) の主キーで存在確認する
+    bigram の一致のみで判定するため、本文に検索語が連続して現れない候補も含まれる
+    """
+    bigrams = []
+    prefixes = []  # 1文字の検索語（そのトークンで始まるトークンを持つツイート）
+    for term in terms:
+        if len(term) == 1:
+            prefixes.append(term)
+        else:
+            bigrams.extend(term[i:i + 2] for i in range(len(term) - 1))
+    bigrams = list(dict.fromkeys(bigrams))
+    
+    if bigrams:
+        driver = bigrams.pop(0)
+        driving_condition = TweetSearchToken.token == driver
+    else:
+        driver = prefixes.pop(0)
+        driving_condition = TweetSearchToken.token.startswith(driver, autoescape=True)
+    
+    query = db.query(TweetSearchToken.tweet_id, TweetSearchToken.created_at).filter(driving_condition)
+    for token in bigrams:
+        other = aliased(TweetSearchToken)
+        query = query.filter(
+            db.query(other.tweet_id)
+            .filter(other.token == token, other.tweet_id == TweetSearchToken.tweet_id)
+            .exists()
+        )
+    for prefix in prefixes:
+        other = aliased(TweetSearchToken)
+        query = query.filter(
+            db.query(other.tweet_id)
+            .filter(other.token.startswith(prefix, autoescape=True), other.tweet_id == TweetSearchToken.tweet_id)
+            .exists()
+        )
+    if cursor:
+        query = query.filter(keyset_before(cursor, TweetSearchToken.created_at, TweetSearchToken.tweet_id))
+    
+    # 1文字の検索語を起点にした場合は同じツイートが複数回現れるため重複を除く
+    rows = query.distinct()\
+        .order_by(desc(TweetSearchToken.created_at), desc(TweetSearchToken.tweet_id))\
+        .limit(limit)\
+        .all()
+    return [(tweet_id, created_at) for tweet_id, created_at in rows]
+
+# 本文に全ての検索語が含まれるか
+def matches_terms(tweet_content: str, terms: List[str]) -> bool:
+    content = normalize_text(tweet_content)
+    return all(term in content for term in terms)
+
+# 既存ツイートからインデックスを作り直す
+def rebuild_search_index(db: Session, batch_size: int = 1000) -> int:
+    """
+    インデックスを全削除し、tweet_id 順に batch_size 件ずつ再登録する
+    戻り値は登録したツイート数
+    """
+    db.execute(delete(TweetSearchToken))
+    db.commit()
+    
+    indexed = 0
+    last_id = 0
+    while True:
+        tweets = db.query(Tweet.tweet_id, Tweet.tweet_content, Tweet.created_at)\
+            .filter(Tweet.tweet_id > last_id)\
+            .order_by(Tweet.tweet_id)\
+            .limit(batch_size)\
+            .all()
+        if not tweets:
+            break
+        for tweet_id, tweet_content, created_at in tweets:
+            index_tweet(db, tweet_id, tweet_content, created_at)
+        db.commit()
+        indexed += len(tweets)
+        last_id = tweets[-1].tweet_id
+    
+    return indexed
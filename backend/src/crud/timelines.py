@@ -0,0 +1,185 @@
+# src/crud/timelines.py
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete, desc, literal, union_all, and_, true
+from typing import Iterable, List, Optional, Tuple
+from datetime import datetime
+
+from src.config.settings import settings
+from src.models.tweet import Tweet
+from src.models.follow import Follow
+from src.models.timeline import HomeTimelineEntry
+from src.models.user import UserStats
+from src.crud.keyset import keyset_before
+from src.crud.upsert import insert_ignore
+
+TIMELINE_COLUMNS = ["user_id", "tweet_id", "author_user_id", "created_at"]
+
+# フォロワー数が閾値以上（読み込み時に合成する）ユーザーかどうか
+def is_fanout_on_read(db: Session, user_id: str) -> bool:
+    follower_count = db.query(UserStats.follower_count)\
+        .filter(UserStats.user_id == user_id)\
+        .scalar()
+    return (follower_count or 0) >= settings.FANOUT_FOLLOWER_THRESHOLD
+
+# 新しいツイートをフォロワーのホームタイムラインへ配信（fan-out-on-write）
+def fan_out_tweet(
+    db: Session,
+    tweet_id: int,
+    author_user_id: str,
+    to_author: bool = True,
+    to_followers: bool = True
+) -> None:
+    """
+    投稿者自身と、全フォロワーのタイムラインに1回の INSERT ... SELECT で追加する
+    フォロワー数が閾値以上の投稿者は自身のタイムラインにのみ追加し、
+    フォロワー側では読み込み時に合成する（コミットは呼び出し元で行う）
+    フォロワーへの配信はアウトボックスから遅れて行われ、フォロー時の取り込みと重なることがあるため重複は無視する
+    """
+    sources = []
+    if to_author:
+        sources.append(
+            select(Tweet.user_id, Tweet.tweet_id, Tweet.user_id, Tweet.created_at)
+            .where(Tweet.tweet_id == tweet_id)
+        )
+
+    if to_followers and not is_fanout_on_read(db, author_user_id):
+        sources.append(
+            select(Follow.follower_user_id, Tweet.tweet_id, Tweet.user_id, Tweet.created_at)
+            .join(Tweet, and_(Tweet.tweet_id == tweet_id, Tweet.user_id == Follow.followed_user_id))
+            .where(Follow.follower_user_id != author_user_id)
+        )
+
+    if sources:
+        db.execute(
+            insert_ignore(db, HomeTimelineEntry).from_select(TIMELINE_COLUMNS, union_all(*sources))
+        )
+
+# フォローした相手の直近ツイートをタイムラインに取り込む
+def backfill_home_timeline(db: Session, user_id: str, author_user_id: str) -> None:
+    """
+    アウトボックスからの配信と同時に同じツイートを取り込むことがあるため、既にあるエントリは無視する
+    （コミットは呼び出し元で行う）
+    """
+    recent = (
+        select(literal(user_id), Tweet.tweet_id, Tweet.user_id, Tweet.created_at)
+        .where(Tweet.user_id == author_user_id)
+        .order_by(desc(Tweet.created_at), desc(Tweet.tweet_id))
+        .limit(settings.HOME_TIMELINE_BACKFILL)
+    )
+    db.execute(insert_ignore(db, HomeTimelineEntry).from_select(TIMELINE_COLUMNS, recent))
+
+# 読み込み時の合成から書き込み時配信に戻ったユーザーの直近ツイートを全フォロワーのタイムラインに取り込む
+def backfill_followers_timelines(db: Session, author_user_id: str) -> int:
+    """
+    フォロワー数が閾値以上だった間のツイートはフォロワーのタイムラインに配信されていないため、
+    閾値を下回った時点でフォロー時と同じ件数を1回の INSERT ... SELECT で取り込む（既にあるエントリは無視する）
+    戻り値は追加したエントリ数（コミットは呼び出し元で行う）
+    """
+    recent = (
+        select(Tweet.tweet_id, Tweet.user_id, Tweet.created_at)
+        .where(Tweet.user_id == author_user_id)
+        .order_by(desc(Tweet.created_at), desc(Tweet.tweet_id))
+        .limit(settings.HOME_TIMELINE_BACKFILL)
+        .subquery()
+    )
+    entries = (
+        select(Follow.follower_user_id, recent.c.tweet_id, recent.c.user_id, recent.c.created_at)
+        .join(recent, true())
+        .where(Follow.followed_user_id == author_user_id)
+    )
+    return db.execute(
+        insert_ignore(db, HomeTimelineEntry).from_select(TIMELINE_COLUMNS, entries)
+    ).rowcount
+
+# アンフォローした相手のツイートをタイムラインから取り除く
+def remove_author_from_timeline(db: Session, user_id: str, author_user_id: str) -> None:
+    db.execute(
+        delete(HomeTimelineEntry).where(
+            HomeTimelineEntry.user_id == user_id,
+            HomeTimelineEntry.author_user_id == author_user_id
+        )
+    )
+
+# タイムラインを最大件数に切り詰める
+def trim_home_timelines(db: Session, user_ids: Iterable[str], max_entries: Optional[int] = None) -> int:
+    """
+    ユーザーごとに max_entries 件目より古いエントリを削除する
+    書き込み時には切り詰めないため、trim_home_timelines コマンドを定期的に実行する
+    戻り値は削除した件数
+    """
+    max_entries = max_entries or settings.HOME_TIMELINE_MAX_ENTRIES
+    removed = 0
+    for user_id in user_ids:
+        # 保持する最後のエントリをインデックスで特定し、それより古いものを削除
+        boundary = (
+            db.query(HomeTimelineEntry.created_at, HomeTimelineEntry.tweet_id)
+            .filter(HomeTimelineEntry.user_id == user_id)
+            .order_by(desc(HomeTimelineEntry.created_at), desc(HomeTimelineEntry.tweet_id))
+            .offset(max_entries - 1)
+            .limit(1)
+            .first()
+        )
+        if not boundary:
+            continue
+        removed += db.execute(
+            delete(HomeTimelineEntry).where(
+                HomeTimelineEntry.user_id == user_id,
+                keyset_before(tuple(boundary), HomeTimelineEntry.created_at, HomeTimelineEntry.tweet_id)
+            )
+        ).rowcount
+        db.commit()
+    return removed
+
+# ホームタイムラインに表示するエントリ (tweet_id, created_at) を取得
+def get_home_timeline_entries(
+    db: Session,
+    user_id: str,
+    limit: int = 20,
+    cursor: Optional[Tuple[datetime, int]] = None
+) -> List[Tuple[int, datetime]]:
+    """
+    実体化したタイムラインから limit 件を取り出し、
+    フォロワー数が閾値以上のフォロー相手ごとのツイート（それぞれ最大 limit 件）とマージして返す
+    読み込む行数は limit ×（1 + 閾値以上のフォロー相手の数）に比例し、相手のツイート総数には依存しない
+    """
+    # 実体化済みのエントリ
+    entries = db.query(HomeTimelineEntry.tweet_id, HomeTimelineEntry.created_at)\
+        .filter(HomeTimelineEntry.user_id == user_id)
+    if cursor:
+        entries = entries.filter(
+            keyset_before(cursor, HomeTimelineEntry.created_at, HomeTimelineEntry.tweet_id)
+        )
+    candidates = entries.order_by(
+        desc(HomeTimelineEntry.created_at), desc(HomeTimelineEntry.tweet_id)
+    ).limit(limit).all()
+
+    # 読み込み時に合成するフォロー相手（閾値以上のユーザー一覧から主キーで照合）
+    fanout_on_read_authors = [
+        author_user_id for author_user_id, in
+        db.query(UserStats.user_id)
+        .join(Follow, and_(
+            Follow.follower_user_id == user_id,
+            Follow.followed_user_id == UserStats.user_id
+        ))
+        .filter(UserStats.follower_count >= settings.FANOUT_FOLLOWER_THRESHOLD)
+        .all()
+    ]
+
+    # 相手ごとに idx_tweets_user_created の範囲を limit 件だけ読み、UNION ALL で1クエリにまとめる
+    if fanout_on_read_authors:
+        per_author = []
+        for author_user_id in fanout_on_read_authors:
+            pulled = select(Tweet.tweet_id, Tweet.created_at).where(Tweet.user_id == author_user_id)
+            if cursor:
+                pulled = pulled.where(keyset_before(cursor, Tweet.created_at, Tweet.tweet_id))
+            per_author.append(
+                pulled.order_by(desc(Tweet.created_at), desc(Tweet.tweet_id)).limit(limit).subquery()
+            )
+        candidates += db.execute(union_all(*[select(subquery) for subquery in per_author])).all()
+
+    # 新しい順にマージして重複を除き、limit 件に絞る
+    candidates.sort(key=lambda entry: (entry.created_at, entry.tweet_id), reverse=True)
+    merged = {}
+    for entry in candidates:
+        merged.setdefault(entry.tweet_id, entry.created_at)
+    return list(merged.items())[:limit]
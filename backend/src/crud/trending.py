@@ -0,0 +1,38 @@
+# src/crud/trending.py
+from sqlalchemy.orm import Session
+from sqlalchemy import func, literal, select, union_all
+from typing import Tuple
+from datetime import timedelta
+
+import numpy as np
+
+from src.models.interactions import Like, Retweet
+from src.models.reply import Reply
+
+# トレンドのスコアに数えるエンゲージメントの種別とテーブルの対応
+ENGAGEMENT_MODELS = {
+    "like": Like,
+    "retweet": Retweet,
+    "reply": Reply,
+}
+
+# 直近のエンゲージメントを配列で取得（トレンドの一括再計算用）
+def load_engagement_events(db: Session, seconds: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    直近 seconds 秒のいいね・リツイート・リプライを3テーブルの UNION ALL 1クエリで取得し、
+    (tweet_id, 何秒前か, 種別) の配列で返す
+    経過時間はDBの現在時刻との差で求めるため、DBのタイムゾーン設定に依存しない
+    """
+    now = db.execute(select(func.current_timestamp())).scalar()
+    since = now - timedelta(seconds=seconds)
+    selects = [
+        select(model.tweet_id, model.created_at, literal(kind).label("kind")).where(model.created_at >= since)
+        for kind, model in ENGAGEMENT_MODELS.items()
+    ]
+    rows = db.execute(union_all(*selects)).all()
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=object)
+
+    tweet_ids, created_at, kinds = zip(*rows)
+    ages = (np.datetime64(now, "us") - np.array(created_at, dtype="datetime64[us]")) / np.timedelta64(1, "s")
+    return np.array(tweet_ids, dtype=np.int64), ages.astype(np.float64), np.array(kinds, dtype=object)
@@ -0,0 +1,99 @@
+# src/crud/tweet_stats.py
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update, insert, or_, and_
+from typing import Iterable, Optional
+
+from src.models.tweet import Tweet, TweetStats
+from src.models.interactions import Like, Retweet, Bookmark
+from src.crud.upsert import insert_ignore
+from src.crud.counters import add_to_counter
+
+# カウンター名と集計元テーブルの対応
+STAT_SOURCES = {
+    "like_count": Like,
+    "retweet_count": Retweet,
+    "bookmark_count": Bookmark,
+}
+
+# カウンターを加減算（UPDATE ... SET n = n ± 1 でアトミックに更新）
+def increment_tweet_stat(db: Session, tweet_id: int, column: str, delta: int = 1) -> None:
+    """
+    呼び出し元のトランザクション内でカウンターを更新する（コミットは呼び出し元で行う）
+    集計行がないツイート（集計テーブルの導入前に作成されたもの）は行を作成してから更新する
+    """
+    statement = (
+        update(TweetStats)
+        .where(TweetStats.tweet_id == tweet_id)
+        .values({column: add_to_counter(getattr(TweetStats, column), delta), "version": TweetStats.version + 1})
+    )
+    if not db.execute(statement).rowcount:
+        db.execute(insert_ignore(db, TweetStats).values(tweet_id=tweet_id))
+        db.execute(statement)
+
+# リプライ一覧のバージョンを進める（リプライの追加・削除時。ツイート自体のバージョンは変えない）
+def touch_reply_version(db: Session, tweet_id: int) -> None:
+    db.execute(
+        update(TweetStats)
+        .where(TweetStats.tweet_id == tweet_id)
+        .values(reply_version=TweetStats.reply_version + 1)
+    )
+
+# 集計元テーブルから件数を数えるスカラーサブクエリ
+def _count_subquery(model):
+    return (
+        select(func.count())
+        .select_from(model)
+        .where(model.tweet_id == TweetStats.tweet_id)
+        .scalar_subquery()
+    )
+
+# ずれたカウンターを一括で再計算
+def reconcile_tweet_stats(
+    db: Session,
+    tweet_ids: Optional[Iterable[int]] = None,
+    batch_size: int = 1000
+) -> int:
+    """
+    Likes / Retweets / Bookmarks から件数を数え直し、TweetStats と一致しない行だけを更新する
+    tweet_ids を指定しない場合は全ツイートを tweet_id の範囲ごとに処理する
+    戻り値は修正した行数（集計行が欠けていたツイートの補完分を含む）
+    """
+    fixed = 0
+
+    # 集計行が存在しないツイートを補完
+    missing = select(Tweet.tweet_id).where(
+        ~select(TweetStats.tweet_id).where(TweetStats.tweet_id == Tweet.tweet_id).exists()
+    )
+    if tweet_ids is not None:
+        tweet_ids = list(tweet_ids)
+        missing = missing.where(Tweet.tweet_id.in_(tweet_ids))
+    fixed += db.execute(insert(TweetStats).from_select(["tweet_id"], missing)).rowcount
+    db.commit()
+
+    counts = {column: _count_subquery(model) for column, model in STAT_SOURCES.items()}
+    drifted = or_(*[getattr(TweetStats, column) != count for column, count in counts.items()])
+
+    # 対象ツイートを batch_size 件ずつに区切って更新
+    if tweet_ids is not None:
+        ranges = [
+            TweetStats.tweet_id.in_(tweet_ids[i:i + batch_size])
+            for i in range(0, len(tweet_ids), batch_size)
+        ]
+    else:
+        max_id = db.query(func.max(TweetStats.tweet_id)).scalar() or 0
+        ranges = [
+            and_(TweetStats.tweet_id > start, TweetStats.tweet_id <= start + batch_size)
+            for start in range(0, max_id, batch_size)
+        ]
+
+    for condition in ranges:
+        fixed += db.execute(
+            update(TweetStats)
+            .where(condition)
+            .where(drifted)
+            .values({**counts, "version": TweetStats.version + 1})
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+
+    return fixed
@@ -1,271 +1,583 @@
 # src/crud/tweets.py
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, desc
-from typing import List, Optional, Tuple
+from sqlalchemy import func, and_, desc, literal, select, union_all
+from typing import Dict, Iterable, List, Optional, Tuple
+from collections import defaultdict
+from datetime import datetime
 
-from src.models.tweet import Tweet
+from src.models.tweet import Tweet, TweetStats, TweetImpressions
 from src.models.interactions import Like, Retweet, Bookmark
 from src.models.user import User
-from src.tweets.schemas import TweetCreate
+from src.tweets.schemas import TweetCreate, InteractionOperation
+from src.crud.tweet_stats import increment_tweet_stat
+from src.crud.user_stats import increment_user_stat, decrement_like_counts_for_tweet
+from src.crud.keyset import keyset_before
+from src.crud.upsert import insert_ignore
+from src.crud.search import parse_query, search_candidates, matches_terms
+from src.crud.timelines import fan_out_tweet, get_home_timeline_entries
+from src.crud.outbox import enqueue_event
+from src.cache.tweets import tweet_cache
+from src.stream.broadcaster import tweet_broadcaster
+from src.trending.tracker import trending_tracker
+from src.outbox.worker import outbox_pool
+from src.metrics.definitions import tweets_created_total, tweets_deleted_total, interactions_total
 
-# ツイート一覧取得
-def get_tweets(
+# インタラクション状態のキーとテーブルの対応
+VIEWER_STATE_MODELS = {
+    "is_liked": Like,
+    "is_retweeted": Retweet,
+    "is_bookmarked": Bookmark,
+}
+
+# インタラクション種別とテーブル、集計カウンターの対応
+INTERACTION_TYPES = {
+    "like": (Like, "like_count"),
+    "retweet": (Retweet, "retweet_count"),
+    "bookmark": (Bookmark, "bookmark_count"),
+}
+
+# 集計カウンターとインタラクション種別の対応
+INTERACTION_COLUMNS = {column: interaction_type for interaction_type, (_, column) in INTERACTION_TYPES.items()}
+
+# 現在のユーザーのインタラクション状態をまとめて取得
+def get_viewer_states(
     db: Session,
-    skip: int = 0,
-    limit: int = 20,
-    current_user_id: Optional[str] = None
-) -> Tuple[List[dict], int]:
-    # ツイート、いいね数、リツイート数、ブックマーク数を取得
-    query = (
+    tweet_ids: Iterable[int],
+    current_user_id: Optional[str]
+) -> Dict[int, Dict[str, bool]]:
+    """
+    複数ツイートに対する is_liked / is_retweeted / is_bookmarked を一括で取得
+    ツイート数に関わらず、3テーブルを UNION ALL した1クエリで解決する
+    """
+    tweet_ids = list(dict.fromkeys(tweet_ids))
+    states = {
+        tweet_id: {key: False for key in VIEWER_STATE_MODELS}
+        for tweet_id in tweet_ids
+    }
+    if not current_user_id or not tweet_ids:
+        return states
+
+    # 各インタラクションテーブルから該当ツイートIDを種別付きで抽出
+    selects = [
+        db.query(model.tweet_id.label("tweet_id"), literal(key).label("state"))
+        .filter(model.user_id == current_user_id)
+        .filter(model.tweet_id.in_(tweet_ids))
+        for key, model in VIEWER_STATE_MODELS.items()
+    ]
+    rows = db.execute(union_all(*[query.statement for query in selects])).all()
+
+    for tweet_id, state in rows:
+        states[tweet_id][state] = True
+
+    return states
+
+# ツイートと集計済みのいいね数、リツイート数、ブックマーク数、表示回数を取得するクエリ
+def _tweet_detail_query(db: Session):
+    return (
         db.query(
             Tweet,
             User.user_name,
-            func.count(Like.tweet_id.distinct()).label("like_count"),
-            func.count(Retweet.tweet_id.distinct()).label("retweet_count"),
-            func.count(Bookmark.tweet_id.distinct()).label("bookmark_count")
+            func.coalesce(TweetStats.like_count, 0).label("like_count"),
+            func.coalesce(TweetStats.retweet_count, 0).label("retweet_count"),
+            func.coalesce(TweetStats.bookmark_count, 0).label("bookmark_count"),
+            func.coalesce(TweetImpressions.view_count, 0).label("view_count"),
+            func.coalesce(TweetImpressions.unique_viewers, 0).label("unique_viewer_estimate")
         )
         .join(User, Tweet.user_id == User.user_id)
-        .outerjoin(Like, Tweet.tweet_id == Like.tweet_id)
-        .outerjoin(Retweet, Tweet.tweet_id == Retweet.tweet_id)
-        .outerjoin(Bookmark, Tweet.tweet_id == Bookmark.tweet_id)
-        .group_by(Tweet.tweet_id, User.user_name)
-        .order_by(desc(Tweet.created_at))
+        .outerjoin(TweetStats, Tweet.tweet_id == TweetStats.tweet_id)
+        .outerjoin(TweetImpressions, Tweet.tweet_id == TweetImpressions.tweet_id)
     )
+
+# クエリ結果の1行を閲覧者に依存しない部分の辞書に整形
+def _tweet_detail(row) -> dict:
+    tweet, user_name, like_count, retweet_count, bookmark_count, view_count, unique_viewer_estimate = row
+    return {
+        "tweet_id": tweet.tweet_id,
+        "user_id": tweet.user_id,
+        "user_name": user_name,
+        "tweet_content": tweet.tweet_content,
+        "created_at": tweet.created_at,
+        "updated_at": tweet.updated_at,
+        "like_count": like_count,
+        "retweet_count": retweet_count,
+        "bookmark_count": bookmark_count,
+        "view_count": view_count,
+        "unique_viewer_estimate": unique_viewer_estimate,
+    }
+
+# クエリ結果の1行とインタラクション状態をレスポンス用の辞書に整形
+def _format_tweet(row, viewer_state: Dict[str, bool]) -> dict:
+    return {**_tweet_detail(row), **viewer_state}
+
+# 閲覧者に依存しないツイート詳細をキャッシュ経由で取得
+def _get_tweet_details(db: Session, tweet_ids: List[int]) -> Dict[int, dict]:
+    """
+    キャッシュになかったツイートだけを1クエリで取得し、キャッシュに格納する
+    存在しないツイートIDは結果に含まれない
+    """
+    details, missing = tweet_cache.get_many(tweet_ids)
+    if missing:
+        rows = _tweet_detail_query(db).filter(Tweet.tweet_id.in_(missing)).all()
+        loaded = {row[0].tweet_id: _tweet_detail(row) for row in rows}
+        tweet_cache.set_many(loaded)
+        details.update(loaded)
+    return details
+
+# ツイート一覧取得
+def get_tweets(
+    db: Session,
+    skip: int = 0,
+    limit: int = 20,
+    current_user_id: Optional[str] = None,
+    cursor: Optional[Tuple[datetime, int]] = None,
+    include_total: bool = True
+) -> Tuple[List[dict], Optional[int]]:
+    """
+    cursor を指定した場合は OFFSET を使わずカーソル位置より古いツイートを取得する
+    include_total=False の場合は総件数の COUNT を実行せず None を返す
+    """
+    query = _tweet_detail_query(db).order_by(desc(Tweet.created_at), desc(Tweet.tweet_id))
     
-    # 総ツイート数の取得
-    total = db.query(func.count(Tweet.tweet_id)).scalar()
+    # 総ツイート数の取得（要求された場合のみ）
+    total = count_tweets(db) if include_total else None
     
     # ページネーション適用
-    tweets_with_counts = query.offset(skip).limit(limit).all()
+    if cursor:
+        query = query.filter(keyset_before(cursor, Tweet.created_at, Tweet.tweet_id))
+    else:
+        query = query.offset(skip)
+    tweets_with_counts = query.limit(limit).all()
+    
+    # 現在のユーザーのインタラクション状態をページ単位でまとめて取得
+    viewer_states = get_viewer_states(
+        db, [tweet.tweet_id for tweet, *_ in tweets_with_counts], current_user_id
+    )
     
     # 結果をリストに整形
-    result = []
-    for tweet, user_name, like_count, retweet_count, bookmark_count in tweets_with_counts:
-        # 現在のユーザーのインタラクション状態をチェック
-        is_liked = False
-        is_retweeted = False
-        is_bookmarked = False
-        
-        if current_user_id:
-            # 現在のユーザーがいいねしているかチェック
-            is_liked = db.query(Like).filter(
-                and_(Like.tweet_id == tweet.tweet_id, Like.user_id == current_user_id)
-            ).first() is not None
-            
-            # 現在のユーザーがリツイートしているかチェック
-            is_retweeted = db.query(Retweet).filter(
-                and_(Retweet.tweet_id == tweet.tweet_id, Retweet.user_id == current_user_id)
-            ).first() is not None
-            
-            # 現在のユーザーがブックマークしているかチェック
-            is_bookmarked = db.query(Bookmark).filter(
-                and_(Bookmark.tweet_id == tweet.tweet_id, Bookmark.user_id == current_user_id)
-            ).first() is not None
-        
-        # 結果に追加
-        result.append({
-            "tweet_id": tweet.tweet_id,
-            "user_id": tweet.user_id,
-            "user_name": user_name,
-            "tweet_content": tweet.tweet_content,
-            "created_at": tweet.created_at,
-            "updated_at": tweet.updated_at,
-            "like_count": like_count,
-            "retweet_count": retweet_count,
-            "bookmark_count": bookmark_count,
-            "is_liked": is_liked,
-            "is_retweeted": is_retweeted,
-            "is_bookmarked": is_bookmarked
-        })
+    result = [
+        _format_tweet(row, viewer_states[row[0].tweet_id])
+        for row in tweets_with_counts
+    ]
     
     return result, total
 
+# 総ツイート数
+def count_tweets(db: Session) -> int:
+    return db.query(func.count(Tweet.tweet_id)).scalar()
+
+# 複数のツイートをID指定でまとめて取得
+def get_tweets_by_ids(
+    db: Session,
+    tweet_ids: Iterable[int],
+    current_user_id: Optional[str] = None
+) -> List[dict]:
+    """
+    指定された順序を保ったままツイートを返す（存在しないIDは結果に含まれない）
+    件数に関わらずツイート取得とインタラクション状態取得の2クエリで済む
+    （キャッシュ済みのツイートはツイート取得の対象から外れる）
+    """
+    tweet_ids = list(dict.fromkeys(tweet_ids))
+    if not tweet_ids:
+        return []
+    
+    details = _get_tweet_details(db, tweet_ids)
+    viewer_states = get_viewer_states(db, details.keys(), current_user_id)
+    
+    return [
+        {**details[tweet_id], **viewer_states[tweet_id]}
+        for tweet_id in tweet_ids
+        if tweet_id in details
+    ]
+
+# ホームタイムライン取得
+def get_home_timeline(
+    db: Session,
+    user_id: str,
+    limit: int = 20,
+    cursor: Optional[Tuple[datetime, int]] = None,
+    entries: Optional[List[Tuple[int, datetime]]] = None
+) -> Tuple[List[dict], Optional[Tuple[datetime, int]]]:
+    """
+    ツイート一覧と、続きがある場合は次ページの起点 (created_at, tweet_id) を返す
+    entries を指定した場合は（バージョンの計算で取得済みの）そのエントリを使い、タイムラインを読み直さない
+    """
+    if entries is None:
+        entries = get_home_timeline_entries(db, user_id, limit=limit, cursor=cursor)
+    tweets = get_tweets_by_ids(db, [tweet_id for tweet_id, _ in entries], current_user_id=user_id)
+    
+    next_position = None
+    if len(entries) == limit:
+        tweet_id, created_at = entries[-1]
+        next_position = (created_at, tweet_id)
+    
+    return tweets, next_position
+
+# ユーザーのツイートの (tweet_id, created_at) を新しい順に取得（idx_tweets_user_created のみで完結する）
+def get_user_tweet_entries(
+    db: Session,
+    user_id: str,
+    limit: int = 20,
+    cursor: Optional[Tuple[datetime, int]] = None
+) -> List[Tuple[int, datetime]]:
+    query = db.query(Tweet.tweet_id, Tweet.created_at).filter(Tweet.user_id == user_id)
+    if cursor:
+        query = query.filter(keyset_before(cursor, Tweet.created_at, Tweet.tweet_id))
+    return query.order_by(desc(Tweet.created_at), desc(Tweet.tweet_id)).limit(limit).all()
+
+# ユーザーのツイート一覧取得
+def get_user_tweets(
+    db: Session,
+    user_id: str,
+    limit: int = 20,
+    current_user_id: Optional[str] = None,
+    cursor: Optional[Tuple[datetime, int]] = None,
+    entries: Optional[List[Tuple[int, datetime]]] = None
+) -> Optional[Tuple[List[dict], Optional[Tuple[datetime, int]]]]:
+    """
+    ツイート一覧と、続きがある場合は次ページの起点 (created_at, tweet_id) を返す
+    ユーザーが存在しない場合は None（1件も取得できなかった場合のみ確認する）
+    entries を指定した場合は（バージョンの計算で取得済みの）そのエントリを使い、一覧を読み直さない
+    """
+    if entries is None:
+        entries = get_user_tweet_entries(db, user_id, limit=limit, cursor=cursor)
+    if not entries and not db.query(User.user_id).filter(User.user_id == user_id).first():
+        return None
+    tweets = get_tweets_by_ids(db, [tweet_id for tweet_id, _ in entries], current_user_id=current_user_id)
+    
+    next_position = None
+    if len(entries) == limit:
+        tweet_id, created_at = entries[-1]
+        next_position = (created_at, tweet_id)
+    
+    return tweets, next_position
+
 # ツイート取得（ID指定）
 def get_tweet(db: Session, tweet_id: int, current_user_id: Optional[str] = None) -> Optional[dict]:
-    # ツイート、いいね数、リツイート数、ブックマーク数を取得
-    query_result = (
-        db.query(
-            Tweet,
-            User.user_name,
-            func.count(Like.tweet_id.distinct()).label("like_count"),
-            func.count(Retweet.tweet_id.distinct()).label("retweet_count"),
-            func.count(Bookmark.tweet_id.distinct()).label("bookmark_count")
-        )
-        .join(User, Tweet.user_id == User.user_id)
-        .outerjoin(Like, Tweet.tweet_id == Like.tweet_id)
-        .outerjoin(Retweet, Tweet.tweet_id == Retweet.tweet_id)
-        .outerjoin(Bookmark, Tweet.tweet_id == Bookmark.tweet_id)
-        .filter(Tweet.tweet_id == tweet_id)
-        .group_by(Tweet.tweet_id, User.user_name)
-        .first()
-    )
+    detail = _get_tweet_details(db, [tweet_id]).get(tweet_id)
     
-    if not query_result:
+    if not detail:
         return None
     
-    tweet, user_name, like_count, retweet_count, bookmark_count = query_result
-    
     # 現在のユーザーのインタラクション状態をチェック
-    is_liked = False
-    is_retweeted = False
-    is_bookmarked = False
+    viewer_state = get_viewer_states(db, [tweet_id], current_user_id)[tweet_id]
     
-    if current_user_id:
-        # 現在のユーザーがいいねしているかチェック
-        is_liked = db.query(Like).filter(
-            and_(Like.tweet_id == tweet.tweet_id, Like.user_id == current_user_id)
-        ).first() is not None
-        
-        # 現在のユーザーがリツイートしているかチェック
-        is_retweeted = db.query(Retweet).filter(
-            and_(Retweet.tweet_id == tweet.tweet_id, Retweet.user_id == current_user_id)
-        ).first() is not None
-        
-        # 現在のユーザーがブックマークしているかチェック
-        is_bookmarked = db.query(Bookmark).filter(
-            and_(Bookmark.tweet_id == tweet.tweet_id, Bookmark.user_id == current_user_id)
-        ).first() is not None
+    return {**detail, **viewer_state}
+
+# ツイート検索
+def search_tweets(
+    db: Session,
+    query: str,
+    limit: int = 20,
+    current_user_id: Optional[str] = None,
+    cursor: Optional[Tuple[datetime, int]] = None,
+    max_scans: int = 5
+) -> Tuple[List[dict], Optional[Tuple[datetime, int]]]:
+    """
+    空白区切りの全ての語を含むツイートを新しい順に返す
+    n-gram インデックスで絞り込んだ候補を本文で確認し、limit 件に満たなければ続きの候補を読む
+    （候補の読み込みは最大 max_scans 回まで）
+    戻り値は (ツイート一覧, 続きがある場合は次ページの起点 (created_at, tweet_id))
+    """
+    terms = parse_query(query)
+    if not terms:
+        return [], None
     
-    # 結果の整形
-    result = {
-        "tweet_id": tweet.tweet_id,
-        "user_id": tweet.user_id,
-        "user_name": user_name,
-        "tweet_content": tweet.tweet_content,
-        "created_at": tweet.created_at,
-        "updated_at": tweet.updated_at,
-        "like_count": like_count,
-        "retweet_count": retweet_count,
-        "bookmark_count": bookmark_count,
-        "is_liked": is_liked,
-        "is_retweeted": is_retweeted,
-        "is_bookmarked": is_bookmarked
-    }
+    matched = []
+    position = cursor
+    exhausted = False
+    for _ in range(max_scans):
+        candidates = search_candidates(db, terms, limit=limit * 2, cursor=position)
+        details = _get_tweet_details(db, [tweet_id for tweet_id, _ in candidates])
+        for tweet_id, created_at in candidates:
+            position = (created_at, tweet_id)
+            detail = details.get(tweet_id)
+            if detail and matches_terms(detail["tweet_content"], terms):
+                matched.append(detail)
+                if len(matched) == limit:
+                    break
+        if len(matched) == limit:
+            break
+        if len(candidates) < limit * 2:
+            exhausted = True
+            break
     
-    return result
+    viewer_states = get_viewer_states(db, [detail["tweet_id"] for detail in matched], current_user_id)
+    tweets = [{**detail, **viewer_states[detail["tweet_id"]]} for detail in matched]
+    return tweets, None if exhausted else position
 
 # ツイート作成
 def create_tweet(db: Session, tweet: TweetCreate, user_id: str) -> Tweet:
     db_tweet = Tweet(
         user_id=user_id,
-        tweet_content=tweet.tweet_content
+        tweet_content=tweet.tweet_content,
+        stats=TweetStats()  # 集計行も同じトランザクションで作成
     )
     db.add(db_tweet)
+    db.flush()
+    
+    # 投稿者自身のホームタイムラインに追加し、フォロワーへの配信と検索インデックスへの登録はアウトボックスに記録
+    fan_out_tweet(db, db_tweet.tweet_id, user_id, to_followers=False)
+    enqueue_event(db, "tweet_created", db_tweet.tweet_id)
+    increment_user_stat(db, user_id, "tweet_count", 1)
     db.commit()
     db.refresh(db_tweet)
+    outbox_pool.notify()
+    tweets_created_total.inc()
+    
+    tweet_broadcaster.publish("tweet_created", {
+        "tweet_id": db_tweet.tweet_id,
+        "user_id": db_tweet.user_id,
+        "tweet_content": db_tweet.tweet_content,
+        "created_at": db_tweet.created_at.isoformat(),
+    })
     return db_tweet
 
 # ツイート削除
 def delete_tweet(db: Session, tweet_id: int, user_id: str) -> bool:
+    # 行ロックで削除までの間に新しいいいねが追加されないようにする（いいね数を正確に差し引くため）
     tweet = db.query(Tweet).filter(
         and_(Tweet.tweet_id == tweet_id, Tweet.user_id == user_id)
-    ).first()
+    ).with_for_update().first()
     
     if not tweet:
         return False
     
+    enqueue_event(db, "tweet_deleted", tweet_id)
+    increment_user_stat(db, user_id, "tweet_count", -1)
+    decrement_like_counts_for_tweet(db, tweet_id)
     db.delete(tweet)
     db.commit()
+    outbox_pool.notify()
+    tweet_cache.invalidate([tweet_id])
+    trending_tracker.discard(tweet_id)
+    tweets_deleted_total.inc()
+    tweet_broadcaster.publish("tweet_deleted", {"tweet_id": tweet_id})
     return True
 
-# いいね追加
-def add_like(db: Session, tweet_id: int, user_id: str) -> bool:
-    # ツイートの存在確認
-    tweet = db.query(Tweet).filter(Tweet.tweet_id == tweet_id).first()
-    if not tweet:
-        return False
+# カウントの変化をメトリクスとトレンドのスコアに反映し、ストリームに配信（ツイートごとに1イベント）
+def _notify_count_changes(deltas: Dict[Tuple[int, str], int]) -> None:
+    changes: Dict[int, Dict[str, int]] = defaultdict(dict)
+    for (tweet_id, column), delta in sorted(deltas.items()):
+        if delta:
+            changes[tweet_id][column] = delta
+            interaction_type = INTERACTION_COLUMNS[column]
+            interactions_total.inc(abs(delta), type=interaction_type, action="add" if delta > 0 else "remove")
+            trending_tracker.record(tweet_id, interaction_type, delta)
+    for tweet_id, counts in changes.items():
+        tweet_broadcaster.publish("counts", {"tweet_id": tweet_id, "deltas": counts})
+
+# インタラクションを1文で追加（コミットは呼び出し元で行う）
+def _insert_interaction(db: Session, model, tweet_id: int, user_id: str) -> Optional[bool]:
+    """
+    INSERT IGNORE ... SELECT でツイートの存在確認と重複の無視を1文で行う
+    追加した場合は True、既に存在した場合は False、ツイートが存在しない場合は None を返す
+    """
+    inserted = db.execute(
+        insert_ignore(db, model).from_select(
+            ["user_id", "tweet_id"],
+            select(literal(user_id), Tweet.tweet_id).where(Tweet.tweet_id == tweet_id)
+        )
+    ).rowcount
+    if inserted:
+        return True
     
-    # 既にいいねしているか確認
-    existing_like = db.query(Like).filter(
-        and_(Like.tweet_id == tweet_id, Like.user_id == user_id)
-    ).first()
+    # 追加されなかった場合のみ、原因がツイートの不在かどうかを確認
+    exists = db.query(Tweet.tweet_id).filter(Tweet.tweet_id == tweet_id).first()
+    return False if exists else None
+
+# インタラクションを1文で削除（コミットは呼び出し元で行う）
+def _delete_interaction(db: Session, model, tweet_id: int, user_id: str) -> bool:
+    deleted = db.query(model).filter(
+        and_(model.tweet_id == tweet_id, model.user_id == user_id)
+    ).delete(synchronize_session=False)
+    return bool(deleted)
+
+# インタラクションを追加し、追加できた場合のみカウンターを加算してコミット
+def _add_interaction(db: Session, interaction_type: str, tweet_id: int, user_id: str) -> bool:
+    model, column = INTERACTION_TYPES[interaction_type]
+    inserted = _insert_interaction(db, model, tweet_id, user_id)
+    if inserted is None:
+        return False  # ツイートが存在しない
     
-    if existing_like:
-        return True  # 既にいいねしていた場合は成功とみなす
+    if inserted:
+        increment_tweet_stat(db, tweet_id, column, 1)
+        increment_user_stat(db, user_id, "interaction_version", 1)
+        if column == "like_count":
+            increment_user_stat(db, user_id, "like_count", 1)
+        db.commit()
+        tweet_cache.invalidate([tweet_id])
+        _notify_count_changes({(tweet_id, column): 1})
+    return True  # 既に追加済みだった場合も成功とみなす
+
+# インタラクションを削除し、削除できた場合のみカウンターを減算してコミット
+def _remove_interaction(db: Session, interaction_type: str, tweet_id: int, user_id: str) -> bool:
+    model, column = INTERACTION_TYPES[interaction_type]
+    if not _delete_interaction(db, model, tweet_id, user_id):
+        return False
     
-    # いいね追加
-    like = Like(tweet_id=tweet_id, user_id=user_id)
-    db.add(like)
+    increment_tweet_stat(db, tweet_id, column, -1)
+    increment_user_stat(db, user_id, "interaction_version", 1)
+    if column == "like_count":
+        increment_user_stat(db, user_id, "like_count", -1)
     db.commit()
+    tweet_cache.invalidate([tweet_id])
+    _notify_count_changes({(tweet_id, column): -1})
     return True
 
+# いいね追加
+def add_like(db: Session, tweet_id: int, user_id: str) -> bool:
+    return _add_interaction(db, "like", tweet_id, user_id)
+
 # いいね削除
 def remove_like(db: Session, tweet_id: int, user_id: str) -> bool:
-    like = db.query(Like).filter(
-        and_(Like.tweet_id == tweet_id, Like.user_id == user_id)
-    ).first()
-    
-    if not like:
-        return False
-    
-    db.delete(like)
-    db.commit()
-    return True
+    return _remove_interaction(db, "like", tweet_id, user_id)
 
 # リツイート追加
 def add_retweet(db: Session, tweet_id: int, user_id: str) -> bool:
-    # ツイートの存在確認
-    tweet = db.query(Tweet).filter(Tweet.tweet_id == tweet_id).first()
-    if not tweet:
-        return False
-    
-    # 既にリツイートしているか確認
-    existing_retweet = db.query(Retweet).filter(
-        and_(Retweet.tweet_id == tweet_id, Retweet.user_id == user_id)
-    ).first()
-    
-    if existing_retweet:
-        return True  # 既にリツイートしていた場合は成功とみなす
-    
-    # リツイート追加
-    retweet = Retweet(tweet_id=tweet_id, user_id=user_id)
-    db.add(retweet)
-    db.commit()
-    return True
+    return _add_interaction(db, "retweet", tweet_id, user_id)
 
 # リツイート削除
 def remove_retweet(db: Session, tweet_id: int, user_id: str) -> bool:
-    retweet = db.query(Retweet).filter(
-        and_(Retweet.tweet_id == tweet_id, Retweet.user_id == user_id)
-    ).first()
-    
-    if not retweet:
-        return False
-    
-    db.delete(retweet)
-    db.commit()
-    return True
+    return _remove_interaction(db, "retweet", tweet_id, user_id)
 
 # ブックマーク追加
 def add_bookmark(db: Session, tweet_id: int, user_id: str) -> bool:
-    # ツイートの存在確認
-    tweet = db.query(Tweet).filter(Tweet.tweet_id == tweet_id).first()
-    if not tweet:
-        return False
-    
-    # 既にブックマークしているか確認
-    existing_bookmark = db.query(Bookmark).filter(
-        and_(Bookmark.tweet_id == tweet_id, Bookmark.user_id == user_id)
-    ).first()
+    return _add_interaction(db, "bookmark", tweet_id, user_id)
+
+# ブックマーク削除
+def remove_bookmark(db: Session, tweet_id: int, user_id: str) -> bool:
+    return _remove_interaction(db, "bookmark", tweet_id, user_id)
+
+# 複数のインタラクションを1トランザクションで適用
+def apply_interactions(
+    db: Session,
+    operations: List[InteractionOperation],
+    user_id: str
+) -> List[dict]:
+    """
+    いいね・リツイート・ブックマークの追加／削除を順番に適用し、操作ごとの結果を返す
+    status は applied（変更あり）、unchanged（既に同じ状態）、not_found（ツイートまたは対象が存在しない）
+    カウンターはツイート・種別ごとに差分を合算し、tweet_id 順に1回ずつ更新する
+    """
+    results = []
+    deltas: Dict[Tuple[int, str], int] = defaultdict(int)
     
-    if existing_bookmark:
-        return True  # 既にブックマークしていた場合は成功とみなす
+    for operation in operations:
+        model, column = INTERACTION_TYPES[operation.type]
+        if operation.action == "add":
+            inserted = _insert_interaction(db, model, operation.tweet_id, user_id)
+            status = "not_found" if inserted is None else "applied" if inserted else "unchanged"
+        else:
+            deleted = _delete_interaction(db, model, operation.tweet_id, user_id)
+            status = "applied" if deleted else "not_found"
+        
+        if status == "applied":
+            deltas[(operation.tweet_id, column)] += 1 if operation.action == "add" else -1
+        results.append({
+            "tweet_id": operation.tweet_id,
+            "type": operation.type,
+            "action": operation.action,
+            "success": status != "not_found",
+            "status": status,
+        })
     
-    # ブックマーク追加
-    bookmark = Bookmark(tweet_id=tweet_id, user_id=user_id)
-    db.add(bookmark)
+    # ロック順を揃えるため tweet_id 順に更新
+    for (tweet_id, column), delta in sorted(deltas.items()):
+        if delta:
+            increment_tweet_stat(db, tweet_id, column, delta)
+    if deltas:
+        increment_user_stat(db, user_id, "interaction_version", 1)
+    like_delta = sum(delta for (_, column), delta in deltas.items() if column == "like_count")
+    if like_delta:
+        increment_user_stat(db, user_id, "like_count", like_delta)
     db.commit()
-    return True
+    tweet_cache.invalidate({tweet_id for tweet_id, _ in deltas})
+    _notify_count_changes(deltas)
+    
+    return results
 
-# ブックマーク削除
-def remove_bookmark(db: Session, tweet_id: int, user_id: str) -> bool:
-    bookmark = db.query(Bookmark).filter(
-        and_(Bookmark.tweet_id == tweet_id, Bookmark.user_id == user_id)
-    ).first()
+# バッファに溜めたインタラクションの変更をまとめて書き込む
+def flush_interaction_changes(db: Session, changes: Dict[Tuple[str, int, str], bool]) -> int:
+    """
+    changes は (user_id, tweet_id, 種別) -> 最終状態（True: 追加 / False: 削除）
+    ツイート・種別・操作ごとに複数行の INSERT IGNORE / DELETE を1文で実行し、
+    実際に変わった行数でカウンターを更新する（全体で1トランザクション）
+    戻り値は変更された行数
+    """
+    grouped: Dict[Tuple[int, str, bool], List[str]] = defaultdict(list)
+    for (user_id, tweet_id, interaction_type), add in changes.items():
+        grouped[(tweet_id, interaction_type, add)].append(user_id)
+    if not grouped:
+        return 0
     
-    if not bookmark:
-        return False
+    # 削除済みのツイートへの変更は捨てる
+    existing = {
+        tweet_id for tweet_id, in
+        db.query(Tweet.tweet_id).filter(Tweet.tweet_id.in_({key[0] for key in grouped})).all()
+    }
+    
+    deltas: Dict[Tuple[int, str], int] = defaultdict(int)
+    like_deltas: Dict[str, int] = defaultdict(int)
+    for (tweet_id, interaction_type, add), user_ids in sorted(grouped.items()):
+        if tweet_id not in existing:
+            continue
+        model, column = INTERACTION_TYPES[interaction_type]
+        if column == "like_count":
+            # ユーザーごとのいいね数のため、実際に変わるユーザーを先に確認して対象を絞る
+            liked = {
+                liked_user_id for liked_user_id, in
+                db.query(Like.user_id).filter(Like.tweet_id == tweet_id, Like.user_id.in_(user_ids)).all()
+            }
+            user_ids = [user_id for user_id in user_ids if (user_id in liked) != add]
+            if not user_ids:
+                continue
+            for user_id in user_ids:
+                like_deltas[user_id] += 1 if add else -1
+        if add:
+            changed = db.execute(
+                insert_ignore(db, model).values([
+                    {"user_id": user_id, "tweet_id": tweet_id} for user_id in user_ids
+                ])
+            ).rowcount
+            deltas[(tweet_id, column)] += changed
+        else:
+            changed = db.query(model).filter(
+                and_(model.tweet_id == tweet_id, model.user_id.in_(user_ids))
+            ).delete(synchronize_session=False)
+            deltas[(tweet_id, column)] -= changed
+    
+    for (tweet_id, column), delta in sorted(deltas.items()):
+        if delta:
+            increment_tweet_stat(db, tweet_id, column, delta)
     
-    db.delete(bookmark)
+    # 変更のあったユーザーのバージョンを進める（実際に変わった行はユーザー単位では分からないため全員分）
+    for user_id in sorted({user_id for user_id, tweet_id, _ in changes if tweet_id in existing}):
+        increment_user_stat(db, user_id, "interaction_version", 1)
+        if like_deltas.get(user_id):
+            increment_user_stat(db, user_id, "like_count", like_deltas[user_id])
     db.commit()
-    return True
+    tweet_cache.invalidate({tweet_id for tweet_id, _ in deltas})
+    _notify_count_changes(deltas)
+    
+    return sum(abs(delta) for delta in deltas.values())
+
+# バッファの変更を1件ずつ書き込む（まとめての書き込みに失敗した場合の再試行用）
+def flush_interaction_changes_each(
+    db: Session,
+    changes: Dict[Tuple[str, int, str], bool]
+) -> Tuple[int, List[Tuple[str, int, str]]]:
+    """
+    変更ごとに別のトランザクションで flush_interaction_changes を実行し、
+    失敗した変更はロールバックして残りの書き込みを続ける
+    戻り値は (変更された行数, 失敗した変更のキー一覧)
+    """
+    db.rollback()  # まとめての書き込みで失敗したトランザクションを破棄
+    changed = 0
+    failed = []
+    for key, add in changes.items():
+        try:
+            changed += flush_interaction_changes(db, {key: add})
+        except Exception:
+            db.rollback()
+            failed.append(key)
+    return changed, failed
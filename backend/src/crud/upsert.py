@@ -0,0 +1,17 @@
+# src/crud/upsert.py
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# 主キーが重複する行を無視する INSERT 文を接続先のDBに合わせて作成
+def insert_ignore(db: Session, model):
+    """
+    MySQL: INSERT IGNORE / SQLite・PostgreSQL: INSERT ... ON CONFLICT DO NOTHING
+    重複して挿入されなかった行は rowcount に含まれない
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing()
+    return insert(model).prefix_with("IGNORE")
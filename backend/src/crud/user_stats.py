@@ -0,0 +1,97 @@
+# src/crud/user_stats.py
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update, insert, or_
+from typing import Iterable
+
+from src.models.user import User, UserStats
+from src.models.follow import Follow
+from src.models.tweet import Tweet
+from src.models.interactions import Like
+from src.crud.counters import add_to_counter
+
+# 集計行が存在しないユーザーの行を補完
+def ensure_user_stats(db: Session, user_ids: Iterable[str]) -> None:
+    missing = select(User.user_id).where(
+        User.user_id.in_(list(user_ids)),
+        ~select(UserStats.user_id).where(UserStats.user_id == User.user_id).exists()
+    )
+    db.execute(insert(UserStats).from_select(["user_id"], missing))
+
+# カウンターを加減算（UPDATE ... SET n = n ± 1 でアトミックに更新）
+def increment_user_stat(db: Session, user_id: str, column: str, delta: int = 1) -> None:
+    """
+    呼び出し元のトランザクション内でカウンターを更新する（コミットは呼び出し元で行う）
+    集計行がないユーザー（集計テーブルの導入前に登録されたもの）は行を作成してから更新する
+    """
+    statement = (
+        update(UserStats)
+        .where(UserStats.user_id == user_id)
+        .values({column: add_to_counter(getattr(UserStats, column), delta)})
+    )
+    if not db.execute(statement).rowcount:
+        ensure_user_stats(db, [user_id])
+        db.execute(statement)
+
+# ツイートの削除で一緒に消えるいいねを、いいねしたユーザーのいいね数から差し引く
+def decrement_like_counts_for_tweet(db: Session, tweet_id: int) -> int:
+    """
+    ツイートを削除する前に、同じトランザクション内で1文の UPDATE で行う（コミットは呼び出し元で行う）
+    戻り値は更新したユーザー数
+    """
+    likers = select(Like.user_id).where(Like.tweet_id == tweet_id)
+    return db.execute(
+        update(UserStats)
+        .where(UserStats.user_id.in_(likers))
+        .values(like_count=add_to_counter(UserStats.like_count, -1))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+# 集計元テーブルから件数を数えるスカラーサブクエリ
+def _count_subquery(model, user_column):
+    return (
+        select(func.count())
+        .select_from(model)
+        .where(user_column == UserStats.user_id)
+        .scalar_subquery()
+    )
+
+# ずれたカウンターを一括で再計算
+def reconcile_user_stats(db: Session, batch_size: int = 1000) -> int:
+    """
+    Follows / Tweets / Likes から件数を数え直し、UserStats と一致しない行だけを更新する
+    全ユーザーを user_id 順に batch_size 件ずつ処理する
+    戻り値は修正した行数（集計行が欠けていたユーザーの補完分を含む）
+    """
+    missing = select(User.user_id).where(
+        ~select(UserStats.user_id).where(UserStats.user_id == User.user_id).exists()
+    )
+    fixed = db.execute(insert(UserStats).from_select(["user_id"], missing)).rowcount
+    db.commit()
+
+    counts = {
+        "follower_count": _count_subquery(Follow, Follow.followed_user_id),
+        "following_count": _count_subquery(Follow, Follow.follower_user_id),
+        "tweet_count": _count_subquery(Tweet, Tweet.user_id),
+        "like_count": _count_subquery(Like, Like.user_id),
+    }
+    drifted = or_(*[getattr(UserStats, column) != count for column, count in counts.items()])
+
+    last_user_id = None
+    while True:
+        batch = db.query(UserStats.user_id).order_by(UserStats.user_id)
+        if last_user_id is not None:
+            batch = batch.filter(UserStats.user_id > last_user_id)
+        user_ids = [user_id for user_id, in batch.limit(batch_size).all()]
+        if not user_ids:
+            break
+        fixed += db.execute(
+            update(UserStats)
+            .where(UserStats.user_id.in_(user_ids))
+            .where(drifted)
+            .values(counts)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        last_user_id = user_ids[-1]
+
+    return fixed
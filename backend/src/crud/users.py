@@ -2,9 +2,10 @@
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from src.models.user import User
+from src.models.user import User, UserStats
 from src.auth.schemas import UserCreate
 from src.auth.utils import get_password_hash, verify_password
+from src.metrics.definitions import users_registered_total
 
 # ユーザー取得（メールアドレスで）
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
@@ -14,10 +15,52 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
 def get_user_by_user_id(db: Session, user_id: str) -> Optional[User]:
     return db.query(User).filter(User.user_id == user_id).first()
 
+# プロフィールとして返す列と集計値
+PROFILE_COLUMNS = (
+    "id", "e_mail", "user_id", "user_name", "phone_number", "self_introduction",
+    "place", "birthday", "profile_img", "avatar_img", "created_at", "updated_at",
+)
+PROFILE_COUNTS = ("tweet_count", "follower_count", "following_count", "like_count")
+
+# 本人以外には返さない項目
+PRIVATE_PROFILE_FIELDS = ("e_mail", "phone_number")
+
+# プロフィール取得（集計行のカウンターを含む）
+def get_user_profile(db: Session, user_id: str, current_user_id: Optional[str] = None) -> Optional[dict]:
+    """
+    ツイート数・フォロー数などは書き込み時に更新している UserStats から1回の JOIN で取得する（その場で数えない）
+    メールアドレスと電話番号は本人が取得した場合のみ返す
+    """
+    row = (
+        db.query(
+            User,
+            UserStats.tweet_count,
+            UserStats.follower_count,
+            UserStats.following_count,
+            UserStats.like_count,
+        )
+        .outerjoin(UserStats, UserStats.user_id == User.user_id)
+        .filter(User.user_id == user_id)
+        .first()
+    )
+    if not row:
+        return None
+    
+    user, *counts = row
+    profile = {column: getattr(user, column) for column in PROFILE_COLUMNS}
+    if user_id != current_user_id:
+        profile.update({field: None for field in PRIVATE_PROFILE_FIELDS})
+    profile.update(zip(PROFILE_COUNTS, (count or 0 for count in counts)))
+    return profile
+
 # ユーザー作成
-def create_user(db: Session, user: UserCreate) -> User:
+def create_user(db: Session, user: UserCreate, hashed_password: Optional[str] = None) -> User:
+    """
+    hashed_password を渡した場合はそれを保存する（ハッシュ化をDB処理の外で済ませる場合に使用）
+    """
     # パスワードをハッシュ化して安全に保存
-    hashed_password = get_password_hash(user.password)
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     
     # ユーザーオブジェクト作成
     db_user = User(
@@ -30,16 +73,24 @@ def create_user(db: Session, user: UserCreate) -> User:
         place=user.place,
         birthday=user.birthday,
         profile_img=user.profile_img,
-        avatar_img=user.avatar_img
+        avatar_img=user.avatar_img,
+        stats=UserStats()  # 集計行も同じトランザクションで作成
     )
     
     # DBに追加
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    users_registered_total.inc()
     
     return db_user
 
+# パスワードハッシュの更新（bcrypt のコスト変更時の再ハッシュなど）
+def update_user_password(db: Session, user_id: str, hashed_password: str) -> None:
+    db.query(User).filter(User.user_id == user_id)\
+        .update({User.password: hashed_password}, synchronize_session=False)
+    db.commit()
+
 # ユーザー認証
 def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     user = get_user_by_email(db, email)
@@ -0,0 +1,103 @@
+# src/crud/versions.py
+# 条件付きGET（ETag）用に、レスポンス全体を組み立てずに取得できるバージョン情報
+from sqlalchemy.orm import Session
+from sqlalchemy import desc, func
+from typing import Iterable, List, Optional, Tuple
+from datetime import datetime
+
+from src.models.tweet import Tweet, TweetStats
+from src.models.reply import Reply
+from src.models.user import UserStats
+from src.crud.keyset import keyset_before
+from src.crud.timelines import get_home_timeline_entries
+from src.crud.tweets import get_user_tweet_entries
+
+# ユーザーのいいね等の変更バージョン
+def get_viewer_version(db: Session, user_id: Optional[str]) -> int:
+    if not user_id:
+        return 0
+    version = db.query(UserStats.interaction_version).filter(UserStats.user_id == user_id).scalar()
+    return version or 0
+
+# ツイートごとのバージョン（存在しないツイートは含まれない）
+def get_tweet_versions(db: Session, tweet_ids: Iterable[int]) -> List[Tuple[int, int]]:
+    tweet_ids = list(tweet_ids)
+    if not tweet_ids:
+        return []
+    rows = (
+        db.query(Tweet.tweet_id, func.coalesce(TweetStats.version, 0))
+        .outerjoin(TweetStats, Tweet.tweet_id == TweetStats.tweet_id)
+        .filter(Tweet.tweet_id.in_(tweet_ids))
+        .order_by(Tweet.tweet_id)
+        .all()
+    )
+    return [tuple(row) for row in rows]
+
+# 指定したツイート群と閲覧者のバージョン
+def tweets_version(db: Session, tweet_ids: Iterable[int], current_user_id: Optional[str]) -> tuple:
+    return (get_tweet_versions(db, tweet_ids), get_viewer_version(db, current_user_id))
+
+# 一覧のページのエントリ (tweet_id, created_at) とバージョン
+# 戻り値のエントリは 304 でない場合にそのまま get_tweets_by_ids 等に渡し、ページを読み直さない
+PageVersion = Tuple[List[Tuple[int, datetime]], tuple]
+
+# ツイート一覧のエントリとバージョン（ページのツイートIDと集計バージョンを1クエリで取得）
+def tweet_list_version(
+    db: Session,
+    skip: int = 0,
+    limit: int = 20,
+    current_user_id: Optional[str] = None,
+    cursor: Optional[Tuple[datetime, int]] = None
+) -> PageVersion:
+    """
+    総件数は COUNT を避けるためバージョンに含めない
+    ツイートの作成・削除でページに含まれるツイートがずれればバージョンが変わるが、
+    ページより古いツイートの削除だけでは変わらないため、304 の場合の総件数は古い値のことがある
+    """
+    query = (
+        db.query(Tweet.tweet_id, Tweet.created_at, func.coalesce(TweetStats.version, 0))
+        .outerjoin(TweetStats, Tweet.tweet_id == TweetStats.tweet_id)
+        .order_by(desc(Tweet.created_at), desc(Tweet.tweet_id))
+    )
+    if cursor:
+        query = query.filter(keyset_before(cursor, Tweet.created_at, Tweet.tweet_id))
+    else:
+        query = query.offset(skip)
+    rows = query.limit(limit).all()
+    entries = [(tweet_id, created_at) for tweet_id, created_at, _ in rows]
+    versions = [(tweet_id, version) for tweet_id, _, version in rows]
+    return entries, (versions, get_viewer_version(db, current_user_id))
+
+# ホームタイムラインのエントリとバージョン
+def home_timeline_version(
+    db: Session,
+    user_id: str,
+    limit: int = 20,
+    cursor: Optional[Tuple[datetime, int]] = None
+) -> PageVersion:
+    entries = get_home_timeline_entries(db, user_id, limit=limit, cursor=cursor)
+    return entries, tweets_version(db, [tweet_id for tweet_id, _ in entries], user_id)
+
+# ユーザーのツイート一覧のエントリとバージョン
+def user_tweets_version(
+    db: Session,
+    user_id: str,
+    limit: int = 20,
+    current_user_id: Optional[str] = None,
+    cursor: Optional[Tuple[datetime, int]] = None
+) -> PageVersion:
+    entries = get_user_tweet_entries(db, user_id, limit=limit, cursor=cursor)
+    return entries, tweets_version(db, [tweet_id for tweet_id, _ in entries], current_user_id)
+
+# ツイートに対するリプライ全体のバージョン（リプライの追加・削除でのみ進み、いいね等では変わらない）
+def replies_version(db: Session, tweet_id: int) -> Optional[int]:
+    return db.query(TweetStats.reply_version).filter(TweetStats.tweet_id == tweet_id).scalar()
+
+# リプライ単体のバージョン（リプライが存在しない場合は None）
+def reply_version(db: Session, reply_id: int) -> Optional[tuple]:
+    row = (
+        db.query(Reply.reply_id, Reply.child_reply_count)
+        .filter(Reply.reply_id == reply_id)
+        .first()
+    )
+    return tuple(row) if row else None
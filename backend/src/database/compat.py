@@ -0,0 +1,23 @@
+# src/database/compat.py
+# ローカル検証・テスト用に SQLite でも同じモデル定義からテーブルを作成できるようにする
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateColumn
+
+# SQLAlchemy の SQLite 用 DATETIME と同じ書式（マイクロ秒まで）で現在時刻を入れる
+SQLITE_CURRENT_TIMESTAMP = "DEFAULT (strftime('%Y-%m-%d %H:%M:%f000', 'now'))"
+
+# SQLite では INTEGER PRIMARY KEY のみが自動採番されるため BIGINT を INTEGER として作成
+@compiles(BigInteger, "sqlite")
+def compile_big_integer_sqlite(type_, compiler, **kw):
+    return "INTEGER"
+
+# MySQL 固有の ON UPDATE CURRENT_TIMESTAMP を SQLite で解釈できるデフォルト値に置き換える
+@compiles(CreateColumn, "sqlite")
+def compile_create_column_sqlite(element, compiler, **kw):
+    ddl = compiler.visit_create_column(element, **kw)
+    if ddl is None:
+        return ddl
+    return ddl\
+        .replace("DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP", SQLITE_CURRENT_TIMESTAMP)\
+        .replace("DEFAULT CURRENT_TIMESTAMP", SQLITE_CURRENT_TIMESTAMP)
@@ -0,0 +1,121 @@
+# src/database/instrumentation.py
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# 発行元として報告する crud 関数のモジュール
+CRUD_PACKAGE = "src.crud."
+
+class QueryStats:
+    """リクエスト（または計測範囲）内で実行されたSQLの件数・合計時間・文ごとの実行回数"""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.count = 0
+        self.duration = 0.0  # 秒
+        self.statements: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration: float) -> int:
+        """実行を記録し、同じ文の実行回数を返す"""
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+            self.statements[statement] += 1
+            return self.statements[statement]
+
+    def repeated(self, threshold: int) -> List[tuple]:
+        """threshold 回以上実行された文と回数"""
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+# 実行中のリクエストの統計（ミドルウェアが設定し、スレッドプールにも引き継がれる）
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+# track_queries() で計測中の統計（スレッドやイベントループをまたいで全SQLを集計する）
+_trackers: List[QueryStats] = []
+_trackers_lock = threading.Lock()
+
+# 呼び出し元をたどり、SQLを発行した crud 関数を探す
+def find_origin() -> Optional[str]:
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith(CRUD_PACKAGE):
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+
+    stats = _current_stats.get()
+    if stats is not None:
+        executions = stats.record(statement, duration)
+        # 同じ文が繰り返されている場合は N+1 の可能性があるため1回だけ警告する
+        if executions == settings.SQL_N_PLUS_ONE_THRESHOLD:
+            logger.warning(
+                "同じSQLが %d 回実行されました（N+1 の可能性）: %s [%s] %s",
+                executions, stats.label, find_origin(), statement,
+            )
+    if _trackers:
+        with _trackers_lock:
+            for tracker in _trackers:
+                tracker.record(statement, duration)
+
+    if settings.SQL_SLOW_QUERY_MS is not None and duration * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        logger.warning(
+            "遅いSQL（%.1f ms）: %s [%s] %s",
+            duration * 1000, stats.label if stats else "-", find_origin(), statement,
+        )
+
+def _handle_error(context):
+    # 失敗した文の開始時刻を取り除く
+    starts = context.connection.info.get("query_start_time") if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+# エンジンにSQLの計測イベントを登録
+def instrument_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+@contextmanager
+def request_queries(label: str) -> Iterator[QueryStats]:
+    """リクエスト内で実行されたSQLを集計する（ミドルウェアから使用）"""
+    stats = QueryStats(label)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+@contextmanager
+def track_queries(label: str = "") -> Iterator[QueryStats]:
+    """
+    範囲内で実行された全てのSQLを集計する（テストでのクエリ数の確認用）
+    TestClient のようにアプリケーションが別スレッドで動く場合も集計できる
+    """
+    stats = QueryStats(label)
+    with _trackers_lock:
+        _trackers.append(stats)
+    try:
+        yield stats
+    finally:
+        with _trackers_lock:
+            _trackers.remove(stats)
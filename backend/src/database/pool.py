@@ -0,0 +1,127 @@
+# src/database/pool.py
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+# 接続待ち時間ヒストグラムのバケット上限（秒）
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class PoolStats:
+    """
+    コネクションプールの累積統計（接続待ち時間、タイムアウト、接続の生成・破棄）
+    複数スレッドから更新されるためロックで保護する
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine: Optional[Engine] = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.disconnects = 0
+        self.invalidations = 0
+        self.wait_count = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)  # 最後は上限なし
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_count += 1
+            self.wait_sum += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.wait_buckets[bisect_left(WAIT_BUCKETS, seconds)] += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self) -> dict:
+        """現在のプール状態と累積統計を辞書で返す"""
+        with self._lock:
+            cumulative = 0
+            histogram = []
+            for bound, count in zip(list(WAIT_BUCKETS) + [None], self.wait_buckets):
+                cumulative += count
+                histogram.append({"le": bound if bound is not None else "+Inf", "count": cumulative})
+            data = {
+                "name": self.name,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "disconnects": self.disconnects,
+                "invalidations": self.invalidations,
+                "wait_seconds": {
+                    "count": self.wait_count,
+                    "sum": self.wait_sum,
+                    "max": self.wait_max,
+                    "histogram": histogram,
+                },
+            }
+
+        # dispose() でプールが作り直されても最新のプールを参照する
+        pool = self.engine.pool if self.engine is not None else None
+        if pool is not None:
+            data["pool_class"] = type(pool).__name__
+            # QueuePool 系のみが持つ指標
+            for key in ("size", "checkedin", "checkedout", "overflow"):
+                method = getattr(pool, key, None)
+                if callable(method):
+                    data[key] = method()
+            data["status"] = pool.status()
+        return data
+
+# 登録済みプールの統計（エンジン名 -> 統計）
+pool_stats: Dict[str, PoolStats] = {}
+
+class InstrumentedPoolMixin:
+    """接続の取得（空き待ちを含む）にかかった時間とタイムアウトを記録する"""
+
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        return connection
+
+# 統計を記録するプールクラスを作成
+def instrumented_pool_class(base: Type[Pool], name: str) -> Type[Pool]:
+    stats = pool_stats.setdefault(name, PoolStats(name))
+    return type(f"Instrumented{base.__name__}", (InstrumentedPoolMixin, base), {"stats": stats})
+
+# エンジンに接続の生成・破棄を記録するイベントを登録
+def watch_engine(engine: Engine, name: str) -> None:
+    stats = pool_stats.setdefault(name, PoolStats(name))
+    stats.engine = engine
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        stats.record("connects")
+
+    @event.listens_for(engine, "close")
+    def on_close(dbapi_connection, connection_record):
+        stats.record("disconnects")
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        stats.record("invalidations")
+
+# 全プールの統計を取得
+def get_pool_stats() -> List[dict]:
+    return [stats.snapshot() for stats in pool_stats.values()]
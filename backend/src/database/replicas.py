@@ -0,0 +1,84 @@
+# src/database/replicas.py
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+class Replica:
+    """読み取り専用レプリカ1台分の接続情報と状態"""
+
+    def __init__(self, name: str, engine: Engine, session_factory: Callable[[], Any]):
+        self.name = name
+        self.engine = engine  # ヘルスチェック用の同期エンジン
+        self.session_factory = session_factory  # リクエストで使うセッション（同期または非同期）
+        self.healthy = True
+        self.last_error: Optional[str] = None
+        self.last_checked_at: Optional[float] = None
+
+class ReplicaSet:
+    """
+    正常なレプリカをラウンドロビンで選択する
+    接続エラーが発生したレプリカは除外し、ヘルスチェックで復帰を確認できたら戻す
+    """
+
+    def __init__(self, replicas: List[Replica]):
+        self.replicas = replicas
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self) -> Optional[Replica]:
+        """正常なレプリカを1台選ぶ（全滅している場合は None）"""
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        with self._lock:
+            index = next(self._counter)
+        return healthy[index % len(healthy)]
+
+    def mark_unhealthy(self, replica: Replica, error: Exception) -> None:
+        if replica.healthy:
+            logger.warning("レプリカ %s を除外します: %s", replica.name, error)
+        replica.healthy = False
+        replica.last_error = str(error)
+
+    def check_health(self) -> None:
+        """全レプリカに SELECT 1 を発行して状態を更新する（ブロッキング）"""
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+            except Exception as e:
+                self.mark_unhealthy(replica, e)
+            else:
+                if not replica.healthy:
+                    logger.info("レプリカ %s が復帰しました", replica.name)
+                replica.healthy = True
+                replica.last_error = None
+            replica.last_checked_at = time.time()
+
+    async def monitor(self, interval: float) -> None:
+        """ヘルスチェックを interval 秒ごとに実行し続ける（バックグラウンドタスク用）"""
+        while True:
+            await asyncio.to_thread(self.check_health)
+            await asyncio.sleep(interval)
+
+    def status(self) -> List[dict]:
+        return [
+            {
+                "name": replica.name,
+                "healthy": replica.healthy,
+                "last_error": replica.last_error,
+                "last_checked_at": replica.last_checked_at,
+            }
+            for replica in self.replicas
+        ]
@@ -1,16 +1,99 @@
+from typing import Any, Callable, Optional, TypeVar, Union
+
 from sqlalchemy import create_engine
+from sqlalchemy.exc import DisconnectionError, OperationalError
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
 
 from src.config.settings import settings
+from src.database import compat  # noqa: F401  SQLite 用のDDL調整を登録
+from src.database.pool import instrumented_pool_class, watch_engine
+from src.database.instrumentation import instrument_engine
+from src.database.replicas import Replica, ReplicaSet
+
+T = TypeVar("T")
+
+# データベース接続URL（DB_URL 未指定時は MySQL に接続）
+DATABASE_URL = settings.DB_URL or f"mysql+pymysql://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+
+# 同期ドライバのURLを非同期ドライバのURLに変換
+def to_async_url(url: str) -> str:
+    for sync_prefix, async_prefix in (
+        ("mysql+pymysql://", "mysql+aiomysql://"),
+        ("sqlite+pysqlite://", "sqlite+aiosqlite://"),
+        ("sqlite://", "sqlite+aiosqlite://"),
+    ):
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
 
-# MySQLデータベース接続URL
-DATABASE_URL = f"mysql+pymysql://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+# 接続先ごとのエンジン設定（プール設定は Settings から読み込む）
+def engine_options(url: str, name: str, is_async: bool = False) -> dict:
+    options = {}
+    if url.startswith("sqlite"):
+        # スレッドプールや別スレッドから同じ接続を使えるようにする
+        options["connect_args"] = {"check_same_thread": False}
+        if make_url(url).database in (None, "", ":memory:"):
+            return options  # インメモリDBは接続を共有する専用プールのまま使う
+
+    base_pool = AsyncAdaptedQueuePool if is_async else QueuePool
+    options.update(
+        poolclass=instrumented_pool_class(base_pool, name),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    return options
+
+ASYNC_DATABASE_URL = settings.DB_ASYNC_URL or to_async_url(DATABASE_URL)
 
 # SQLAlchemyエンジンとセッションの作成
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL, "primary"))
+watch_engine(engine, "primary")
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 非同期エンジンとセッション（DB_ASYNC=true の場合のみ作成）
+async_engine = None
+if settings.DB_ASYNC:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, "primary_async", is_async=True)
+    )
+    watch_engine(async_engine.sync_engine, "primary_async")
+    instrument_engine(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=async_engine
+)
+
+# 読み取り専用レプリカ（DB_REPLICA_URLS 指定時のみ）
+def create_replica(index: int, url: str) -> Replica:
+    name = f"replica_{index}"
+    replica_engine = create_engine(url, **engine_options(url, name))
+    watch_engine(replica_engine, name)
+    instrument_engine(replica_engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+    if settings.DB_ASYNC:
+        async_url = to_async_url(url)
+        replica_async_engine = create_async_engine(
+            async_url, **engine_options(async_url, f"{name}_async", is_async=True)
+        )
+        watch_engine(replica_async_engine.sync_engine, f"{name}_async")
+        instrument_engine(replica_async_engine.sync_engine)
+        session_factory = async_sessionmaker(
+            autocommit=False, autoflush=False, expire_on_commit=False, bind=replica_async_engine
+        )
+
+    return Replica(name, replica_engine, session_factory)
+
+replica_set = ReplicaSet([create_replica(i, url) for i, url in enumerate(settings.DB_REPLICA_URLS)])
+
 Base = declarative_base()
 
 # DBセッションの依存関係（FastAPIのDependsで使用）
@@ -20,3 +103,81 @@ def get_db():
         yield db  # リクエスト処理中はセッションを維持
     finally:
         db.close()  # リクエスト完了後にセッションを閉じる
+
+# 非同期DBセッションの依存関係
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+class DBSession:
+    """
+    同期・非同期どちらのセッションでも crud 関数を await で呼び出せるようにするラッパー
+    AsyncSession の場合は run_sync でイベントループを塞がずに実行し、
+    同期 Session の場合はスレッドプールで実行する
+    """
+
+    def __init__(self, session: Union[Session, AsyncSession]):
+        self.session = session
+
+    @property
+    def is_async(self) -> bool:
+        return isinstance(self.session, AsyncSession)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """fn(session, *args, **kwargs) を実行して結果を返す"""
+        if self.is_async:
+            return await self.session.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+    async def close(self) -> None:
+        if self.is_async:
+            await self.session.close()
+        else:
+            await run_in_threadpool(self.session.close)
+
+class ReplicaDBSession(DBSession):
+    """
+    レプリカに接続した読み取り用セッション
+    接続エラーが起きた場合はレプリカを除外し、プライマリで実行し直す
+    """
+
+    def __init__(self, session: Union[Session, AsyncSession], replica: Replica):
+        super().__init__(session)
+        self.replica: Optional[Replica] = replica
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self.replica is None:
+            return await super().run(fn, *args, **kwargs)
+        try:
+            return await super().run(fn, *args, **kwargs)
+        except (OperationalError, DisconnectionError) as e:
+            replica_set.mark_unhealthy(self.replica, e)
+            await self.close()
+            self.session = open_session()
+            self.replica = None
+            return await super().run(fn, *args, **kwargs)
+
+# プライマリへのセッションを作成（DB_ASYNC 設定で同期・非同期を切り替え）
+def open_session() -> Union[Session, AsyncSession]:
+    return AsyncSessionLocal() if settings.DB_ASYNC else SessionLocal()
+
+# ルーターで使用するDBセッションの依存関係（書き込みと、書き込み直後の読み込みに使用）
+async def get_db_session():
+    db = DBSession(open_session())
+    try:
+        yield db
+    finally:
+        await db.close()
+
+# 読み取り専用ルートで使用するDBセッションの依存関係
+# レプリカが設定されていればラウンドロビンで振り分け、なければプライマリを使う
+async def get_read_db_session():
+    replica = replica_set.choose()
+    if replica is None:
+        db = DBSession(open_session())
+    else:
+        db = ReplicaDBSession(replica.session_factory(), replica)
+    try:
+        yield db
+    finally:
+        await db.close()
@@ -0,0 +1,83 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+
+from src.config.settings import settings
+from src.cache.tweets import tweet_cache
+from src.auth.hashing import password_hasher
+from src.tweets.write_buffer import interaction_buffer
+from src.tweets.impressions import impression_counter
+from src.stream.broadcaster import tweet_broadcaster
+from src.ratelimit.limiter import rate_limiter
+from src.trending.tracker import trending_tracker
+from src.outbox.worker import outbox_pool
+from src.metrics.definitions import registry
+from src.database.pool import get_pool_stats
+from src.database.session import DBSession, get_db_session, replica_set
+from src.crud.outbox import get_outbox_status
+
+# 内部エンドポイントへのアクセス制御（トークン未設定の場合は存在しないものとして扱う）
+def require_internal_access(x_internal_token: Optional[str] = Header(None)):
+    if not settings.INTERNAL_API_ENABLED or not settings.INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_internal_token is None or not hmac.compare_digest(x_internal_token, settings.INTERNAL_API_TOKEN):
+        raise HTTPException(status_code=403, detail="アクセス権限がありません")
+
+router = APIRouter(dependencies=[Depends(require_internal_access)])
+
+@router.get("/pool")
+def read_pool_stats():
+    """コネクションプールの状態と累積統計を取得"""
+    return {"pools": get_pool_stats()}
+
+@router.get("/replicas")
+def read_replica_status():
+    """読み取り専用レプリカのヘルスチェック状態を取得"""
+    return {"replicas": replica_set.status()}
+
+@router.get("/cache")
+def read_cache_stats():
+    """ツイート詳細キャッシュのヒット率と追い出し件数を取得"""
+    return {"tweets": tweet_cache.stats()}
+
+@router.get("/password-hasher")
+def read_password_hasher_stats():
+    """パスワードハッシュ計算の待ち件数と拒否件数を取得"""
+    return password_hasher.stats()
+
+@router.get("/interaction-buffer")
+def read_interaction_buffer_stats():
+    """インタラクションの write-behind バッファの状態を取得"""
+    return interaction_buffer.stats()
+
+@router.get("/impressions")
+def read_impression_stats():
+    """表示回数の未書き込み件数と書き込み実績を取得"""
+    return impression_counter.stats()
+
+@router.get("/rate-limit")
+def read_rate_limit_stats():
+    """レート制限の予算ごとの許可・拒否件数と、書き込みの同時実行数を取得"""
+    return rate_limiter.stats()
+
+@router.get("/stream")
+def read_stream_stats():
+    """ストリーム配信の接続数と配信・切断件数を取得"""
+    return tweet_broadcaster.stats()
+
+@router.get("/trending")
+def read_trending_stats():
+    """トレンドの保持件数と再計算の状況を取得"""
+    return trending_tracker.stats()
+
+@router.get("/outbox")
+async def read_outbox_stats(db: DBSession = Depends(get_db_session)):
+    """アウトボックスの未処理・デッドレターの件数と処理の遅延、このプロセスのワーカーの状態を取得"""
+    return {**await db.run(get_outbox_status), "pool": outbox_pool.stats()}
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    """Prometheus のテキスト形式でメトリクスを出力（複数ワーカーの場合は全ワーカー分を合算）"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,48 @@
+# src/metrics/definitions.py
+# アプリケーションで記録するメトリクス
+from src.config.settings import settings
+from src.metrics.registry import Registry
+
+registry = Registry(multiproc_dir=settings.METRICS_MULTIPROC_DIR)
+
+# HTTP（ルートはパスのテンプレート単位。例: /api/tweets/{tweet_id}）
+http_requests_total = registry.counter(
+    "http_requests_total", "処理したリクエスト数", ["method", "route", "status"]
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "リクエストの処理時間（秒）", ["method", "route"]
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "処理中のリクエスト数", ["method", "route"]
+)
+http_response_size_bytes = registry.histogram(
+    "http_response_size_bytes", "レスポンス本文のサイズ（バイト）", ["method", "route"],
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+)
+
+http_requests_rate_limited_total = registry.counter(
+    "http_requests_rate_limited_total", "レート制限で拒否したリクエスト数（429）", ["budget"]
+)
+http_requests_shed_total = registry.counter(
+    "http_requests_shed_total", "書き込みの同時実行数の上限で拒否したリクエスト数（503）"
+)
+
+# 業務上のイベント（コミット後に記録する）
+users_registered_total = registry.counter("users_registered_total", "登録されたユーザー数")
+tweets_created_total = registry.counter("tweets_created_total", "作成されたツイート数")
+tweets_deleted_total = registry.counter("tweets_deleted_total", "削除されたツイート数")
+replies_created_total = registry.counter("replies_created_total", "作成されたリプライ数")
+follows_total = registry.counter("follows_total", "フォロー・アンフォローの件数", ["action"])
+tweet_impressions_total = registry.counter("tweet_impressions_total", "レスポンスとして返したツイートの表示回数")
+interactions_total = registry.counter(
+    "interactions_total", "いいね・リツイート・ブックマークの追加・削除の件数", ["type", "action"]
+)
+
+# トランザクショナルアウトボックス（記録から処理までの遅延はイベントの記録時刻からの秒数）
+outbox_events_processed_total = registry.counter(
+    "outbox_events_processed_total", "処理したアウトボックスのイベント数", ["type", "result"]
+)
+outbox_lag_seconds = registry.histogram(
+    "outbox_lag_seconds", "アウトボックスのイベントを記録してから処理するまでの秒数", ["type"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
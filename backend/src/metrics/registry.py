@@ -0,0 +1,206 @@
+# src/metrics/registry.py
+import glob
+import json
+import os
+import tempfile
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# レイテンシ（秒）の既定のバケット上限
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+class Metric:
+    """ラベルの値ごとに値を保持するメトリクスの基底クラス（複数スレッドから更新される）"""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = [[list(key), self._copy(value)] for key, value in self._values.items()]
+        return {"type": self.type, "help": self.documentation, "labelnames": list(self.labelnames), "samples": samples}
+
+    @staticmethod
+    def _copy(value):
+        return value
+
+class Counter(Metric):
+    """増加のみする値"""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(Metric):
+    """増減する現在値（複数ワーカーの値は合計する）"""
+
+    type = "gauge"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+class Histogram(Metric):
+    """値の分布（バケットごとの件数、合計、件数）"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"buckets": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            state["buckets"][index] += 1  # 最後は上限なし
+            state["sum"] += value
+            state["count"] += 1
+
+    @staticmethod
+    def _copy(value):
+        return {"buckets": list(value["buckets"]), "sum": value["sum"], "count": value["count"]}
+
+    def snapshot(self) -> dict:
+        data = super().snapshot()
+        data["bucket_bounds"] = list(self.buckets)
+        return data
+
+class Registry:
+    """
+    メトリクスの登録と Prometheus テキスト形式での出力
+    multiproc_dir を指定すると各ワーカーの値をファイルに書き出し、出力時に全ワーカー分を合算する
+    """
+
+    def __init__(self, multiproc_dir: Optional[str] = None):
+        self.multiproc_dir = multiproc_dir
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"メトリクスが重複しています: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def _worker_path(self) -> str:
+        return os.path.join(self.multiproc_dir, f"worker-{os.getpid()}.json")
+
+    def write_snapshot(self) -> None:
+        """このワーカーの値をファイルに書き出す（一時ファイルから置き換えて途中の状態を読ませない）"""
+        if not self.multiproc_dir:
+            return
+        os.makedirs(self.multiproc_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.multiproc_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, self._worker_path())
+
+    def collect(self) -> Dict[str, dict]:
+        """全ワーカーの値を合算する（単一プロセスの場合はこのプロセスの値）"""
+        if not self.multiproc_dir:
+            return self.snapshot()
+        self.write_snapshot()
+        snapshots = []
+        for path in sorted(glob.glob(os.path.join(self.multiproc_dir, "worker-*.json"))):
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # 書き込み途中・削除済みのファイルは無視する
+        return merge_snapshots(snapshots)
+
+    def render(self) -> str:
+        return render_text(self.collect())
+
+# 複数ワーカーのスナップショットを合算（カウンター・ゲージは合計、ヒストグラムはバケットごとに合計）
+def merge_snapshots(snapshots: Iterable[Dict[str, dict]]) -> Dict[str, dict]:
+    merged: Dict[str, dict] = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {**metric, "samples": {}})
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                current = target["samples"].get(key)
+                if metric["type"] == "histogram":
+                    if current is None:
+                        target["samples"][key] = {"buckets": list(value["buckets"]), "sum": value["sum"], "count": value["count"]}
+                    else:
+                        current["buckets"] = [a + b for a, b in zip(current["buckets"], value["buckets"])]
+                        current["sum"] += value["sum"]
+                        current["count"] += value["count"]
+                else:
+                    target["samples"][key] = (current or 0) + value
+    for metric in merged.values():
+        metric["samples"] = [[list(key), value] for key, value in metric["samples"].items()]
+    return merged
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+# Prometheus のテキスト形式（version 0.0.4）で出力
+def render_text(metrics: Dict[str, dict]) -> str:
+    lines: List[str] = []
+    for name, metric in metrics.items():
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric["labelnames"]
+        for labels, value in sorted(metric["samples"], key=lambda sample: sample[0]):
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+                continue
+            cumulative = 0
+            bounds = list(metric["bucket_bounds"]) + [float("inf")]
+            for bound, count in zip(bounds, value["buckets"]):
+                cumulative += count
+                le = _format_value(bound) if bound == float("inf") else repr(float(bound))
+                lines.append(f"{name}_bucket{_format_labels(labelnames, labels, ('le', le))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labelnames, labels)} {_format_value(value['sum'])}")
+            lines.append(f"{name}_count{_format_labels(labelnames, labels)} {value['count']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,2 @@
+# 文字列で参照しているリレーションシップを解決できるよう、全モデルを登録しておく
+from src.models import user, tweet, reply, interactions, follow, timeline, search, outbox  # noqa: F401
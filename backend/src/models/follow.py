@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, ForeignKey, TIMESTAMP, text, PrimaryKeyConstraint
+from sqlalchemy.orm import relationship
+
+from src.database.session import Base
+
+class Follow(Base):
+    __tablename__ = "Follows"
+
+    follower_user_id = Column(String(50), ForeignKey("Users.user_id"), nullable=False)  # フォローする側
+    followed_user_id = Column(String(50), ForeignKey("Users.user_id"), nullable=False)  # フォローされる側
+    created_at = Column(TIMESTAMP, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+    updated_at = Column(TIMESTAMP, nullable=False, server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"))
+
+    # 複合主キーの設定
+    __table_args__ = (PrimaryKeyConstraint('follower_user_id', 'followed_user_id'),)
+
+    # リレーションシップの定義
+    follower = relationship("User", foreign_keys=[follower_user_id], back_populates="following")
+    followed = relationship("User", foreign_keys=[followed_user_id], back_populates="followers")
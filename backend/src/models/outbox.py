@@ -0,0 +1,35 @@
+from sqlalchemy import Column, String, Text, BigInteger, Integer, Index, text
+
+from src.database.session import Base
+
+class OutboxEvent(Base):
+    __tablename__ = "OutboxEvents"  # 書き込みと同じトランザクションで記録し、バックグラウンドで処理する副作用
+
+    event_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    event_type = Column(String(50), nullable=False)
+    aggregate_id = Column(BigInteger, nullable=False)  # 順序を保証する単位（ツイートのイベントは tweet_id）
+    partition_no = Column(Integer, nullable=False)  # aggregate_id % OUTBOX_PARTITIONS（パーティションごとに1つのワーカーが処理する）
+    payload = Column(Text, nullable=False, default="{}")  # JSON
+    status = Column(String(10), nullable=False, server_default=text("'pending'"), default="pending")  # pending / dead（処理済みの行は削除する）
+    attempts = Column(Integer, nullable=False, server_default=text("0"), default=0)
+    last_error = Column(Text, nullable=True)
+    # 遅延の計測と再試行の待機はアプリケーションの時計（エポックミリ秒）で行う
+    created_at_ms = Column(BigInteger, nullable=False)
+    available_at_ms = Column(BigInteger, nullable=False)  # この時刻以降に処理する（再試行の待機）
+
+    __table_args__ = (
+        Index("idx_outbox_events_partition_status", "partition_no", "status", "event_id"),  # パーティションごとの取り出し用
+    )
+
+class OutboxLease(Base):
+    __tablename__ = "OutboxLeases"  # パーティションを処理するプロセスの排他（期限つき）
+
+    partition_no = Column(Integer, primary_key=True, autoincrement=False)
+    owner = Column(String(100), nullable=False, server_default=text("''"), default="")
+    expires_at_ms = Column(BigInteger, nullable=False, server_default=text("0"), default=0)
+
+class OutboxWorkerHeartbeat(Base):
+    __tablename__ = "OutboxWorkers"  # 稼働中のプロセス（パーティションを均等に分けるための生存確認）
+
+    owner = Column(String(100), primary_key=True)
+    expires_at_ms = Column(BigInteger, nullable=False, server_default=text("0"), default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, TIMESTAMP, text, BigInteger, ForeignKey
+from sqlalchemy import Column, String, Text, TIMESTAMP, text, BigInteger, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from src.database.session import Base
@@ -11,9 +11,18 @@ class Reply(Base):
     tweet_id = Column(BigInteger, ForeignKey("Tweets.tweet_id"), nullable=False)
     parent_reply_id = Column(BigInteger, ForeignKey("Replies.reply_id"), nullable=True)
     reply_content = Column(Text, nullable=False)
+    # 祖先から自身までのリプライIDを "/" 区切りで連結した経路（例: "12/45/78/"）
+    path = Column(String(700), nullable=False, server_default=text("''"), default="")
+    depth = Column(Integer, nullable=False, server_default=text("0"), default=0)  # ツイートへの直接リプライが 0
+    child_reply_count = Column(Integer, nullable=False, server_default=text("0"), default=0)  # 直下のリプライ数
     created_at = Column(TIMESTAMP, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
     updated_at = Column(TIMESTAMP, nullable=False, server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"))
 
+    __table_args__ = (
+        Index("idx_replies_tweet_parent_created", "tweet_id", "parent_reply_id", "created_at", "reply_id"),  # 階層ごとの新着順取得用
+        Index("idx_replies_path", "path"),  # 部分木の前方一致検索用
+    )
+
     # リレーションシップの定義
     user = relationship("User", back_populates="replies")
     tweet = relationship("Tweet", back_populates="replies")
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, BigInteger, ForeignKey, TIMESTAMP, PrimaryKeyConstraint, Index
+from sqlalchemy.dialects import mysql
+
+from src.database.session import Base
+
+class TweetSearchToken(Base):
+    __tablename__ = "TweetSearchTokens"  # ツイート本文の n-gram 転置インデックス
+
+    # 正規化済みの2文字（区切りの末尾は1文字）。大文字小文字・かなを区別するためMySQLではバイナリ照合順序
+    token = Column(String(2).with_variant(mysql.VARCHAR(2, collation="utf8mb4_bin"), "mysql"), nullable=False)
+    tweet_id = Column(BigInteger, ForeignKey("Tweets.tweet_id"), nullable=False)
+    created_at = Column(TIMESTAMP, nullable=False)  # ツイートの作成日時（新着順・カーソル用）
+
+    __table_args__ = (
+        PrimaryKeyConstraint('token', 'tweet_id'),
+        Index("idx_tweet_search_tokens_token_created", "token", "created_at", "tweet_id"),
+        Index("idx_tweet_search_tokens_tweet", "tweet_id"),  # ツイート削除時用
+    )
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, BigInteger, ForeignKey, TIMESTAMP, PrimaryKeyConstraint, Index
+
+from src.database.session import Base
+
+class HomeTimelineEntry(Base):
+    __tablename__ = "HomeTimelines"  # フォロワーごとに実体化したホームタイムライン
+
+    user_id = Column(String(50), ForeignKey("Users.user_id"), nullable=False)  # タイムラインの持ち主
+    tweet_id = Column(BigInteger, ForeignKey("Tweets.tweet_id"), nullable=False)
+    author_user_id = Column(String(50), nullable=False)  # アンフォロー時の削除用
+    created_at = Column(TIMESTAMP, nullable=False)  # ツイートの作成日時（並び順・カーソル用）
+
+    __table_args__ = (
+        PrimaryKeyConstraint('user_id', 'tweet_id'),
+        Index("idx_home_timelines_user_created", "user_id", "created_at", "tweet_id"),
+        Index("idx_home_timelines_user_author", "user_id", "author_user_id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, TIMESTAMP, text, BigInteger, ForeignKey
+from sqlalchemy import Column, String, Text, TIMESTAMP, text, BigInteger, Integer, ForeignKey, Index, LargeBinary
 from sqlalchemy.orm import relationship
 
 from src.database.session import Base
@@ -12,9 +12,39 @@ class Tweet(Base):
     created_at = Column(TIMESTAMP, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
     updated_at = Column(TIMESTAMP, nullable=False, server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"))
 
+    # タイムラインのキーセットページネーション用インデックス
+    __table_args__ = (
+        Index("idx_tweets_created_at", "created_at", "tweet_id"),
+        Index("idx_tweets_user_created", "user_id", "created_at", "tweet_id"),  # ユーザー別の新着順取得用
+    )
+
     # リレーションシップの定義
     user = relationship("User", back_populates="tweets")
     likes = relationship("Like", back_populates="tweet", cascade="all, delete-orphan")
     retweets = relationship("Retweet", back_populates="tweet", cascade="all, delete-orphan")
     bookmarks = relationship("Bookmark", back_populates="tweet", cascade="all, delete-orphan")
     replies = relationship("Reply", back_populates="tweet", cascade="all, delete-orphan")
+    stats = relationship("TweetStats", back_populates="tweet", uselist=False, cascade="all, delete-orphan")
+
+class TweetStats(Base):
+    __tablename__ = "TweetStats"  # ツイートごとのエンゲージメント集計（非正規化カウンター）
+
+    tweet_id = Column(BigInteger, ForeignKey("Tweets.tweet_id"), primary_key=True)
+    like_count = Column(Integer, nullable=False, server_default=text("0"), default=0)
+    retweet_count = Column(Integer, nullable=False, server_default=text("0"), default=0)
+    bookmark_count = Column(Integer, nullable=False, server_default=text("0"), default=0)
+    version = Column(BigInteger, nullable=False, server_default=text("0"), default=0)  # カウンターが変わるたびに加算（ETag用）
+    reply_version = Column(BigInteger, nullable=False, server_default=text("0"), default=0)  # リプライの追加・削除のたびに加算（リプライ一覧の ETag 用）
+    updated_at = Column(TIMESTAMP, nullable=False, server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"))
+
+    # リレーションシップの定義
+    tweet = relationship("Tweet", back_populates="stats")
+
+class TweetImpressions(Base):
+    __tablename__ = "TweetImpressions"  # ツイートごとの表示回数（プロセス内で集計して定期的に加算する）
+
+    tweet_id = Column(BigInteger, ForeignKey("Tweets.tweet_id"), primary_key=True)  # ツイート削除時はDBの ON DELETE CASCADE で削除
+    view_count = Column(BigInteger, nullable=False, server_default=text("0"), default=0)
+    unique_viewers = Column(BigInteger, nullable=False, server_default=text("0"), default=0)  # viewer_sketch から推定したユニーク閲覧者数
+    viewer_sketch = Column(LargeBinary, nullable=True)  # 閲覧者の HyperLogLog のレジスタ
+    updated_at = Column(TIMESTAMP, nullable=False, server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Date, TIMESTAMP, text, BigInteger
+from sqlalchemy import Column, String, Text, Date, TIMESTAMP, text, BigInteger, Integer, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
@@ -28,3 +28,20 @@ class User(Base):
     retweets = relationship("Retweet", back_populates="user", cascade="all, delete-orphan")
     bookmarks = relationship("Bookmark", back_populates="user", cascade="all, delete-orphan")
     replies = relationship("Reply", back_populates="user", cascade="all, delete-orphan")
+    following = relationship("Follow", foreign_keys="Follow.follower_user_id", back_populates="follower", cascade="all, delete-orphan")
+    followers = relationship("Follow", foreign_keys="Follow.followed_user_id", back_populates="followed", cascade="all, delete-orphan")
+    stats = relationship("UserStats", back_populates="user", uselist=False, cascade="all, delete-orphan")
+
+class UserStats(Base):
+    __tablename__ = "UserStats"  # ユーザーごとの集計（非正規化カウンター。書き込み時に同じトランザクションで更新する）
+
+    user_id = Column(String(50), ForeignKey("Users.user_id"), primary_key=True)
+    follower_count = Column(Integer, nullable=False, server_default=text("0"), default=0, index=True)
+    following_count = Column(Integer, nullable=False, server_default=text("0"), default=0)
+    tweet_count = Column(Integer, nullable=False, server_default=text("0"), default=0)
+    like_count = Column(Integer, nullable=False, server_default=text("0"), default=0)  # ユーザーがいいねしたツイート数
+    interaction_version = Column(BigInteger, nullable=False, server_default=text("0"), default=0)  # いいね等を変更するたびに加算（ETag用）
+    updated_at = Column(TIMESTAMP, nullable=False, server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"))
+
+    # リレーションシップの定義
+    user = relationship("User", back_populates="stats")
@@ -0,0 +1,36 @@
+# src/outbox/handlers.py
+from typing import Callable, Dict
+
+from sqlalchemy.orm import Session
+
+from src.models.tweet import Tweet
+from src.crud.timelines import fan_out_tweet, backfill_followers_timelines
+from src.crud.search import index_tweet, unindex_tweet
+
+# ハンドラーは (db, aggregate_id, payload) を受け取り、コミットせずにDBへの副作用を行う
+# 呼び出し元がイベント行の削除と同じトランザクションでコミットするため、DBへの副作用は1回だけ反映される
+Handler = Callable[[Session, int, dict], None]
+
+# ツイート作成後: フォロワーのホームタイムラインへの配信と検索インデックスへの登録
+# 投稿者自身のタイムラインへは作成時に同じトランザクションで追加する（直後のホームタイムラインに表示するため）
+def handle_tweet_created(db: Session, tweet_id: int, payload: dict) -> None:
+    tweet = db.query(Tweet).filter(Tweet.tweet_id == tweet_id).first()
+    if not tweet:
+        return  # 処理前に削除された
+    fan_out_tweet(db, tweet.tweet_id, tweet.user_id, to_author=False)
+    index_tweet(db, tweet.tweet_id, tweet.tweet_content, tweet.created_at)
+
+# ツイート削除後: 検索インデックスから削除（タイムラインはDBの ON DELETE CASCADE で削除される）
+def handle_tweet_deleted(db: Session, tweet_id: int, payload: dict) -> None:
+    unindex_tweet(db, tweet_id)
+
+# フォロワー数が閾値を下回った後: 読み込み時に合成していた間のツイートをフォロワーのタイムラインに取り込む
+def handle_fanout_on_write_restored(db: Session, aggregate_id: int, payload: dict) -> None:
+    backfill_followers_timelines(db, payload["user_id"])
+
+# イベント種別とハンドラーの対応
+HANDLERS: Dict[str, Handler] = {
+    "tweet_created": handle_tweet_created,
+    "tweet_deleted": handle_tweet_deleted,
+    "fanout_on_write_restored": handle_fanout_on_write_restored,
+}
@@ -0,0 +1,168 @@
+# src/outbox/worker.py
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from typing import Dict, List, Optional
+
+from src.config.settings import settings
+from src.database.session import DBSession, open_session
+from src.crud.outbox import acquire_partitions, release_partitions, process_outbox_batch
+from src.metrics.definitions import outbox_events_processed_total, outbox_lag_seconds
+
+logger = logging.getLogger(__name__)
+
+class OutboxWorkerPool:
+    """
+    アウトボックスのイベントをプロセス内のワーカーで処理する
+    パーティションの排他（期限つき）を定期的に取得・延長し、保持しているパーティションを
+    パーティション番号 % ワーカー数 でワーカーに割り当てる（1つのパーティションは常に1つのワーカーが順に処理する）
+    同じプロセスで記録されたイベントは notify() で即座に、他のプロセスの分は poll_interval 秒ごとに処理する
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        workers: int,
+        partitions: int,
+        batch_size: int,
+        poll_interval: float,
+        max_attempts: int,
+        lease_seconds: float
+    ):
+        self.enabled = enabled
+        self.workers = workers
+        self.partitions = partitions
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.owned: List[int] = []
+        self.processed: Dict[str, int] = {"success": 0, "retry": 0, "dead": 0}
+        self.failures = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeups: List[asyncio.Event] = []
+        self._closing = False
+        self._tasks: List[asyncio.Task] = []
+
+    def notify(self) -> None:
+        """イベントを記録したトランザクションのコミット後に呼び出す（スレッドプールからも呼び出せる）"""
+        if self._loop is None:
+            return  # 未起動（管理コマンドなど）の場合は次の確認で処理される
+        for wakeup in self._wakeups:
+            self._loop.call_soon_threadsafe(wakeup.set)
+
+    async def _renew_leases(self) -> None:
+        db = DBSession(open_session())
+        try:
+            owned = await db.run(
+                acquire_partitions,
+                owner=self.owner,
+                partitions=self.partitions,
+                lease_ms=int(self.lease_seconds * 1000),
+            )
+        except Exception:
+            # 延長できないまま期限が切れると他のプロセスが引き継ぐため、処理を止める
+            self.failures += 1
+            owned = []
+            logger.exception("アウトボックスのパーティションの排他を取得できませんでした")
+        finally:
+            await db.close()
+        if owned != self.owned:
+            logger.info("アウトボックスの担当パーティション: %s", owned)
+        self.owned = owned
+
+    async def _coordinate(self) -> None:
+        # 期限の 1/3 ごとに延長する
+        while not self._closing:
+            await self._renew_leases()
+            for wakeup in self._wakeups:
+                wakeup.set()
+            await asyncio.sleep(self.lease_seconds / 3)
+
+    async def _drain(self, index: int) -> None:
+        """担当パーティションの処理できるイベントがなくなるまで処理する"""
+        for partition_no in [p for p in self.owned if p % self.workers == index]:
+            while not self._closing and partition_no in self.owned:
+                db = DBSession(open_session())
+                try:
+                    results = await db.run(
+                        process_outbox_batch,
+                        partition_no=partition_no,
+                        batch_size=self.batch_size,
+                        max_attempts=self.max_attempts,
+                    )
+                finally:
+                    await db.close()
+                for event_type, result, lag in results:
+                    self.processed[result] += 1
+                    outbox_events_processed_total.inc(type=event_type, result=result)
+                    outbox_lag_seconds.observe(lag, type=event_type)
+                if len(results) < self.batch_size:
+                    break
+
+    async def _work(self, index: int) -> None:
+        wakeup = self._wakeups[index]
+        while not self._closing:
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
+            try:
+                await self._drain(index)
+            except Exception:
+                self.failures += 1
+                logger.exception("アウトボックスのイベントの処理に失敗しました")
+
+    async def start(self) -> None:
+        if not self.enabled or self._tasks:
+            return
+        self._closing = False
+        self._loop = asyncio.get_running_loop()
+        self._wakeups = [asyncio.Event() for _ in range(self.workers)]
+        await self._renew_leases()
+        self._tasks = [asyncio.create_task(self._coordinate())]
+        self._tasks += [asyncio.create_task(self._work(index)) for index in range(self.workers)]
+
+    async def stop(self) -> None:
+        """処理中のバッチを終えてから停止し、パーティションの排他を手放す（残りは次に担当するプロセスが処理する）"""
+        if not self._tasks:
+            return
+        self._closing = True
+        self._loop = None
+        for wakeup in self._wakeups:
+            wakeup.set()
+        self._tasks[0].cancel()  # 排他の延長は待たずに止める
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.owned = []
+        db = DBSession(open_session())
+        try:
+            await db.run(release_partitions, owner=self.owner)
+        except Exception:
+            logger.exception("アウトボックスのパーティションの排他を解放できませんでした")
+        finally:
+            await db.close()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "owner": self.owner,
+            "workers": self.workers,
+            "owned_partitions": self.owned,
+            "processed": dict(self.processed),
+            "failures": self.failures,
+        }
+
+outbox_pool = OutboxWorkerPool(
+    enabled=settings.OUTBOX_ENABLED,
+    workers=settings.OUTBOX_WORKERS,
+    partitions=settings.OUTBOX_PARTITIONS,
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    poll_interval=settings.OUTBOX_POLL_INTERVAL,
+    max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+    lease_seconds=settings.OUTBOX_LEASE_SECONDS,
+)
@@ -0,0 +1,113 @@
+# src/ratelimit/backends.py
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+class RateLimitBackend(ABC):
+    """
+    トークンバケットの保存先の共通インターフェース
+    バケットは容量 capacity で、period 秒で空から満杯まで一定の速さで回復する
+    take() はアプリケーションのイベントループ上で呼び出す
+    """
+
+    @abstractmethod
+    async def take(self, key: str, capacity: int, period: float) -> float:
+        """トークンを1つ取り出す。取り出せた場合は 0、足りない場合は次の1つが回復するまでの秒数を返す"""
+        ...
+
+    def stats(self) -> dict:
+        return {}
+
+class LocalTokenBuckets(RateLimitBackend):
+    """
+    プロセス内のトークンバケット（共有する保存先のローカル代替。値はワーカーごと）
+    キー数が max_keys を超えた場合は最も長く使われていないキーから破棄する（破棄されたキーは次回満杯から始まる）
+    1回の確認は辞書の参照と末尾への移動だけで済む（O(1)）
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()  # key -> [残りトークン, 最終更新時刻]
+        self.evictions = 0
+
+    async def take(self, key: str, capacity: int, period: float) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(capacity), now]
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * capacity / period)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) * period / capacity
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "keys": len(self._buckets),
+            "max_keys": self.max_keys,
+            "evictions": self.evictions,
+        }
+
+# 補充・取り出し・期限の設定を1回の往復でアトミックに行うスクリプト（時刻は Redis サーバーの時計）
+TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * capacity / period)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) * period / capacity
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(period * 1000))
+return tostring(wait)
+"""
+
+class RedisTokenBuckets(RateLimitBackend):
+    """
+    Redis に保存するトークンバケット（全ワーカーで共有）
+    満杯まで回復する時間で期限切れにするため、キー数は直近に使われた分に限られる
+    Redis に接続できない場合は制限せずに通す（レート制限の障害で全リクエストを止めない）
+    """
+
+    def __init__(self, url: str, prefix: str = ""):
+        import redis.asyncio  # 任意の依存関係（redis を使う場合のみ必要）
+        self.prefix = prefix
+        self._script = redis.asyncio.Redis.from_url(url).register_script(TAKE_SCRIPT)
+        self.errors = 0
+
+    async def take(self, key: str, capacity: int, period: float) -> float:
+        try:
+            return float(await self._script(keys=[self.prefix + key], args=[capacity, period]))
+        except Exception as e:
+            self.errors += 1
+            logger.warning("レート制限の確認に失敗しました（制限せずに通します）: %s", e)
+            return 0.0
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "errors": self.errors}
+
+# 設定に応じてトークンバケットの保存先を作成
+def create_backend(kind: str, max_keys: int, url: Optional[str] = None, prefix: str = "") -> RateLimitBackend:
+    if kind == "memory":
+        return LocalTokenBuckets(max_keys)
+    if kind == "redis":
+        return RedisTokenBuckets(url, prefix=prefix)
+    raise ValueError(f"未対応のレート制限バックエンドです: {kind}")
@@ -0,0 +1,103 @@
+# src/ratelimit/limiter.py
+from typing import Dict, Optional, Tuple
+
+from src.config.settings import settings
+from src.ratelimit.backends import RateLimitBackend, create_backend
+
+Budget = Tuple[str, int, float]  # (予算名, 容量, 満杯まで回復する秒数)
+
+# "回数/秒数" 形式の予算を (容量, 秒数) に変換
+def parse_budget(value: str) -> Tuple[int, float]:
+    try:
+        capacity, period = value.split("/")
+        capacity, period = int(capacity), float(period)
+    except ValueError:
+        raise ValueError(f"レート制限の予算は 回数/秒数 の形式で指定してください: {value}")
+    if capacity < 1 or period <= 0:
+        raise ValueError(f"レート制限の予算は正の値で指定してください: {value}")
+    return capacity, period
+
+class RateLimiter:
+    """
+    ルートごとのトークンバケットによるレート制限と、書き込みリクエストの同時実行数による負荷制限（ロードシェディング）
+    budgets は予算名 -> "回数/秒数"、routes は "メソッド パステンプレート" -> 予算名
+    同じ予算名を指定したルートは1つのバケットを共有する（例: いいね・リツイートの追加と取り消し）
+    同時実行数の確認はアプリケーションのイベントループ上で行う前提で、ロックは使わない
+    """
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        budgets: Dict[str, str],
+        routes: Dict[str, str],
+        enabled: bool = True,
+        max_concurrent_writes: int = 0
+    ):
+        self.backend = backend
+        self.enabled = enabled
+        self.max_concurrent_writes = max_concurrent_writes
+        parsed = {name: parse_budget(value) for name, value in budgets.items()}
+        unknown = set(routes.values()) - set(parsed)
+        if unknown:
+            raise ValueError(f"未定義のレート制限の予算です: {', '.join(sorted(unknown))}")
+        self.routes: Dict[str, Budget] = {route: (name, *parsed[name]) for route, name in routes.items()}
+        self.writes_in_flight = 0
+        self.allowed: Dict[str, int] = {name: 0 for name in parsed}
+        self.limited: Dict[str, int] = {name: 0 for name in parsed}
+        self.shed = 0
+
+    def budget_for(self, method: str, route: str) -> Optional[Budget]:
+        if not self.enabled:
+            return None
+        return self.routes.get(f"{method} {route}")
+
+    async def check(self, budget: Budget, client: str) -> float:
+        """クライアントの予算からトークンを1つ使う。制限する場合は再試行までの秒数を返す"""
+        name, capacity, period = budget
+        retry_after = await self.backend.take(f"{name}:{client}", capacity, period)
+        if retry_after > 0:
+            self.limited[name] += 1
+        else:
+            self.allowed[name] += 1
+        return retry_after
+
+    def acquire_write(self) -> bool:
+        """書き込みリクエストの実行枠を確保する（上限に達している場合は False）"""
+        if self.max_concurrent_writes and self.writes_in_flight >= self.max_concurrent_writes:
+            self.shed += 1
+            return False
+        self.writes_in_flight += 1
+        return True
+
+    def release_write(self) -> None:
+        self.writes_in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "budgets": {
+                name: {"allowed": self.allowed[name], "limited": self.limited[name]}
+                for name in self.allowed
+            },
+            "max_concurrent_writes": self.max_concurrent_writes,
+            "writes_in_flight": self.writes_in_flight,
+            "shed": self.shed,
+            **self.backend.stats(),
+        }
+
+rate_limiter = RateLimiter(
+    create_backend(
+        settings.RATE_LIMIT_BACKEND,
+        max_keys=settings.RATE_LIMIT_MAX_KEYS,
+        url=settings.RATE_LIMIT_URL,
+        prefix="twitter_app:ratelimit:",
+    ),
+    budgets=settings.RATE_LIMITS,
+    routes=settings.RATE_LIMIT_ROUTES,
+    enabled=settings.RATE_LIMIT_ENABLED,
+    # 未指定の場合はワーカーのコネクションプールの最大接続数（それ以上は接続待ちになるだけのため）
+    max_concurrent_writes=(
+        settings.MAX_CONCURRENT_WRITES if settings.MAX_CONCURRENT_WRITES is not None
+        else settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    ),
+)
@@ -1,74 +1,141 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
-from sqlalchemy.orm import Session
 from typing import Optional
 
-from src.database.session import get_db
+from src.config.settings import settings
+from src.database.session import DBSession, get_db_session, get_read_db_session
 from src.auth.schemas import SessionData
 from src.auth.utils import require_authenticated_user
-from src.replies.schemas import ReplyCreate, ReplyList, ReplyDetail, ReplyResponse
-from src.crud.replies import get_replies_for_tweet, get_reply, create_reply, delete_reply
+from src.api.pagination import encode_cursor, decode_cursor
+from src.api.conditional import ConditionalGet
+from src.replies.schemas import ReplyCreate, ReplyList, ReplyDetail, ReplyResponse, ReplyThread
+from src.crud.replies import get_replies_for_tweet, get_reply, get_reply_thread, create_reply, delete_reply
+from src.crud.versions import replies_version, reply_version
 
 router = APIRouter()
 
 @router.get("/tweets/{tweet_id}/replies", response_model=ReplyList)
-def read_tweet_replies(
+async def read_tweet_replies(
     tweet_id: int = Path(..., title="対象ツイートID"),
     parent_reply_id: Optional[int] = Query(None, title="親リプライID"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    conditional: ConditionalGet = Depends(),
+    db: DBSession = Depends(get_read_db_session),
     session_data: SessionData = Depends(require_authenticated_user)
 ):
     """
     ツイートに対するリプライ一覧を取得
     parent_reply_id が指定されていれば、そのリプライへのリプライを取得
     """
+    # リプライの追加・削除がなければ一覧を組み立てずに 304 を返す
+    version = await db.run(replies_version, tweet_id=tweet_id)
+    if version is not None:
+        not_modified = conditional.check(session_data.user_id, version)
+        if not_modified:
+            return not_modified
+    
     skip = (page - 1) * page_size
-    replies, total = get_replies_for_tweet(
-        db=db,
+    replies, total = await db.run(
+        get_replies_for_tweet,
         tweet_id=tweet_id,
         parent_reply_id=parent_reply_id,
         skip=skip,
         limit=page_size
     )
     
-    return {
+    return conditional.respond(ReplyList, {
         "replies": replies,
         "total": total,
         "page": page,
         "page_size": page_size
-    }
+    })
+
+@router.get("/tweets/{tweet_id}/thread", response_model=ReplyThread)
+async def read_reply_thread(
+    tweet_id: int = Path(..., title="対象ツイートID"),
+    reply_id: Optional[int] = Query(None, title="起点のリプライID（指定時はその配下のスレッドを取得）"),
+    depth: int = Query(3, ge=1, le=settings.REPLY_THREAD_MAX_DEPTH, title="取得する階層数"),
+    page_size: int = Query(20, ge=1, le=100, title="最上位の階層の取得件数"),
+    child_page_size: int = Query(5, ge=1, le=50, title="各リプライの子リプライの取得件数"),
+    cursor: Optional[str] = Query(None, title="最上位の階層の次ページ取得用カーソル"),
+    conditional: ConditionalGet = Depends(),
+    db: DBSession = Depends(get_read_db_session),
+    session_data: SessionData = Depends(require_authenticated_user)
+):
+    """
+    ツイートに対するリプライを木構造で取得
+    続きの子リプライは reply_id に親リプライを指定して取得する
+    """
+    try:
+        position = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    version = await db.run(replies_version, tweet_id=tweet_id)
+    if version is not None:
+        not_modified = conditional.check(session_data.user_id, version)
+        if not_modified:
+            return not_modified
+    
+    try:
+        replies, next_position = await db.run(
+            get_reply_thread,
+            tweet_id=tweet_id,
+            root_reply_id=reply_id,
+            depth=depth,
+            limit=page_size,
+            child_limit=child_page_size,
+            max_nodes=settings.REPLY_THREAD_MAX_NODES,
+            cursor=position
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    return conditional.respond(ReplyThread, {
+        "tweet_id": tweet_id,
+        "root_reply_id": reply_id,
+        "replies": replies,
+        "page_size": page_size,
+        "next_cursor": encode_cursor(*next_position) if next_position else None
+    })
 
 @router.get("/replies/{reply_id}", response_model=ReplyDetail)
-def read_reply(
+async def read_reply(
     reply_id: int = Path(..., title="リプライID"),
-    db: Session = Depends(get_db),
+    conditional: ConditionalGet = Depends(),
+    db: DBSession = Depends(get_read_db_session),
     session_data: SessionData = Depends(require_authenticated_user)
 ):
     """指定したIDのリプライを取得"""
-    reply = get_reply(db=db, reply_id=reply_id)
+    version = await db.run(reply_version, reply_id=reply_id)
+    if version is not None:
+        not_modified = conditional.check(session_data.user_id, version)
+        if not_modified:
+            return not_modified
+    
+    reply = await db.run(get_reply, reply_id=reply_id)
     if not reply:
         raise HTTPException(status_code=404, detail="リプライが見つかりません")
-    return reply
+    return conditional.respond(ReplyDetail, reply)
 
 @router.post("/tweets/{tweet_id}/replies", response_model=ReplyDetail)
-def post_reply(
+async def post_reply(
     tweet_id: int = Path(..., title="対象ツイートID"),
     reply: ReplyCreate = None,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db_session),
     session_data: SessionData = Depends(require_authenticated_user)
 ):
     """ツイートまたはリプライに対して新しいリプライを投稿"""
     try:
-        db_reply = create_reply(
-            db=db,
+        db_reply = await db.run(
+            create_reply,
             reply=reply,
             tweet_id=tweet_id,
             user_id=session_data.user_id
         )
         
         # 新しく作成したリプライの詳細情報を取得して返す
-        result = get_reply(db=db, reply_id=db_reply.reply_id)
+        result = await db.run(get_reply, reply_id=db_reply.reply_id)
         if not result:
             raise HTTPException(status_code=404, detail="リプライの取得に失敗しました")
         
@@ -77,13 +144,13 @@ def post_reply(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/replies/{reply_id}", response_model=ReplyResponse)
-def remove_reply(
+async def remove_reply(
     reply_id: int = Path(..., title="リプライID"),
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db_session),
     session_data: SessionData = Depends(require_authenticated_user)
 ):
     """リプライを削除（自分のリプライのみ）"""
-    success = delete_reply(db=db, reply_id=reply_id, user_id=session_data.user_id)
+    success = await db.run(delete_reply, reply_id=reply_id, user_id=session_data.user_id)
     
     if not success:
         raise HTTPException(status_code=404, detail="リプライが見つからないか、削除権限がありません")
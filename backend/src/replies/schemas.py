@@ -1,5 +1,5 @@
 # src/replies/schemas.py
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Optional
 from datetime import datetime
 
@@ -18,8 +18,7 @@ class ReplyBase(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # リプライ詳細スキーマ（ユーザー名などの追加情報を含む）
 class ReplyDetail(ReplyBase):
@@ -38,3 +37,15 @@ class ReplyResponse(BaseModel):
     success: bool
     message: str
     reply_id: int
+
+# リプライスレッドのノード（子リプライを入れ子で含む）
+class ReplyThreadNode(ReplyDetail):
+    replies: List["ReplyThreadNode"] = []
+
+# リプライスレッドレスポンススキーマ
+class ReplyThread(BaseModel):
+    tweet_id: int
+    root_reply_id: Optional[int] = None
+    replies: List[ReplyThreadNode]
+    page_size: int
+    next_cursor: Optional[str] = None  # 最上位の階層の続きを取得するためのカーソル
@@ -0,0 +1,106 @@
+# src/stream/backends.py
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+Deliver = Callable[[str], None]
+
+class StreamBackend(ABC):
+    """
+    ストリーム配信の経路の共通インターフェース
+    publish() は任意のスレッドから呼ばれ、受信したメッセージは start() で渡された deliver にイベントループ上で渡す
+    """
+
+    # 同一プロセス内でのみ配信する場合は True（購読者がいなければ publish を省略できる）
+    local = False
+
+    @abstractmethod
+    def publish(self, message: str) -> None:
+        ...
+
+    @abstractmethod
+    async def start(self, deliver: Deliver) -> None:
+        ...
+
+    async def stop(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+class LocalStreamBackend(StreamBackend):
+    """同一プロセス内の購読者にだけ配信する（ワーカー間で共有する経路のローカル代替）"""
+
+    local = True
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def publish(self, message: str) -> None:
+        if self._loop is None:
+            return  # 未起動（管理コマンドなど）の場合は捨てる
+        self._loop.call_soon_threadsafe(self._deliver, message)
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self) -> None:
+        self._loop = None
+
+class RedisStreamBackend(StreamBackend):
+    """Redis の Pub/Sub で全ワーカーに配信する"""
+
+    def __init__(self, url: str, channel: str):
+        import redis  # 任意の依存関係（redis を使う場合のみ必要）
+        import redis.asyncio
+        self.channel = channel
+        self._publisher = redis.Redis.from_url(url)
+        self._subscriber = redis.asyncio.Redis.from_url(url)
+        self._task: Optional[asyncio.Task] = None
+        self.publish_errors = 0
+
+    def publish(self, message: str) -> None:
+        try:
+            self._publisher.publish(self.channel, message)
+        except Exception:
+            # 配信は補助的な機能のため、書き込み処理は失敗させない
+            self.publish_errors += 1
+            logger.exception("ストリームへの配信に失敗しました")
+
+    async def start(self, deliver: Deliver) -> None:
+        pubsub = self._subscriber.pubsub()
+        await pubsub.subscribe(self.channel)
+        self._task = asyncio.create_task(self._listen(pubsub, deliver))
+
+    async def _listen(self, pubsub, deliver: Deliver) -> None:
+        while True:
+            try:
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        deliver(message["data"].decode("utf-8"))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("ストリームの受信に失敗しました。再接続します")
+                await asyncio.sleep(1)
+                await pubsub.subscribe(self.channel)
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {"publish_errors": self.publish_errors}
+
+def create_backend(kind: str, url: Optional[str] = None, channel: str = "tweets") -> StreamBackend:
+    if kind == "local":
+        return LocalStreamBackend()
+    if kind == "redis":
+        return RedisStreamBackend(url, channel)
+    raise ValueError(f"未対応のストリームバックエンドです: {kind}")
@@ -0,0 +1,149 @@
+# src/stream/broadcaster.py
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Optional, Set
+
+from src.config.settings import settings
+from src.stream.backends import StreamBackend, create_backend
+
+class StreamFull(Exception):
+    """同時接続数が上限に達している"""
+
+class Subscription:
+    """1接続分の配信キュー（件数上限つき）"""
+
+    def __init__(self, queue_size: int):
+        self.queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+    def close(self) -> None:
+        """未送信のイベントを捨て、終了の合図（None）を入れる"""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+class TweetBroadcaster:
+    """
+    新規ツイート・削除・カウントの変化を接続中のクライアントへ配信する（Server-Sent Events）
+    publish() は書き込み処理から任意のスレッドで呼び出せ、イベントは配信経路（backend）を通って
+    各ワーカーのイベントループ上で接続ごとのキューに振り分けられる
+    キューが溢れた接続は遅いクライアントとみなして切断し、再接続と再取得を促す
+    """
+
+    def __init__(
+        self,
+        backend: StreamBackend,
+        queue_size: int,
+        max_connections: int,
+        heartbeat_interval: float,
+        max_duration: float
+    ):
+        self.backend = backend
+        self.queue_size = queue_size
+        self.max_connections = max_connections
+        self.heartbeat_interval = heartbeat_interval
+        self.max_duration = max_duration
+        self.subscribers: Set[Subscription] = set()
+        self.started = False
+        self.published = 0
+        self.delivered = 0
+        self.dropped_connections = 0
+
+    @staticmethod
+    def format_event(event: str, data: dict) -> str:
+        """SSE のイベント1件分の文字列を作成"""
+        payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+        return f"event: {event}\ndata: {payload}\n\n"
+
+    def publish(self, event: str, data: dict) -> None:
+        """イベントを配信する（コミット後に呼び出す）"""
+        if not self.started:
+            return
+        if self.backend.local and not self.subscribers:
+            return  # 他のワーカーへ送る必要がなく、購読者もいない
+        self.published += 1
+        self.backend.publish(self.format_event(event, data))
+
+    def _deliver(self, message: str) -> None:
+        """イベントループ上で各接続のキューへ振り分ける"""
+        for subscription in list(self.subscribers):
+            try:
+                subscription.queue.put_nowait(message)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                self._drop(subscription)
+
+    def _drop(self, subscription: Subscription) -> None:
+        self.subscribers.discard(subscription)
+        subscription.dropped = True
+        subscription.close()
+        self.dropped_connections += 1
+
+    def subscribe(self) -> Subscription:
+        if len(self.subscribers) >= self.max_connections:
+            raise StreamFull()
+        subscription = Subscription(self.queue_size)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscribers.discard(subscription)
+
+    async def events(self, subscription: Subscription) -> AsyncIterator[str]:
+        """
+        接続が閉じられるまで SSE の文字列を返し続ける（無通信時はハートビートを送る）
+        サーバーの終了が接続の切断を待ち続けないよう、max_duration 秒で終了してクライアントに再接続させる
+        """
+        deadline = time.monotonic() + self.max_duration
+        try:
+            yield f"retry: {int(self.heartbeat_interval * 1000)}\n\n"
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    message = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=min(self.heartbeat_interval, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if message is None:
+                    if subscription.dropped:
+                        yield self.format_event("dropped", {"reason": "slow_consumer"})
+                    break
+                yield message
+        finally:
+            self.unsubscribe(subscription)
+
+    async def start(self) -> None:
+        await self.backend.start(self._deliver)
+        self.started = True
+
+    async def stop(self) -> None:
+        """配信を止め、接続中のストリームを終了させる"""
+        self.started = False
+        await self.backend.stop()
+        for subscription in list(self.subscribers):
+            subscription.close()
+        self.subscribers.clear()
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "connections": len(self.subscribers),
+            "max_connections": self.max_connections,
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped_connections": self.dropped_connections,
+            **self.backend.stats(),
+        }
+
+tweet_broadcaster = TweetBroadcaster(
+    create_backend(settings.STREAM_BACKEND, url=settings.STREAM_URL, channel=settings.STREAM_CHANNEL),
+    queue_size=settings.STREAM_QUEUE_SIZE,
+    max_connections=settings.STREAM_MAX_CONNECTIONS,
+    heartbeat_interval=settings.STREAM_HEARTBEAT_SECONDS,
+    max_duration=settings.STREAM_MAX_DURATION_SECONDS,
+)
@@ -0,0 +1,224 @@
+# src/trending/tracker.py
+import asyncio
+import heapq
+import logging
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+from src.database.session import DBSession, open_session
+from src.crud.trending import load_engagement_events
+
+logger = logging.getLogger(__name__)
+
+# 半減期は集計期間のこの割合（期間の終わりには重みが 1/16 になる）
+HALF_LIFE_FRACTION = 0.25
+
+# 件数が上限のこの倍率を超えたら下位を切り捨てる（毎回並べ替えないための余裕）
+TRIM_FACTOR = 1.25
+
+# 基準時刻からの経過がこの値（指数）を超えたらスコアを現在時刻基準に換算し直す（オーバーフロー防止）
+REBASE_EXPONENT = 50.0
+
+# 直近のエンゲージメントから集計期間ごとの上位のスコアを一括計算（NumPy でベクトル化）
+def compute_scores(
+    tweet_ids: np.ndarray,
+    ages: np.ndarray,
+    weights: np.ndarray,
+    length: float,
+    capacity: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    ages は各エンゲージメントが何秒前か、weights は種別ごとの重み
+    集計期間内のエンゲージメントを重み × 2^(-経過 / 半減期) で合計し、
+    スコアの高い capacity 件の (tweet_id, 現在のスコア, 最後のエンゲージメントが何秒前か) を返す
+    """
+    mask = ages <= length
+    tweet_ids, ages, weights = tweet_ids[mask], ages[mask], weights[mask]
+    if not len(tweet_ids):
+        return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)
+
+    decay = math.log(2) / (length * HALF_LIFE_FRACTION)
+    unique_ids, inverse = np.unique(tweet_ids, return_inverse=True)
+    scores = np.bincount(inverse, weights=weights * np.exp(-decay * ages), minlength=len(unique_ids))
+    latest = np.full(len(unique_ids), np.inf)
+    np.minimum.at(latest, inverse, ages)
+
+    keep = np.flatnonzero(scores > 0)
+    if len(keep) > capacity:
+        keep = keep[np.argpartition(-scores[keep], capacity - 1)[:capacity]]
+    return unique_ids[keep], scores[keep], latest[keep]
+
+class TrendingWindow:
+    """
+    1つの集計期間のスコア（件数上限つき）
+    スコアは基準時刻 base_time 時点の重みで保持する（重み × 2^((発生時刻 - base_time) / 半減期) の合計）
+    時間の経過で全ツイートが同じ割合で減衰するため、保持している値のまま並べ替えても現在のスコアと順位が一致し、
+    加算のたびに全件を減衰させる必要がない
+    """
+
+    def __init__(self, name: str, length: float, capacity: int):
+        self.name = name
+        self.length = length
+        self.capacity = capacity
+        self.decay = math.log(2) / (length * HALF_LIFE_FRACTION)
+        self.base_time = time.time()
+        self.entries: Dict[int, List[float]] = {}  # tweet_id -> [基準時刻でのスコア, 最後のエンゲージメントの時刻]
+
+    def _rebase(self, now: float) -> None:
+        factor = math.exp(-self.decay * (now - self.base_time))
+        for entry in self.entries.values():
+            entry[0] *= factor
+        self.base_time = now
+
+    def add(self, tweet_id: int, weight: float, now: float) -> None:
+        """
+        エンゲージメントを加算する（取り消しは負の重みで減算する）
+        取り消されたエンゲージメントの発生時刻は分からないため現在時刻で減算し、0 未満にはしない
+        """
+        if abs(self.decay * (now - self.base_time)) > REBASE_EXPONENT:
+            self._rebase(now)
+        entry = self.entries.get(tweet_id)
+        if entry is None:
+            if weight <= 0:
+                return
+            entry = self.entries[tweet_id] = [0.0, now]
+        entry[0] = max(0.0, entry[0] + weight * math.exp(self.decay * (now - self.base_time)))
+        if weight > 0:
+            entry[1] = now
+        if len(self.entries) > self.capacity * TRIM_FACTOR:
+            self._trim(now)
+
+    def _trim(self, now: float) -> None:
+        """集計期間内にエンゲージメントのないツイートを除き、上位 capacity 件に絞る"""
+        cutoff = now - self.length
+        alive = {tweet_id: entry for tweet_id, entry in self.entries.items() if entry[1] >= cutoff and entry[0] > 0}
+        if len(alive) > self.capacity:
+            alive = dict(heapq.nlargest(self.capacity, alive.items(), key=lambda item: item[1][0]))
+        self.entries = alive
+
+    def top(self, limit: int, now: float) -> List[Tuple[int, float]]:
+        """上位 limit 件の (tweet_id, 現在のスコア)"""
+        cutoff = now - self.length
+        ranked = heapq.nlargest(
+            limit,
+            ((tweet_id, entry[0]) for tweet_id, entry in self.entries.items() if entry[1] >= cutoff and entry[0] > 0),
+            key=lambda item: item[1],
+        )
+        factor = math.exp(-self.decay * (now - self.base_time))
+        return [(tweet_id, score * factor) for tweet_id, score in ranked]
+
+    def load(self, tweet_ids: np.ndarray, scores: np.ndarray, ages: np.ndarray, now: float) -> None:
+        """一括計算したスコアで置き換える（現在時刻を基準時刻とする）"""
+        self.base_time = now
+        self.entries = {
+            int(tweet_id): [float(score), now - float(age)]
+            for tweet_id, score, age in zip(tweet_ids, scores, ages)
+        }
+
+class TrendingTracker:
+    """
+    いいね・リツイート・リプライを時間で減衰させた重み付きスコアで、集計期間ごとのトレンドを保持する
+    書き込み処理のコミット後に record() でスコアを加算するため、取得時に集計テーブルを読まない
+    maintain() により起動時と一定間隔で直近のエンゲージメントから一括で再計算する
+    （他のワーカーへの書き込み、取り消し、リプライの削除はこの再計算で反映される）
+    record() は書き込み処理から任意のスレッドで呼び出せる
+    """
+
+    def __init__(self, windows: Dict[str, float], weights: Dict[str, float], capacity: int, enabled: bool = True):
+        self.enabled = enabled
+        self.weights = weights
+        self.windows = {name: TrendingWindow(name, length, capacity) for name, length in windows.items()}
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.rebuilds = 0
+        self.last_rebuilt_at: Optional[float] = None
+        self.last_rebuild_seconds: Optional[float] = None
+
+    def record(self, tweet_id: int, kind: str, count: int = 1) -> None:
+        """エンゲージメントの追加（count が負の場合は取り消し）を反映する（コミット後に呼び出す）"""
+        weight = self.weights.get(kind, 0) * count
+        if not self.enabled or not weight:
+            return
+        now = time.time()
+        with self._lock:
+            for window in self.windows.values():
+                window.add(tweet_id, weight, now)
+            self.recorded += 1
+
+    def discard(self, tweet_id: int) -> None:
+        """削除されたツイートを除く"""
+        if not self.enabled:
+            return
+        with self._lock:
+            for window in self.windows.values():
+                window.entries.pop(tweet_id, None)
+
+    def top(self, window: str, limit: int) -> List[Tuple[int, float]]:
+        """集計期間 window の上位 limit 件の (tweet_id, スコア)"""
+        now = time.time()
+        with self._lock:
+            return self.windows[window].top(limit, now)
+
+    def load_events(self, tweet_ids: np.ndarray, ages: np.ndarray, kinds: np.ndarray) -> None:
+        """直近のエンゲージメントの配列から全集計期間のスコアを計算し直す"""
+        weights = np.zeros(len(kinds))
+        for kind, weight in self.weights.items():
+            weights[kinds == kind] = weight
+        now = time.time()
+        computed = {
+            name: compute_scores(tweet_ids, ages, weights, window.length, window.capacity)
+            for name, window in self.windows.items()
+        }
+        with self._lock:
+            for name, window in self.windows.items():
+                window.load(*computed[name], now)
+
+    async def rebuild(self) -> None:
+        """DBの直近のエンゲージメントから再計算する（再計算中に記録された分は次の再計算まで反映されないことがある）"""
+        started = time.perf_counter()
+        db = DBSession(open_session())
+        try:
+            tweet_ids, ages, kinds = await db.run(
+                load_engagement_events, seconds=max(window.length for window in self.windows.values())
+            )
+        finally:
+            await db.close()
+        await asyncio.to_thread(self.load_events, tweet_ids, ages, kinds)
+        self.rebuilds += 1
+        self.last_rebuilt_at = time.time()
+        self.last_rebuild_seconds = time.perf_counter() - started
+
+    async def maintain(self, interval: float) -> None:
+        """起動直後と interval 秒ごとに再計算する（バックグラウンドタスク用。interval が 0 の場合は起動時のみ）"""
+        while True:
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception("トレンドの再計算に失敗しました")
+            if interval <= 0:
+                return
+            await asyncio.sleep(interval)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = {name: len(window.entries) for name, window in self.windows.items()}
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "recorded": self.recorded,
+            "rebuilds": self.rebuilds,
+            "last_rebuilt_at": self.last_rebuilt_at,
+            "last_rebuild_seconds": self.last_rebuild_seconds,
+        }
+
+trending_tracker = TrendingTracker(
+    windows=settings.TRENDING_WINDOWS,
+    weights=settings.TRENDING_WEIGHTS,
+    capacity=settings.TRENDING_MAX_ENTRIES,
+    enabled=settings.TRENDING_ENABLED,
+)
@@ -0,0 +1,138 @@
+# src/tweets/impressions.py
+import asyncio
+import logging
+from typing import Dict, Iterable, Optional
+
+from src.config.settings import settings
+from src.database.session import DBSession, open_session
+from src.crud.impressions import flush_impressions
+from src.tweets.hyperloglog import HyperLogLog
+from src.metrics.definitions import tweet_impressions_total
+
+logger = logging.getLogger(__name__)
+
+class PendingImpressions:
+    """1ツイート分の未書き込みの表示回数と閲覧者のスケッチ"""
+
+    __slots__ = ("views", "viewers")
+
+    def __init__(self, unique_viewers: bool):
+        self.views = 0
+        self.viewers: Optional[HyperLogLog] = HyperLogLog() if unique_viewers else None
+
+    def merge(self, other: "PendingImpressions") -> None:
+        self.views += other.views
+        if self.viewers is not None and other.viewers is not None:
+            self.viewers.merge(other.viewers)
+
+class ImpressionCounter:
+    """
+    ツイートの表示回数をプロセス内で集計し、まとめてDBに加算する
+    表示のたびに行を書き込まず、ツイートごとの増分と閲覧者のスケッチ（HyperLogLog）だけを保持する
+    保持しているツイート数が max_pending に達するか flush_interval 秒ごとに書き込む
+    記録と書き込みはアプリケーションのイベントループ上で行う前提で、辞書の入れ替えにロックは使わない
+    書き込むまでの表示回数はレスポンスに反映されない（集計値はツイート詳細キャッシュの有効期限内も古いままになる）
+    """
+
+    def __init__(self, enabled: bool, unique_viewers: bool, max_pending: int, flush_interval: float):
+        self.enabled = enabled
+        self.unique_viewers = unique_viewers
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.pending: Dict[int, PendingImpressions] = {}
+        self.recorded = 0
+        self.flushed = 0
+        self.failures = 0
+        self._wakeup: Optional[asyncio.Event] = None  # start() で実行中のイベントループに作成する
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, tweets: Iterable[dict], viewer_id: str) -> None:
+        """レスポンスとして返したツイートの表示を記録する"""
+        if not self.enabled:
+            return
+        count = 0
+        for tweet in tweets:
+            entry = self.pending.get(tweet["tweet_id"])
+            if entry is None:
+                entry = self.pending[tweet["tweet_id"]] = PendingImpressions(self.unique_viewers)
+            entry.views += 1
+            if entry.viewers is not None:
+                entry.viewers.add(viewer_id)
+            count += 1
+        if not count:
+            return
+        self.recorded += count
+        tweet_impressions_total.inc(count)
+        if len(self.pending) >= self.max_pending and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """溜まっている表示回数を書き込み、更新したツイート数を返す"""
+        if not self.pending:
+            return 0
+        batch, self.pending = self.pending, {}
+
+        db = DBSession(open_session())
+        try:
+            updated = await db.run(
+                flush_impressions,
+                changes={tweet_id: (entry.views, entry.viewers) for tweet_id, entry in batch.items()},
+            )
+        except Exception:
+            # 書き込み中に記録された分と合算して戻し、次回に再試行する
+            self.failures += 1
+            for tweet_id, entry in batch.items():
+                current = self.pending.get(tweet_id)
+                if current is not None:
+                    entry.merge(current)
+                self.pending[tweet_id] = entry
+            logger.exception("表示回数の書き込みに失敗しました（%d 件）", len(batch))
+            return 0
+        finally:
+            await db.close()
+
+        self.flushed += updated
+        return updated
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._closing = False
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """定期書き込みを止め、残っている表示回数を書き込む"""
+        if self._task is not None:
+            self._closing = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "unique_viewers": self.unique_viewers,
+            "pending_tweets": len(self.pending),
+            "pending_views": sum(entry.views for entry in self.pending.values()),
+            "recorded": self.recorded,
+            "flushed_tweets": self.flushed,
+            "failures": self.failures,
+        }
+
+impression_counter = ImpressionCounter(
+    enabled=settings.IMPRESSIONS_ENABLED,
+    unique_viewers=settings.IMPRESSION_UNIQUE_VIEWERS,
+    max_pending=settings.IMPRESSION_MAX_PENDING_TWEETS,
+    flush_interval=settings.IMPRESSION_FLUSH_INTERVAL,
+)
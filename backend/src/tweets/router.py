@@ -1,78 +1,346 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import Optional
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 
-from src.database.session import get_db
+from src.database.session import DBSession, get_db_session, get_read_db_session
 from src.auth.schemas import SessionData
 from src.auth.utils import require_authenticated_user
-from src.tweets.schemas import TweetCreate, TweetList, TweetDetail, InteractionResponse
+from src.api.pagination import encode_cursor, decode_cursor
+from src.api.responses import respond
+from src.api.conditional import ConditionalGet
+from src.tweets.schemas import (
+    TweetCreate, TweetList, TweetFeed, TweetDetail, TweetBatch, TrendingTweets, InteractionResponse,
+    InteractionBatch, InteractionBatchResponse
+)
 from src.crud.tweets import (
-    get_tweets, get_tweet, create_tweet, delete_tweet, 
+    count_tweets, get_tweet, get_tweets_by_ids, get_home_timeline, search_tweets, create_tweet, delete_tweet, 
     add_like, remove_like, add_retweet, remove_retweet,
-    add_bookmark, remove_bookmark
+    add_bookmark, remove_bookmark, apply_interactions
 )
+from src.crud.versions import tweets_version, tweet_list_version, home_timeline_version
+from src.tweets.write_buffer import interaction_buffer
+from src.tweets.impressions import impression_counter
+from src.stream.broadcaster import tweet_broadcaster, StreamFull
+from src.trending.tracker import trending_tracker
 
 router = APIRouter()
 
+# 一括取得で指定できるツイートIDの上限
+MAX_BATCH_IDS = 100
+
+# (種別, 追加か) と書き込み関数の対応
+INTERACTION_WRITERS = {
+    ("like", True): add_like,
+    ("like", False): remove_like,
+    ("retweet", True): add_retweet,
+    ("retweet", False): remove_retweet,
+    ("bookmark", True): add_bookmark,
+    ("bookmark", False): remove_bookmark,
+}
+
+# インタラクションの追加・削除（write-behind 有効時はバッファに記録して即座に成功を返す）
+async def _write_interaction(db: DBSession, interaction_type: str, add: bool, tweet_id: int, user_id: str) -> bool:
+    if interaction_buffer.enabled:
+        interaction_buffer.record(user_id, tweet_id, interaction_type, add)
+        return True
+    return await db.run(INTERACTION_WRITERS[(interaction_type, add)], tweet_id=tweet_id, user_id=user_id)
+
 @router.get("/", response_model=TweetList)
-def read_tweets(
+async def read_tweets(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, title="次ページ取得用カーソル"),
+    include_total: Optional[bool] = Query(None, title="総件数を含めるか"),
+    conditional: ConditionalGet = Depends(),
+    db: DBSession = Depends(get_read_db_session),
     session_data: Optional[SessionData] = Depends(require_authenticated_user)
 ):
-    """ツイート一覧を取得"""
+    """
+    ツイート一覧を取得
+    cursor が指定されていれば page を無視してカーソル位置から取得する
+    総件数はページ指定時は従来通り返し、カーソル指定時は include_total=true の場合のみ返す
+    """
+    try:
+        position = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if include_total is None:
+        include_total = position is None
+    
     skip = (page - 1) * page_size
-    tweets, total = get_tweets(
-        db=db, 
-        skip=skip, 
+    
+    # 内容が変わっていなければ一覧を組み立てずに 304 を返す
+    entries, version = await db.run(
+        tweet_list_version,
+        skip=skip,
         limit=page_size,
+        current_user_id=session_data.user_id,
+        cursor=position
+    )
+    not_modified = conditional.check(
+        session_data.user_id, (version, interaction_buffer.pending_for(session_data.user_id))
+    )
+    if not_modified:
+        return not_modified
+    
+    # バージョンの計算で取得したページのツイートIDから組み立てる
+    tweets = await db.run(
+        get_tweets_by_ids,
+        tweet_ids=[tweet_id for tweet_id, _ in entries],
         current_user_id=session_data.user_id
     )
+    total = await db.run(count_tweets) if include_total else None
+    interaction_buffer.overlay(tweets, session_data.user_id)
+    impression_counter.record(tweets, session_data.user_id)
     
-    return {
+    # 1ページ分取得できた場合のみ次ページのカーソルを返す
+    next_cursor = None
+    if len(entries) == page_size:
+        tweet_id, created_at = entries[-1]
+        next_cursor = encode_cursor(created_at, tweet_id)
+    
+    return conditional.respond(TweetList, {
         "tweets": tweets,
         "total": total,
         "page": page,
-        "page_size": page_size
-    }
+        "page_size": page_size,
+        "next_cursor": next_cursor
+    })
+
+@router.get("/home", response_model=TweetFeed)
+async def read_home_timeline(
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, title="次ページ取得用カーソル"),
+    conditional: ConditionalGet = Depends(),
+    db: DBSession = Depends(get_read_db_session),
+    session_data: SessionData = Depends(require_authenticated_user)
+):
+    """フォロー中のユーザーと自分のツイートからなるホームタイムラインを取得"""
+    try:
+        position = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    entries, version = await db.run(
+        home_timeline_version,
+        user_id=session_data.user_id,
+        limit=page_size,
+        cursor=position
+    )
+    not_modified = conditional.check(
+        session_data.user_id, (version, interaction_buffer.pending_for(session_data.user_id))
+    )
+    if not_modified:
+        return not_modified
+    
+    tweets, next_position = await db.run(
+        get_home_timeline,
+        user_id=session_data.user_id,
+        limit=page_size,
+        cursor=position,
+        entries=entries
+    )
+    interaction_buffer.overlay(tweets, session_data.user_id)
+    impression_counter.record(tweets, session_data.user_id)
+    
+    return conditional.respond(TweetFeed, {
+        "tweets": tweets,
+        "page_size": page_size,
+        "next_cursor": encode_cursor(*next_position) if next_position else None
+    })
+
+@router.get("/search", response_model=TweetFeed)
+async def search(
+    q: str = Query(..., min_length=1, max_length=100, title="検索語（空白区切りで全てを含むツイートを検索）"),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, title="次ページ取得用カーソル"),
+    db: DBSession = Depends(get_read_db_session),
+    session_data: SessionData = Depends(require_authenticated_user)
+):
+    """ツイート本文を検索し、新しい順に返す"""
+    try:
+        position = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    tweets, next_position = await db.run(
+        search_tweets,
+        query=q,
+        limit=page_size,
+        current_user_id=session_data.user_id,
+        cursor=position
+    )
+    interaction_buffer.overlay(tweets, session_data.user_id)
+    impression_counter.record(tweets, session_data.user_id)
+    
+    return respond(TweetFeed, {
+        "tweets": tweets,
+        "page_size": page_size,
+        "next_cursor": encode_cursor(*next_position) if next_position else None
+    })
+
+@router.get("/trending", response_model=TrendingTweets)
+async def read_trending(
+    window: str = Query("24h", title="集計期間（例: 1h, 24h）"),
+    limit: int = Query(20, ge=1, le=100),
+    db: DBSession = Depends(get_read_db_session),
+    session_data: SessionData = Depends(require_authenticated_user)
+):
+    """
+    直近のいいね・リツイート・リプライを時間で減衰させた重み付きスコアの高い順にツイートを取得
+    順位はプロセス内で保持しているスコアから決め、DBからは上位のツイートの詳細のみを取得する
+    """
+    if not trending_tracker.enabled:
+        raise HTTPException(status_code=404, detail="トレンドは無効になっています")
+    if window not in trending_tracker.windows:
+        raise HTTPException(
+            status_code=400, detail=f"集計期間は {', '.join(trending_tracker.windows)} のいずれかを指定してください"
+        )
+    
+    ranked = trending_tracker.top(window, limit)
+    scores = dict(ranked)
+    tweets = await db.run(get_tweets_by_ids, tweet_ids=list(scores), current_user_id=session_data.user_id)
+    interaction_buffer.overlay(tweets, session_data.user_id)
+    impression_counter.record(tweets, session_data.user_id)
+    
+    return respond(TrendingTweets, {
+        "window": window,
+        "tweets": [{**tweet, "score": scores[tweet["tweet_id"]]} for tweet in tweets]
+    })
+
+@router.get("/stream")
+async def stream_tweets(session_data: SessionData = Depends(require_authenticated_user)):
+    """
+    新規ツイート・削除・カウントの変化を Server-Sent Events で配信
+    イベントは tweet_created / tweet_deleted / counts（いいね等の増減）
+    受信が追いつかない接続には dropped を送って切断するため、クライアントは再接続して一覧を取得し直す
+    """
+    try:
+        subscription = tweet_broadcaster.subscribe()
+    except StreamFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="接続数が上限に達しています。しばらくしてから再度お試しください",
+            headers={"Retry-After": "5"},
+        )
+    
+    return StreamingResponse(
+        tweet_broadcaster.events(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},  # プロキシでのバッファリングを無効化
+    )
+
+@router.get("/batch", response_model=TweetBatch)
+async def read_tweets_batch(
+    ids: Optional[List[str]] = Query(None, title="ツイートID（カンマ区切り、または ids を複数指定）"),
+    conditional: ConditionalGet = Depends(),
+    db: DBSession = Depends(get_read_db_session),
+    session_data: SessionData = Depends(require_authenticated_user)
+):
+    """
+    複数のツイートをID指定でまとめて取得（最大100件）
+    件数に関わらず一定数のクエリで取得し、指定された順序で返す
+    """
+    try:
+        tweet_ids = [int(value) for param in ids or [] for value in param.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ツイートIDは整数で指定してください")
+    tweet_ids = list(dict.fromkeys(tweet_ids))
+    
+    if not tweet_ids:
+        raise HTTPException(status_code=400, detail="ツイートIDを指定してください")
+    if len(tweet_ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"ツイートIDは最大{MAX_BATCH_IDS}件まで指定できます")
+    
+    version = await db.run(tweets_version, tweet_ids=tweet_ids, current_user_id=session_data.user_id)
+    not_modified = conditional.check(
+        session_data.user_id, (version, interaction_buffer.pending_for(session_data.user_id))
+    )
+    if not_modified:
+        return not_modified
+    
+    tweets = await db.run(get_tweets_by_ids, tweet_ids=tweet_ids, current_user_id=session_data.user_id)
+    interaction_buffer.overlay(tweets, session_data.user_id)
+    impression_counter.record(tweets, session_data.user_id)
+    
+    found = {tweet["tweet_id"] for tweet in tweets}
+    return conditional.respond(TweetBatch, {
+        "tweets": tweets,
+        "missing_ids": [tweet_id for tweet_id in tweet_ids if tweet_id not in found]
+    })
 
 @router.get("/{tweet_id}", response_model=TweetDetail)
-def read_tweet(
+async def read_tweet(
     tweet_id: int,
-    db: Session = Depends(get_db),
+    conditional: ConditionalGet = Depends(),
+    db: DBSession = Depends(get_read_db_session),
     session_data: Optional[SessionData] = Depends(require_authenticated_user)
 ):
     """指定したIDのツイートを取得"""
-    tweet = get_tweet(db=db, tweet_id=tweet_id, current_user_id=session_data.user_id)
+    version = await db.run(tweets_version, tweet_ids=[tweet_id], current_user_id=session_data.user_id)
+    if version[0]:
+        not_modified = conditional.check(
+            session_data.user_id, (version, interaction_buffer.pending_for(session_data.user_id))
+        )
+        if not_modified:
+            return not_modified
+    
+    tweet = await db.run(get_tweet, tweet_id=tweet_id, current_user_id=session_data.user_id)
     if not tweet:
         raise HTTPException(status_code=404, detail="ツイートが見つかりません")
-    return tweet
+    interaction_buffer.overlay([tweet], session_data.user_id)
+    impression_counter.record([tweet], session_data.user_id)
+    return conditional.respond(TweetDetail, tweet)
 
 @router.post("/", response_model=TweetDetail)
-def post_tweet(
+async def post_tweet(
     tweet: TweetCreate,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db_session),
     session_data: SessionData = Depends(require_authenticated_user)
 ):
     """新しいツイートを投稿"""
-    db_tweet = create_tweet(db=db, tweet=tweet, user_id=session_data.user_id)
+    db_tweet = await db.run(create_tweet, tweet=tweet, user_id=session_data.user_id)
     
     # 新しく作成したツイートの詳細情報を取得して返す
-    result = get_tweet(db=db, tweet_id=db_tweet.tweet_id, current_user_id=session_data.user_id)
+    result = await db.run(get_tweet, tweet_id=db_tweet.tweet_id, current_user_id=session_data.user_id)
     if not result:
         raise HTTPException(status_code=404, detail="ツイートの取得に失敗しました")
     
     return result
 
+@router.post("/interactions", response_model=InteractionBatchResponse)
+async def post_interactions(
+    batch: InteractionBatch,
+    db: DBSession = Depends(get_db_session),
+    session_data: SessionData = Depends(require_authenticated_user)
+):
+    """
+    いいね・リツイート・ブックマークの追加／削除をまとめて適用（1トランザクション、最大100件）
+    操作ごとの結果を指定された順に返す
+    write-behind 有効時はバッファに記録し、status は queued になる
+    """
+    if interaction_buffer.enabled:
+        for operation in batch.operations:
+            interaction_buffer.record(
+                session_data.user_id, operation.tweet_id, operation.type, operation.action == "add"
+            )
+        return {"results": [
+            {**operation.model_dump(), "success": True, "status": "queued"}
+            for operation in batch.operations
+        ]}
+    
+    results = await db.run(apply_interactions, operations=batch.operations, user_id=session_data.user_id)
+    return {"results": results}
+
 @router.delete("/{tweet_id}", response_model=InteractionResponse)
-def remove_tweet(
+async def remove_tweet(
     tweet_id: int,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db_session),
     session_data: SessionData = Depends(require_authenticated_user)
 ):
     """ツイートを削除"""
-    success = delete_tweet(db=db, tweet_id=tweet_id, user_id=session_data.user_id)
+    success = await db.run(delete_tweet, tweet_id=tweet_id, user_id=session_data.user_id)
     
     if not success:
         raise HTTPException(status_code=404, detail="ツイートが見つからないか、削除権限がありません")
@@ -84,13 +352,13 @@ def remove_tweet(
     }
 
 @router.post("/{tweet_id}/like", response_model=InteractionResponse)
-def like_tweet(
+async def like_tweet(
     tweet_id: int,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db_session),
     session_data: SessionData = Depends(require_authenticated_user)
 ):
     """ツイートにいいねを追加"""
-    success = add_like(db=db, tweet_id=tweet_id, user_id=session_data.user_id)
+    success = await _write_interaction(db, "like", True, tweet_id, session_data.user_id)
     
     if not success:
         raise HTTPException(status_code=404, detail="ツイートが見つかりません")
@@ -102,13 +370,13 @@ def like_tweet(
     }
 
 @router.delete("/{tweet_id}/like", response_model=InteractionResponse)
-def unlike_tweet(
+async def unlike_tweet(
     tweet_id: int,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db_session),
     session_data: SessionData = Depends(require_authenticated_user)
 ):
     """ツイートのいいねを削除"""
-    success = remove_like(db=db, tweet_id=tweet_id, user_id=session_data.user_id)
+    success = await _write_interaction(db, "like", False, tweet_id, session_data.user_id)
     
     if not success:
         raise HTTPException(status_code=404, detail="いいねが見つかりません")
@@ -120,13 +388,13 @@ def unlike_tweet(
     }
 
 @router.post("/{tweet_id}/retweet", response_model=InteractionResponse)
-def retweet_tweet(
+async def retweet_tweet(
     tweet_id: int,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db_session),
     session_data: SessionData = Depends(require_authenticated_user)
 ):
     """ツイートをリツイート"""
-    success = add_retweet(db=db, tweet_id=tweet_id, user_id=session_data.user_id)
+    success = await _write_interaction(db, "retweet", True, tweet_id, session_data.user_id)
     
     if not success:
         raise HTTPException(status_code=404, detail="ツイートが見つかりません")
@@ -138,13 +406,13 @@ def retweet_tweet(
     }
 
 @router.delete("/{tweet_id}/retweet", response_model=InteractionResponse)
-def undo_retweet(
+async def undo_retweet(
     tweet_id: int,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db_session),
     session_data: SessionData = Depends(require_authenticated_user)
 ):
     """ツイートのリツイートを取り消し"""
-    success = remove_retweet(db=db, tweet_id=tweet_id, user_id=session_data.user_id)
+    success = await _write_interaction(db, "retweet", False, tweet_id, session_data.user_id)
     
     if not success:
         raise HTTPException(status_code=404, detail="リツイートが見つかりません")
@@ -156,13 +424,13 @@ def undo_retweet(
     }
 
 @router.post("/{tweet_id}/bookmark", response_model=InteractionResponse)
-def bookmark_tweet(
+async def bookmark_tweet(
     tweet_id: int,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db_session),
     session_data: SessionData = Depends(require_authenticated_user)
 ):
     """ツイートをブックマーク"""
-    success = add_bookmark(db=db, tweet_id=tweet_id, user_id=session_data.user_id)
+    success = await _write_interaction(db, "bookmark", True, tweet_id, session_data.user_id)
     
     if not success:
         raise HTTPException(status_code=404, detail="ツイートが見つかりません")
@@ -174,13 +442,13 @@ def bookmark_tweet(
     }
 
 @router.delete("/{tweet_id}/bookmark", response_model=InteractionResponse)
-def unbookmark_tweet(
+async def unbookmark_tweet(
     tweet_id: int,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db_session),
     session_data: SessionData = Depends(require_authenticated_user)
 ):
     """ツイートのブックマークを取り消し"""
-    success = remove_bookmark(db=db, tweet_id=tweet_id, user_id=session_data.user_id)
+    success = await _write_interaction(db, "bookmark", False, tweet_id, session_data.user_id)
     
     if not success:
         raise HTTPException(status_code=404, detail="ブックマークが見つかりません")
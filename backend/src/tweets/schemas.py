@@ -1,6 +1,6 @@
 # src/tweets/schemas.py
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, ConfigDict
+from typing import List, Literal, Optional
 from datetime import datetime
 
 # ツイート作成用スキーマ
@@ -15,8 +15,7 @@ class TweetBase(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # いいね数、リツイート数、ブックマーク数などを含むツイート詳細スキーマ
 class TweetDetail(TweetBase):
@@ -24,6 +23,8 @@ class TweetDetail(TweetBase):
     like_count: int = 0
     retweet_count: int = 0
     bookmark_count: int = 0
+    view_count: int = 0  # 表示回数（数秒ごとにまとめて加算するため直近の表示は含まない）
+    unique_viewer_estimate: int = 0  # ユニーク閲覧者数の推定値（誤差 約3%）
     is_liked: bool = False  # 現在のユーザーがいいねしているか
     is_retweeted: bool = False  # 現在のユーザーがリツイートしているか
     is_bookmarked: bool = False  # 現在のユーザーがブックマークしているか
@@ -31,12 +32,52 @@ class TweetDetail(TweetBase):
 # ツイート一覧レスポンス用スキーマ
 class TweetList(BaseModel):
     tweets: List[TweetDetail]
-    total: int
+    total: Optional[int] = None  # include_total=false またはカーソル指定時は省略
     page: int
     page_size: int
+    next_cursor: Optional[str] = None  # 次ページ取得用カーソル（続きがない場合はNone）
     
+# カーソルで辿るツイート一覧（ホームタイムラインなど）レスポンス用スキーマ
+class TweetFeed(BaseModel):
+    tweets: List[TweetDetail]
+    page_size: int
+    next_cursor: Optional[str] = None  # 次ページ取得用カーソル（続きがない場合はNone）
+
+# トレンドのツイート（スコア付き）
+class TrendingTweet(TweetDetail):
+    score: float  # 時間で減衰させたエンゲージメントの重み付き合計
+
+# トレンドレスポンス用スキーマ
+class TrendingTweets(BaseModel):
+    window: str  # 集計期間
+    tweets: List[TrendingTweet]  # スコアの高い順
+
+# ID指定の一括取得レスポンス用スキーマ
+class TweetBatch(BaseModel):
+    tweets: List[TweetDetail]  # 指定された順序（重複は除く）
+    missing_ids: List[int] = []  # 存在しなかったツイートID
+
 # インタラクション結果レスポンス用スキーマ
 class InteractionResponse(BaseModel):
     success: bool
     message: str
     tweet_id: int
+
+# 一括インタラクションの1操作
+class InteractionOperation(BaseModel):
+    tweet_id: int
+    type: Literal["like", "retweet", "bookmark"]
+    action: Literal["add", "remove"]
+
+# 一括インタラクションのリクエスト用スキーマ
+class InteractionBatch(BaseModel):
+    operations: List[InteractionOperation] = Field(..., min_length=1, max_length=100)
+
+# 一括インタラクションの操作ごとの結果
+class InteractionResult(InteractionOperation):
+    success: bool
+    status: str  # applied / unchanged / not_found（write-behind 有効時は queued）
+
+# 一括インタラクション結果レスポンス用スキーマ
+class InteractionBatchResponse(BaseModel):
+    results: List[InteractionResult]
@@ -0,0 +1,173 @@
+# src/tweets/write_buffer.py
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.config.settings import settings
+from src.database.session import DBSession, open_session
+from src.crud.tweets import flush_interaction_changes, flush_interaction_changes_each
+
+logger = logging.getLogger(__name__)
+
+# インタラクション種別とレスポンスのキーの対応
+STATE_KEYS = {
+    "like": ("is_liked", "like_count"),
+    "retweet": ("is_retweeted", "retweet_count"),
+    "bookmark": ("is_bookmarked", "bookmark_count"),
+}
+
+ChangeKey = Tuple[str, int, str]  # (user_id, tweet_id, 種別)
+
+class InteractionWriteBuffer:
+    """
+    いいね・リツイート・ブックマークの追加／削除をプロセス内に溜め、まとめてDBに書き込む（write-behind）
+    同じユーザー×ツイート×種別の変更は最後の状態だけを残す
+    件数が max_pending に達するか flush_interval 秒ごとに書き込む
+    まとめての書き込みに失敗した場合は1件ずつ書き込み直し、それでも max_attempts 回失敗した変更は破棄する
+    変更の記録と書き込みはアプリケーションのイベントループ上で行う前提で、辞書の入れ替えにロックは使わない
+    """
+
+    def __init__(self, enabled: bool, max_pending: int, flush_interval: float, max_attempts: int = 3):
+        self.enabled = enabled
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.pending: Dict[ChangeKey, bool] = {}
+        self.in_flight: Dict[ChangeKey, bool] = {}  # 書き込み中（コミット前）の変更
+        self.attempts: Dict[ChangeKey, int] = {}  # 1件ずつ書き込んでも失敗した変更の失敗回数
+        self.flushed = 0
+        self.failures = 0
+        self.dropped = 0
+        self._wakeup: Optional[asyncio.Event] = None  # start() で実行中のイベントループに作成する
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, user_id: str, tweet_id: int, interaction_type: str, add: bool) -> None:
+        """変更を記録する（DBへの書き込みは後で行う）"""
+        self.pending[(user_id, tweet_id, interaction_type)] = add
+        if len(self.pending) >= self.max_pending and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _pending_state(self, key: ChangeKey) -> Optional[bool]:
+        if key in self.pending:
+            return self.pending[key]
+        return self.in_flight.get(key)
+
+    def overlay(self, tweets: Iterable[dict], user_id: str) -> None:
+        """
+        未書き込みの変更を本人のレスポンスに反映する（read-your-writes）
+        DBから取得した本人の状態と異なる場合のみ、状態とカウントを補正する
+        """
+        if not self.pending and not self.in_flight:
+            return
+        for tweet in tweets:
+            for interaction_type, (state_key, count_key) in STATE_KEYS.items():
+                state = self._pending_state((user_id, tweet["tweet_id"], interaction_type))
+                if state is None or state == tweet[state_key]:
+                    continue
+                tweet[state_key] = state
+                tweet[count_key] = max(0, tweet[count_key] + (1 if state else -1))
+
+    def pending_for(self, user_id: str) -> tuple:
+        """ユーザーの未書き込みの変更（ETag の計算に使用）"""
+        if not self.pending and not self.in_flight:
+            return ()
+        changes = {**self.in_flight, **self.pending}
+        return tuple(sorted(
+            (tweet_id, interaction_type, add)
+            for (owner, tweet_id, interaction_type), add in changes.items()
+            if owner == user_id
+        ))
+
+    async def flush(self) -> int:
+        """溜まっている変更を書き込み、変更された行数を返す"""
+        if not self.pending:
+            return 0
+        self.in_flight, self.pending = self.pending, {}
+
+        db = DBSession(open_session())
+        try:
+            try:
+                changed = await db.run(flush_interaction_changes, changes=self.in_flight)
+                failed = []
+            except Exception:
+                # 1件の不正な変更で毎回全体がロールバックされないよう、1件ずつ書き込み直す
+                self.failures += 1
+                logger.exception("インタラクションの書き込みに失敗しました（%d 件）。1件ずつ再試行します", len(self.in_flight))
+                changed, failed = await db.run(flush_interaction_changes_each, changes=self.in_flight)
+            self._requeue(failed, counted=len(failed) < len(self.in_flight))
+        except Exception:
+            # 再試行もできなかった場合（DBに接続できない等）はすべて次回に回す
+            logger.exception("インタラクションの書き込みを再試行できませんでした（%d 件）", len(self.in_flight))
+            self._requeue(list(self.in_flight), counted=False)
+            return 0
+        finally:
+            self.in_flight = {}
+            await db.close()
+
+        self.flushed += changed
+        return changed
+
+    def _requeue(self, keys: List[ChangeKey], counted: bool) -> None:
+        """
+        書き込めなかった変更を次回に回す（書き込み中に届いた新しい変更を優先する）
+        counted=True の場合は失敗回数を数え、max_attempts 回に達した変更を破棄する
+        他の変更も書き込めなかった場合はDB側の障害とみなして数えない
+        """
+        failed = set(keys)
+        for key in keys:
+            if counted:
+                self.attempts[key] = self.attempts.get(key, 0) + 1
+                if self.attempts[key] >= self.max_attempts:
+                    del self.attempts[key]
+                    self.dropped += 1
+                    logger.error("書き込めないインタラクションの変更を破棄しました: %s -> %s", key, self.in_flight[key])
+                    continue
+            self.pending.setdefault(key, self.in_flight[key])
+        for key in self.in_flight:
+            if key not in failed:
+                self.attempts.pop(key, None)
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+        await self.flush()  # 終了時に残りを書き込む
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._closing = False
+            self._wakeup = asyncio.Event()
+            self._loop = asyncio.get_running_loop()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """定期書き込みを止め、残っている変更を書き込む"""
+        if self._task is not None:
+            self._closing = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "pending": len(self.pending),
+            "in_flight": len(self.in_flight),
+            "flushed": self.flushed,
+            "failures": self.failures,
+            "dropped": self.dropped,
+        }
+
+interaction_buffer = InteractionWriteBuffer(
+    enabled=settings.INTERACTION_WRITE_BEHIND,
+    max_pending=settings.INTERACTION_BUFFER_MAX_PENDING,
+    flush_interval=settings.INTERACTION_BUFFER_FLUSH_INTERVAL,
+    max_attempts=settings.INTERACTION_BUFFER_MAX_ATTEMPTS,
+)
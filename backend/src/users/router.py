@@ -0,0 +1,117 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from typing import Optional
+
+from src.database.session import DBSession, get_db_session, get_read_db_session
+from src.auth.schemas import SessionData
+from src.auth.utils import require_authenticated_user
+from src.api.pagination import encode_cursor, decode_cursor
+from src.api.conditional import ConditionalGet
+from src.users.schemas import FollowResponse, UserProfile
+from src.tweets.schemas import TweetFeed
+from src.crud.follows import follow_user, unfollow_user
+from src.crud.users import get_user_profile
+from src.crud.tweets import get_user_tweets
+from src.crud.versions import user_tweets_version
+from src.tweets.write_buffer import interaction_buffer
+from src.tweets.impressions import impression_counter
+
+router = APIRouter()
+
+@router.get("/{user_id}", response_model=UserProfile)
+async def read_user_profile(
+    user_id: str = Path(..., title="ユーザーID"),
+    db: DBSession = Depends(get_read_db_session),
+    session_data: SessionData = Depends(require_authenticated_user)
+):
+    """ユーザーのプロフィールとツイート数・フォロー数・フォロワー数・いいね数を取得"""
+    profile = await db.run(get_user_profile, user_id=user_id, current_user_id=session_data.user_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="ユーザーが見つかりません")
+    return profile
+
+@router.get("/{user_id}/tweets", response_model=TweetFeed)
+async def read_user_tweets(
+    user_id: str = Path(..., title="ユーザーID"),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, title="次ページ取得用カーソル"),
+    conditional: ConditionalGet = Depends(),
+    db: DBSession = Depends(get_read_db_session),
+    session_data: SessionData = Depends(require_authenticated_user)
+):
+    """ユーザーのツイートを新しい順に取得"""
+    try:
+        position = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    entries, version = await db.run(
+        user_tweets_version,
+        user_id=user_id,
+        limit=page_size,
+        current_user_id=session_data.user_id,
+        cursor=position
+    )
+    not_modified = conditional.check(
+        session_data.user_id, (version, interaction_buffer.pending_for(session_data.user_id))
+    )
+    if not_modified:
+        return not_modified
+    
+    result = await db.run(
+        get_user_tweets,
+        user_id=user_id,
+        limit=page_size,
+        current_user_id=session_data.user_id,
+        cursor=position,
+        entries=entries
+    )
+    if result is None:
+        raise HTTPException(status_code=404, detail="ユーザーが見つかりません")
+    tweets, next_position = result
+    interaction_buffer.overlay(tweets, session_data.user_id)
+    impression_counter.record(tweets, session_data.user_id)
+    
+    return conditional.respond(TweetFeed, {
+        "tweets": tweets,
+        "page_size": page_size,
+        "next_cursor": encode_cursor(*next_position) if next_position else None
+    })
+
+@router.post("/{user_id}/follow", response_model=FollowResponse)
+async def follow(
+    user_id: str = Path(..., title="フォロー対象のユーザーID"),
+    db: DBSession = Depends(get_db_session),
+    session_data: SessionData = Depends(require_authenticated_user)
+):
+    """ユーザーをフォロー"""
+    try:
+        success = await db.run(follow_user, follower_user_id=session_data.user_id, followed_user_id=user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not success:
+        raise HTTPException(status_code=404, detail="ユーザーが見つかりません")
+    
+    return {
+        "success": True,
+        "message": "フォローしました",
+        "user_id": user_id
+    }
+
+@router.delete("/{user_id}/follow", response_model=FollowResponse)
+async def unfollow(
+    user_id: str = Path(..., title="フォロー解除対象のユーザーID"),
+    db: DBSession = Depends(get_db_session),
+    session_data: SessionData = Depends(require_authenticated_user)
+):
+    """ユーザーのフォローを解除"""
+    success = await db.run(unfollow_user, follower_user_id=session_data.user_id, followed_user_id=user_id)
+    
+    if not success:
+        raise HTTPException(status_code=404, detail="フォローしていません")
+    
+    return {
+        "success": True,
+        "message": "フォローを解除しました",
+        "user_id": user_id
+    }
@@ -0,0 +1,19 @@
+# src/users/schemas.py
+from pydantic import BaseModel
+from typing import Optional
+
+from src.auth.schemas import UserResponse
+
+# フォロー操作結果レスポンス用スキーマ
+class FollowResponse(BaseModel):
+    success: bool
+    message: str
+    user_id: str  # フォロー（解除）対象のユーザーID
+
+# プロフィールレスポンス用スキーマ（ユーザー情報と集計値）
+class UserProfile(UserResponse):
+    e_mail: Optional[str] = None  # 本人が取得した場合のみ
+    tweet_count: int
+    follower_count: int
+    following_count: int
+    like_count: int  # ユーザーがいいねしたツイート数
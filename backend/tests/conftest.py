@@ -6,3 +6,101 @@ from pathlib import Path
 # プロジェクトルートディレクトリをPythonパスに追加
 root_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(root_dir))
+
+from contextlib import contextmanager
+from typing import Optional
+
+import pytest
+
+from src.database.instrumentation import track_queries
+
+@pytest.fixture
+def query_budget():
+    """
+    範囲内で実行されたSQLが max_queries 件を超えたらテストを失敗させる
+    使い方: with query_budget(5): client.get("/api/tweets/?page_size=50")
+    """
+    @contextmanager
+    def budget(max_queries: int):
+        with track_queries() as stats:
+            yield stats
+        if stats.count > max_queries:
+            repeated = "\n".join(f"  {count} 回: {statement}" for statement, count in stats.repeated(2))
+            pytest.fail(f"SQLの実行回数が上限を超えました（{stats.count} > {max_queries}）\n{repeated}")
+    return budget
+
+@pytest.fixture
+def db_engine(tmp_path, monkeypatch):
+    """
+    全テーブルを作成したテスト用の SQLite
+    プロセス全体で共有する状態がテスト間で混ざらないよう、ツイート詳細キャッシュは無効にし、
+    アウトボックスの副作用（タイムライン配信・検索インデックス）は書き込みと同じトランザクションで反映する
+    """
+    from sqlalchemy import create_engine
+
+    import src.models  # noqa: F401  全モデルをメタデータに登録
+    from src.config.settings import settings
+    from src.database.session import Base
+    from src.cache.tweets import tweet_cache
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(tweet_cache, "enabled", False)
+    monkeypatch.setattr(settings, "OUTBOX_ENABLED", False)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def db(db_engine):
+    """テスト用DBのセッション"""
+    from sqlalchemy.orm import Session
+
+    with Session(db_engine) as session:
+        yield session
+
+@pytest.fixture
+def make_user(db):
+    """ユーザーを作成する関数（パスワードのハッシュ計算は省く）"""
+    from src.auth.schemas import UserCreate
+    from src.crud.users import create_user
+
+    def make(user_id: str):
+        user = UserCreate(e_mail=f"{user_id}@example.com", password="password123", user_id=user_id, user_name=user_id.upper())
+        return create_user(db, user=user, hashed_password="hashed")
+    return make
+
+@pytest.fixture
+def api_client(db_engine, monkeypatch):
+    """
+    テスト用DBに接続した TestClient を作る関数（user_id を指定するとログイン済みのクライアント）
+    起動時のバックグラウンド処理は開始しない
+    """
+    from fastapi.testclient import TestClient
+    from sqlalchemy.orm import Session
+
+    from main import app
+    from src.config.settings import settings
+    from src.auth.schemas import SessionData
+    from src.auth.utils import encrypt_session_data
+    from src.database.session import DBSession, get_db_session, get_read_db_session
+    from src.ratelimit.limiter import rate_limiter
+
+    async def test_db_session():
+        db = DBSession(Session(db_engine))
+        try:
+            yield db
+        finally:
+            await db.close()
+
+    app.dependency_overrides[get_db_session] = test_db_session
+    app.dependency_overrides[get_read_db_session] = test_db_session
+    monkeypatch.setattr(rate_limiter, "enabled", False)
+
+    def client(user_id: Optional[str] = None) -> TestClient:
+        test_client = TestClient(app)
+        if user_id:
+            test_client.cookies.set(settings.SESSION_COOKIE_NAME, encrypt_session_data(SessionData(user_id=user_id)))
+        return test_client
+
+    yield client
+    app.dependency_overrides.clear()
@@ -0,0 +1,37 @@
+# tests/test_async_db.py
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+import src.models  # noqa: F401  全モデルをメタデータに登録
+from src.database.session import Base, DBSession
+from src.auth.schemas import UserCreate
+from src.tweets.schemas import TweetCreate
+from src.crud.users import create_user
+from src.crud.tweets import create_tweet, get_tweets, get_tweet, add_like
+
+async def run_async_crud(db_path):
+    """非同期SQLiteドライバ経由で crud 関数を実行する"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(engine, autoflush=False, expire_on_commit=False) as session:
+        db = DBSession(session)
+        user = UserCreate(e_mail="async@example.com", password="password123", user_id="async_user", user_name="Async")
+        await db.run(create_user, user=user, hashed_password="hashed")
+        tweet = await db.run(create_tweet, tweet=TweetCreate(tweet_content="非同期ツイート"), user_id="async_user")
+        await db.run(add_like, tweet_id=tweet.tweet_id, user_id="async_user")
+        tweets, total = await db.run(get_tweets, current_user_id="async_user")
+        detail = await db.run(get_tweet, tweet_id=tweet.tweet_id, current_user_id="async_user")
+
+    await engine.dispose()
+    return tweets, total, detail
+
+def test_async_session_runs_crud(tmp_path):
+    """AsyncSession 経由で crud 関数が動作すること"""
+    tweets, total, detail = asyncio.run(run_async_crud(tmp_path / "async.db"))
+    assert total == 1
+    assert tweets[0]["tweet_content"] == "非同期ツイート"
+    assert detail["like_count"] == 1
+    assert detail["is_liked"] is True
@@ -0,0 +1,34 @@
+# tests/test_cache.py
+import time
+
+from src.cache.backends import InMemoryLRUCache, create_backend
+from src.cache.tweets import TweetCache
+
+def test_lru_evicts_least_recently_used():
+    cache = InMemoryLRUCache(max_entries=2)
+    cache.set_many({"a": 1, "b": 2}, ttl=60)
+    cache.get_many(["a"])
+    cache.set_many({"c": 3}, ttl=60)
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+    assert cache.stats()["evictions"] == 1
+
+def test_lru_expires_entries():
+    cache = InMemoryLRUCache(max_entries=10)
+    cache.set_many({"a": 1}, ttl=0.01)
+    time.sleep(0.02)
+
+    assert cache.get_many(["a"]) == {}
+    assert cache.stats()["expirations"] == 1
+
+def test_tweet_cache_hits_misses_and_invalidation():
+    for kind in ("memory", "kvs-local"):
+        cache = TweetCache(create_backend(kind, max_entries=10), ttl=60)
+        cache.set_many({1: {"tweet_id": 1}})
+
+        assert cache.get_many([1, 2]) == ({1: {"tweet_id": 1}}, [2])
+        cache.invalidate([1])
+        assert cache.get_many([1]) == ({}, [1])
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 2, 1)
@@ -0,0 +1,48 @@
+# tests/test_conditional.py
+from src.api.conditional import compute_etag, etag_matches
+
+def test_etag_changes_with_version():
+    etag = compute_etag("/api/tweets/1", "", "alice", ([(1, 3)], 5))
+
+    assert etag == compute_etag("/api/tweets/1", "", "alice", ([(1, 3)], 5))
+    assert etag != compute_etag("/api/tweets/1", "", "alice", ([(1, 4)], 5))
+    assert etag != compute_etag("/api/tweets/1", "", "bob", ([(1, 3)], 5))
+
+def test_etag_matches_if_none_match_list():
+    etag = compute_etag("v1")
+
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+def test_tweet_list_version_does_not_count_tweets(db, db_engine, make_user):
+    """一覧のバージョンはページのツイートIDだけから求め、総件数の COUNT を実行しない"""
+    from src.database.instrumentation import instrument_engine, track_queries
+    from src.tweets.schemas import TweetCreate
+    from src.crud.tweets import create_tweet
+    from src.crud.versions import tweet_list_version
+
+    instrument_engine(db_engine)
+    make_user("alice")
+    tweet_ids = [create_tweet(db, TweetCreate(tweet_content=f"ツイート{i}"), user_id="alice").tweet_id for i in range(3)]
+
+    with track_queries() as stats:
+        entries, (versions, _) = tweet_list_version(db, limit=2, current_user_id="alice")
+    assert [tweet_id for tweet_id, _ in entries] == [tweet_id for tweet_id, _ in versions] == tweet_ids[:0:-1]
+    assert not any("count(" in statement.lower() for statement in stats.statements)
+    assert stats.count == 2  # ページのIDと集計バージョン、閲覧者のバージョン
+
+def test_reply_list_etag_ignores_likes_on_the_tweet(api_client, make_user):
+    """リプライ一覧の ETag はツイートへのいいねでは変わらず、リプライの追加で変わる"""
+    make_user("alice")
+    client = api_client("alice")
+    tweet_id = client.post("/api/tweets/", json={"tweet_content": "リプライ募集"}).json()["tweet_id"]
+    client.post(f"/api/tweets/{tweet_id}/replies", json={"reply_content": "返信"})
+    etag = client.get(f"/api/tweets/{tweet_id}/replies").headers["etag"]
+
+    client.post(f"/api/tweets/{tweet_id}/like")
+    assert client.get(f"/api/tweets/{tweet_id}/replies", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post(f"/api/tweets/{tweet_id}/replies", json={"reply_content": "もう1件"})
+    assert client.get(f"/api/tweets/{tweet_id}/replies", headers={"If-None-Match": etag}).status_code == 200
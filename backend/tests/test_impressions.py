@@ -0,0 +1,21 @@
+# tests/test_impressions.py
+from src.tweets.hyperloglog import HyperLogLog
+
+def test_hyperloglog_estimates_and_merges():
+    """重複を数えずに異なり数を推定し、別のワーカーのスケッチと合算できる"""
+    first, second = HyperLogLog(), HyperLogLog()
+    for i in range(20000):
+        first.add(f"user{i}")
+        first.add(f"user{i}")  # 同じ閲覧者の再表示
+    for i in range(10000, 30000):
+        second.add(f"user{i}")
+
+    assert abs(first.estimate() - 20000) / 20000 < 0.1
+    restored = HyperLogLog(registers=first.to_bytes())
+    restored.merge(second)
+    assert abs(restored.estimate() - 30000) / 30000 < 0.1
+
+    small = HyperLogLog()
+    for user_id in ("alice", "bob", "alice"):
+        small.add(user_id)
+    assert small.estimate() == 2
@@ -9,3 +9,14 @@ def test_read_root():
     response = client.get("/")
     assert response.status_code == 200
     assert response.json() == {"message": "Welcome to Twitter Clone API"}
+
+def test_internal_endpoints_require_token(monkeypatch):
+    """トークン未設定の場合は内部エンドポイントを公開しない"""
+    from src.config.settings import settings
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", None)
+    assert client.get("/internal/pool").status_code == 404
+
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "secret")
+    assert client.get("/internal/pool").status_code == 403
+    assert client.get("/internal/pool", headers={"X-Internal-Token": "wrong"}).status_code == 403
+    assert client.get("/internal/pool", headers={"X-Internal-Token": "secret"}).status_code == 200
@@ -0,0 +1,32 @@
+# tests/test_metrics.py
+from src.metrics.registry import Registry, merge_snapshots, render_text
+
+def build_registry() -> Registry:
+    registry = Registry()
+    registry.counter("requests_total", "リクエスト数", ["route"])
+    registry.histogram("latency_seconds", "処理時間", ["route"], buckets=(0.1, 1.0))
+    return registry
+
+def test_render_prometheus_text():
+    registry = build_registry()
+    registry._metrics["requests_total"].inc(route="/api/tweets/{tweet_id}")
+    registry._metrics["latency_seconds"].observe(0.5, route="/api")
+
+    text = registry.render()
+    assert '# TYPE requests_total counter' in text
+    assert 'requests_total{route="/api/tweets/{tweet_id}"} 1' in text
+    assert 'latency_seconds_bucket{route="/api",le="0.1"} 0' in text
+    assert 'latency_seconds_bucket{route="/api",le="1.0"} 1' in text
+    assert 'latency_seconds_bucket{route="/api",le="+Inf"} 1' in text
+    assert 'latency_seconds_count{route="/api"} 1' in text
+
+def test_merge_worker_snapshots():
+    workers = [build_registry(), build_registry()]
+    for i, registry in enumerate(workers):
+        registry._metrics["requests_total"].inc(i + 1, route="/api")
+        registry._metrics["latency_seconds"].observe(2.0, route="/api")
+
+    text = render_text(merge_snapshots(registry.snapshot() for registry in workers))
+    assert 'requests_total{route="/api"} 3' in text
+    assert 'latency_seconds_bucket{route="/api",le="+Inf"} 2' in text
+    assert 'latency_seconds_sum{route="/api"} 4' in text
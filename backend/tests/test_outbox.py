@@ -0,0 +1,62 @@
+# tests/test_outbox.py
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.config.settings import settings
+import src.crud.outbox as outbox
+from src.models.outbox import OutboxEvent, OutboxLease, OutboxWorkerHeartbeat
+from src.crud.outbox import enqueue_event, process_outbox_batch, retry_dead_events, acquire_partitions, release_partitions
+from src.outbox.handlers import HANDLERS
+
+def test_events_are_ordered_retried_and_dead_lettered(monkeypatch):
+    """失敗したイベントの後続（同じ aggregate_id）は待機し、上限回数の失敗で dead になる"""
+    engine = create_engine("sqlite://")
+    OutboxEvent.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+
+    handled = []
+    def handle(db, aggregate_id, payload):
+        if payload.get("fail"):
+            raise RuntimeError("failed")
+        handled.append((aggregate_id, payload["n"]))
+    monkeypatch.setitem(HANDLERS, "test_event", handle)
+    monkeypatch.setattr(settings, "OUTBOX_PARTITIONS", 1)
+    monkeypatch.setattr(settings, "OUTBOX_RETRY_BASE_SECONDS", 0)
+
+    enqueue_event(db, "test_event", 1, {"n": 1, "fail": True})
+    enqueue_event(db, "test_event", 1, {"n": 2})
+    enqueue_event(db, "test_event", 2, {"n": 3})
+    db.commit()
+
+    results = process_outbox_batch(db, partition_no=0, batch_size=10, max_attempts=2)
+    assert [result for _, result, _ in results] == ["retry", "success"]
+    assert handled == [(2, 3)]  # aggregate 1 の2件目は1件目の再試行を待つ
+
+    results = process_outbox_batch(db, partition_no=0, batch_size=10, max_attempts=2)
+    assert [result for _, result, _ in results] == ["dead", "success"]
+    assert handled == [(2, 3), (1, 2)]
+    assert db.query(OutboxEvent.status, OutboxEvent.attempts).all() == [("dead", 2)]
+
+    assert retry_dead_events(db) == 1
+    assert db.query(OutboxEvent.status).scalar() == "pending"
+
+def test_partitions_are_shared_between_live_processes(monkeypatch):
+    """後から起動したプロセスにも、先のプロセスが延長しなかったパーティションが期限切れ後に割り当てられる"""
+    engine = create_engine("sqlite://")
+    OutboxLease.__table__.create(engine)
+    OutboxWorkerHeartbeat.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    clock = [1_000_000]
+    monkeypatch.setattr(outbox, "now_ms", lambda: clock[0])
+
+    assert acquire_partitions(db, "a", partitions=4, lease_ms=3000) == [0, 1, 2, 3]
+    clock[0] += 1000
+    assert acquire_partitions(db, "b", partitions=4, lease_ms=3000) == []  # 全て a が保持中
+    assert acquire_partitions(db, "a", partitions=4, lease_ms=3000) == [0, 1]  # 2件だけ延長
+    clock[0] += 2500  # a が延長しなかった 2, 3 の期限が切れる
+    assert acquire_partitions(db, "b", partitions=4, lease_ms=3000) == [2, 3]
+    assert acquire_partitions(db, "a", partitions=4, lease_ms=3000) == [0, 1]
+
+    # 停止したプロセスの分は残りのプロセスが引き継ぐ
+    release_partitions(db, "b")
+    assert acquire_partitions(db, "a", partitions=4, lease_ms=3000) == [0, 1, 2, 3]
@@ -0,0 +1,36 @@
+# tests/test_query_budget.py
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+import src.models  # noqa: F401  全モデルをメタデータに登録
+from src.database.session import Base
+from src.database.instrumentation import instrument_engine
+from src.auth.schemas import UserCreate
+from src.tweets.schemas import TweetCreate
+from src.cache.tweets import tweet_cache
+from src.crud.users import create_user
+from src.crud.tweets import create_tweet, add_like, get_tweets
+
+def test_get_tweets_query_count_does_not_scale_with_page_size(tmp_path, monkeypatch, query_budget):
+    """ツイート一覧のSQL実行回数がページサイズに依存しないこと"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'budget.db'}")
+    instrument_engine(engine)
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(tweet_cache, "enabled", False)
+
+    with Session(engine) as db:
+        user = UserCreate(e_mail="budget@example.com", password="password123", user_id="budget_user", user_name="Budget")
+        create_user(db, user=user, hashed_password="hashed")
+        for i in range(50):
+            tweet = create_tweet(db, TweetCreate(tweet_content=f"ツイート{i}"), user_id="budget_user")
+            add_like(db, tweet_id=tweet.tweet_id, user_id="budget_user")
+
+        counts = []
+        for page_size in (5, 50):
+            with query_budget(6) as stats:
+                tweets, _ = get_tweets(db, limit=page_size, current_user_id="budget_user")
+            assert len(tweets) == page_size
+            counts.append(stats.count)
+
+    engine.dispose()
+    assert counts[0] == counts[1]
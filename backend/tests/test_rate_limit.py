@@ -0,0 +1,53 @@
+# tests/test_rate_limit.py
+import asyncio
+
+from src.ratelimit.backends import LocalTokenBuckets
+from src.ratelimit.limiter import RateLimiter
+
+def test_token_bucket_limits_and_evicts():
+    backend = LocalTokenBuckets(max_keys=2)
+
+    async def take_all():
+        first = [await backend.take("tweet:user:alice", 3, 60) for _ in range(4)]
+        await backend.take("tweet:user:bob", 3, 60)
+        await backend.take("tweet:user:carol", 3, 60)  # 最も古い alice のバケットを破棄
+        return first, await backend.take("tweet:user:alice", 3, 60)
+
+    first, after_eviction = asyncio.run(take_all())
+    assert first[:3] == [0.0, 0.0, 0.0]
+    assert 19 < first[3] <= 20  # 1トークンの回復は 60 / 3 秒
+    assert after_eviction == 0.0
+    assert backend.stats()["evictions"] == 2  # 破棄された alice を入れ直す際に bob も破棄される
+
+def test_concurrent_writes_are_shed():
+    limiter = RateLimiter(LocalTokenBuckets(10), budgets={}, routes={}, max_concurrent_writes=2)
+    assert limiter.acquire_write() and limiter.acquire_write()
+    assert not limiter.acquire_write()
+    limiter.release_write()
+    assert limiter.acquire_write()
+    assert limiter.stats()["shed"] == 1
+
+def test_client_key_uses_address_added_by_proxy():
+    """X-Forwarded-For はクライアントが先頭を偽装できるため、末尾（プロキシが追加した接続元）を使う"""
+    from src.api.middleware import RateLimitMiddleware
+
+    scope = {
+        "type": "http", "method": "POST", "path": "/api/auth/login", "query_string": b"",
+        "headers": [(b"x-forwarded-for", b"203.0.113.9, 198.51.100.7")],
+        "client": ("172.18.0.5", 40000),
+    }
+    assert RateLimitMiddleware(None, limiter=None, trust_forwarded_for=True).client_key(scope) == "ip:198.51.100.7"
+    assert RateLimitMiddleware(None, limiter=None).client_key(scope) == "ip:172.18.0.5"
+
+def test_backends_implement_the_interface():
+    """保存先の基底クラスは抽象クラスで、全ての保存先が抽象メソッドを実装している"""
+    import pytest
+    from src.ratelimit.backends import RateLimitBackend, RedisTokenBuckets
+    from src.cache.backends import CacheBackend, KeyValueStoreCache
+    from src.stream.backends import StreamBackend, LocalStreamBackend, RedisStreamBackend
+
+    for base in (RateLimitBackend, CacheBackend, StreamBackend):
+        with pytest.raises(TypeError):
+            base()
+    for backend in (LocalTokenBuckets, RedisTokenBuckets, KeyValueStoreCache, LocalStreamBackend, RedisStreamBackend):
+        assert not backend.__abstractmethods__
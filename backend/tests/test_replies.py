@@ -0,0 +1,66 @@
+# tests/test_replies.py
+from src.tweets.schemas import TweetCreate
+from src.replies.schemas import ReplyCreate
+from src.crud.tweets import create_tweet
+from src.crud.replies import create_reply, get_reply_thread
+
+def _ids(nodes):
+    return [(node["reply_id"], _ids(node["replies"])) for node in nodes]
+
+def test_reply_thread_limits_children_depth_and_pages(db, make_user):
+    """子リプライは親ごとに child_limit 件・depth 階層までに絞り、最上位はカーソルで辿れる"""
+    make_user("alice")
+    tweet_id = create_tweet(db, TweetCreate(tweet_content="スレッド"), user_id="alice").tweet_id
+    def reply(parent_reply_id=None):
+        return create_reply(db, ReplyCreate(reply_content="返信", parent_reply_id=parent_reply_id), tweet_id=tweet_id, user_id="alice").reply_id
+
+    first, second = reply(), reply()
+    children = [reply(first) for _ in range(3)]
+    grandchild = reply(children[0])
+    great_grandchild = reply(grandchild)  # ツイートから depth=3 では含めない
+
+    thread, position = get_reply_thread(db, tweet_id, depth=3, limit=5, child_limit=2)
+    assert _ids(thread) == [(second, []), (first, [(children[2], []), (children[1], [])])]
+    assert position is None
+
+    thread, _ = get_reply_thread(db, tweet_id, root_reply_id=first, depth=3, child_limit=5)
+    assert _ids(thread) == [(children[2], []), (children[1], []), (children[0], [(grandchild, [(great_grandchild, [])])])]
+
+    # max_nodes が limit より小さい場合も次ページのカーソルを返す
+    page, position = get_reply_thread(db, tweet_id, depth=1, limit=5, max_nodes=1)
+    rest, end = get_reply_thread(db, tweet_id, depth=1, limit=5, max_nodes=1, cursor=position)
+    assert [node["reply_id"] for node in page + rest] == [second, first]
+    assert position is not None
+
+def test_reply_thread_reads_a_bounded_number_of_rows_from_a_wide_tree(db, db_engine, make_user, monkeypatch):
+    """親ごとに child_limit 件だけをSQLで読み、クエリ数は階層数に比例する"""
+    from sqlalchemy.orm import Session
+    from src.database.instrumentation import instrument_engine, track_queries
+
+    make_user("alice")
+    tweet_id = create_tweet(db, TweetCreate(tweet_content="大きなスレッド"), user_id="alice").tweet_id
+    def reply(parent_reply_id=None):
+        return create_reply(db, ReplyCreate(reply_content="返信", parent_reply_id=parent_reply_id), tweet_id=tweet_id, user_id="alice").reply_id
+
+    top = [reply() for _ in range(2)]
+    children = [reply(parent) for parent in top for _ in range(15)]
+    for child in children:
+        for _ in range(3):
+            reply(child)
+
+    # 各SQLで読み込んだ行数を記録する
+    fetched = []
+    execute = Session.execute
+    def counting_execute(self, *args, **kwargs):
+        frozen = execute(self, *args, **kwargs).freeze()
+        fetched.append(len(frozen.data))
+        return frozen()
+    monkeypatch.setattr(Session, "execute", counting_execute)
+    instrument_engine(db_engine)
+
+    with track_queries() as stats:
+        thread, _ = get_reply_thread(db, tweet_id, depth=3, limit=5, child_limit=2, max_nodes=100)
+    assert stats.count == 4  # 最上位 + 2階層 + 本文
+    assert fetched[:3] == [2, 4, 8]  # 全108件のうち親ごとに child_limit 件まで
+    assert [len(node["replies"]) for node in thread] == [2, 2]
+    assert all(len(child["replies"]) == 2 for node in thread for child in node["replies"])
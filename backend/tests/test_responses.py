@@ -0,0 +1,66 @@
+# tests/test_responses.py
+import pytest
+
+from src.config.settings import settings
+from src.trending.tracker import trending_tracker
+
+# FAST_JSON_RESPONSES で orjson を使うルート（パスの {tweet_id} / {reply_id} は作成したIDで置き換える）
+FAST_JSON_ROUTES = [
+    "/api/tweets/?page_size=5",
+    "/api/tweets/?page_size=2&include_total=false&cursor={cursor}",
+    "/api/tweets/home",
+    "/api/tweets/search?q=天気",
+    "/api/tweets/trending?window=1h",
+    "/api/tweets/batch?ids={tweet_id},999999",
+    "/api/tweets/{tweet_id}",
+    "/api/tweets/{tweet_id}/replies",
+    "/api/tweets/{tweet_id}/thread",
+    "/api/replies/{reply_id}",
+    "/api/users/alice/tweets?page_size=2",
+]
+
+@pytest.fixture
+def seeded(api_client, make_user, monkeypatch):
+    """ツイート・いいね・入れ子のリプライを作成し、ログイン済みのクライアントとIDを返す"""
+    make_user("alice")
+    make_user("bob")
+    alice, bob = api_client("alice"), api_client("bob")
+    bob.post("/api/users/alice/follow")
+    tweet_ids = [alice.post("/api/tweets/", json={"tweet_content": f"今日は天気がいい {i}"}).json()["tweet_id"] for i in range(3)]
+    bob.post(f"/api/tweets/{tweet_ids[0]}/like")
+    reply_id = bob.post(f"/api/tweets/{tweet_ids[0]}/replies", json={"reply_content": "返信"}).json()["reply_id"]
+    alice.post(f"/api/tweets/{tweet_ids[0]}/replies", json={"reply_content": "返信への返信", "parent_reply_id": reply_id})
+    cursor = bob.get("/api/tweets/?page_size=2").json()["next_cursor"]
+
+    # トレンドのスコアは時刻とともに減衰するため、比較する2回のリクエストで同じ値を返す
+    ranked = trending_tracker.top("1h", 20)
+    monkeypatch.setattr(trending_tracker, "top", lambda window, limit: ranked)
+    return bob, {"tweet_id": tweet_ids[0], "reply_id": reply_id, "cursor": cursor}
+
+@pytest.mark.parametrize("route", FAST_JSON_ROUTES)
+def test_fast_json_matches_response_model(route, seeded, monkeypatch):
+    """orjson で返した本文が response_model で検証・辞書化した本文と一致する（既定値の項目も欠けない）"""
+    client, ids = seeded
+    path = route.format(**ids)
+
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", False)
+    expected = client.get(path)
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    actual = client.get(path)
+
+    assert expected.status_code == actual.status_code == 200
+    assert actual.json() == expected.json()
+
+def test_encode_json_fills_defaults_and_drops_extra_keys():
+    """crud の辞書に既定値の項目がなく、モデルにないキーがあってもモデルどおりに出力する"""
+    import json
+    from src.api.responses import encode_json, get_type_adapter
+    from src.tweets.schemas import TweetFeed
+
+    tweet = {"tweet_id": 1, "user_id": "alice", "user_name": "ALICE", "tweet_content": "こんにちは",
+             "created_at": "2024-01-01T00:00:00", "updated_at": "2024-01-01T00:00:00", "internal": "x"}
+    content = {"tweets": [tweet], "page_size": 20}
+    adapter = get_type_adapter(TweetFeed)
+    expected = json.loads(adapter.dump_json(adapter.validate_python(content)))
+
+    assert json.loads(encode_json(TweetFeed, content)) == expected
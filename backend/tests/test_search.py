@@ -0,0 +1,52 @@
+# tests/test_search.py
+from src.tweets.schemas import TweetCreate
+from src.crud.tweets import create_tweet, delete_tweet
+from src.crud.search import tokenize, parse_query, matches_terms, search_candidates, index_tweet
+from src.models.search import TweetSearchToken
+
+def test_tokenize_normalizes_and_splits_into_bigrams():
+    assert tokenize("東京タワー") == {"東京", "京タ", "タワ", "ワー", "ー"}
+    assert tokenize("ＦａｓｔＡＰＩ") == tokenize("fastapi")
+    assert tokenize("a b") == {"a", "b"}
+
+def test_query_terms_are_and_conditions():
+    terms = parse_query("東京  京都 東京")
+    assert terms == ["東京", "京都"]
+    assert matches_terms("東京と京都", terms)
+    assert not matches_terms("東の京都", terms)
+
+def test_search_candidates_require_every_token(db, make_user):
+    """全ての語のトークンを持つツイートだけが候補になり、1文字の語は前方一致で探す"""
+    make_user("alice")
+    contents = ["東京タワーに行った", "京都タワー", "東京と京都", "東の京都"]
+    tweet_ids = [create_tweet(db, TweetCreate(tweet_content=content), user_id="alice").tweet_id for content in contents]
+
+    def found(query):
+        return {tweet_id for tweet_id, _ in search_candidates(db, parse_query(query), limit=10)}
+
+    assert found("タワー") == {tweet_ids[0], tweet_ids[1]}
+    assert found("東京 京都") == {tweet_ids[2]}
+    assert found("東 都") == {tweet_ids[2], tweet_ids[3]}
+    assert found("大阪") == set()
+
+def test_search_endpoint_pages_through_matches(api_client, db, make_user):
+    """本文に検索語が連続して含まれるツイートだけを新しい順に返し、削除したツイートは除く"""
+    make_user("alice")
+    contents = ["今日は晴れ", "晴れた日の今日", "今日も晴れ", "晴れ今日", "今日は雨"]
+    tweet_ids = [create_tweet(db, TweetCreate(tweet_content=content), user_id="alice").tweet_id for content in contents]
+    delete_tweet(db, tweet_ids[3], user_id="alice")
+    client = api_client("alice")
+
+    first = client.get("/api/tweets/search", params={"q": "今日 晴れ", "page_size": 2}).json()
+    rest = client.get("/api/tweets/search", params={"q": "今日 晴れ", "page_size": 2, "cursor": first["next_cursor"]}).json()
+    assert [tweet["tweet_id"] for tweet in first["tweets"] + rest["tweets"]] == [tweet_ids[2], tweet_ids[1], tweet_ids[0]]
+    assert rest["next_cursor"] is None
+    assert client.get("/api/tweets/search", params={"q": "今日は雨"}).json()["tweets"][0]["tweet_id"] == tweet_ids[4]
+
+def test_indexing_the_same_tweet_twice_is_ignored(db, make_user):
+    """インデックスの再構築とアウトボックスの登録が重なっても、同じトークンは1行だけ残る"""
+    make_user("alice")
+    tweet = create_tweet(db, TweetCreate(tweet_content="東京タワー"), user_id="alice")
+    index_tweet(db, tweet.tweet_id, tweet.tweet_content, tweet.created_at)
+    db.commit()
+    assert db.query(TweetSearchToken).filter(TweetSearchToken.tweet_id == tweet.tweet_id).count() == len(tokenize("東京タワー"))
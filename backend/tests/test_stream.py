@@ -0,0 +1,38 @@
+# tests/test_stream.py
+import asyncio
+
+from src.stream.backends import LocalStreamBackend
+from src.stream.broadcaster import TweetBroadcaster
+
+async def collect_events():
+    """購読者への配信と、キューが溢れた購読者の切断を確認する"""
+    broadcaster = TweetBroadcaster(
+        LocalStreamBackend(), queue_size=2, max_connections=10, heartbeat_interval=0.05, max_duration=1
+    )
+    await broadcaster.start()
+    fast = broadcaster.subscribe()
+    slow = broadcaster.subscribe()
+    stream = broadcaster.events(fast)
+
+    assert (await stream.__anext__()).startswith("retry:")
+    broadcaster.publish("tweet_created", {"tweet_id": 1})
+    received = await stream.__anext__()
+    assert await stream.__anext__() == ": heartbeat\n\n"
+
+    for tweet_id in range(2, 4):
+        broadcaster.publish("tweet_deleted", {"tweet_id": tweet_id})
+    await asyncio.sleep(0)
+    slow_events = [event async for event in broadcaster.events(slow)]
+
+    stats = broadcaster.stats()
+    await broadcaster.stop()
+    await stream.aclose()
+    return received, slow_events, stats
+
+def test_broadcaster_delivers_and_drops_slow_consumers():
+    received, slow_events, stats = asyncio.run(collect_events())
+
+    assert received == 'event: tweet_created\ndata: {"tweet_id":1}\n\n'
+    assert slow_events[-1].startswith("event: dropped")
+    assert stats["dropped_connections"] == 1
+    assert stats["connections"] == 1
@@ -0,0 +1,52 @@
+# tests/test_timelines.py
+from src.config.settings import settings
+from src.tweets.schemas import TweetCreate
+from src.models.follow import Follow
+from src.crud.tweets import create_tweet
+from src.crud.follows import follow_user, unfollow_user
+from src.crud.timelines import get_home_timeline_entries
+from src.crud.users import get_user_profile
+
+def test_home_timeline_merges_fanout_on_read_authors_and_backfills_below_threshold(db, make_user, monkeypatch):
+    """閾値以上の間のツイートは読み込み時に合成し、閾値を下回ったらフォロワーのタイムラインに取り込む"""
+    monkeypatch.setattr(settings, "FANOUT_FOLLOWER_THRESHOLD", 2)
+    for user_id in ("star", "bob", "carol", "dave"):
+        make_user(user_id)
+    follow_user(db, follower_user_id="bob", followed_user_id="dave")
+    follow_user(db, follower_user_id="bob", followed_user_id="star")
+    follow_user(db, follower_user_id="carol", followed_user_id="star")
+    star_tweets = [create_tweet(db, TweetCreate(tweet_content=f"star {i}"), user_id="star").tweet_id for i in range(3)]
+    dave_tweet = create_tweet(db, TweetCreate(tweet_content="dave"), user_id="dave").tweet_id
+
+    expected = [dave_tweet] + star_tweets[::-1]
+    first = get_home_timeline_entries(db, "bob", limit=2)
+    rest = get_home_timeline_entries(db, "bob", limit=2, cursor=(first[-1][1], first[-1][0]))
+    assert [tweet_id for tweet_id, _ in first + rest] == expected
+
+    # carol のアンフォローで star が閾値を下回り、配信していなかったツイートが bob のタイムラインに入る
+    assert unfollow_user(db, follower_user_id="carol", followed_user_id="star")
+    assert [tweet_id for tweet_id, _ in get_home_timeline_entries(db, "bob", limit=10)] == expected
+
+def test_repeated_follow_is_ignored(db, make_user):
+    """既にフォローしている相手へのフォローは重複して追加せず、カウンターも変えない"""
+    make_user("alice")
+    make_user("bob")
+    assert follow_user(db, follower_user_id="bob", followed_user_id="alice")
+    assert follow_user(db, follower_user_id="bob", followed_user_id="alice")
+    assert db.query(Follow).count() == 1
+    assert get_user_profile(db, "alice")["follower_count"] == 1
+    assert get_user_profile(db, "bob")["following_count"] == 1
+
+def test_backfill_ignores_entries_already_fanned_out(db, make_user):
+    """アウトボックスの配信で既に入ったエントリと重なっても、フォロー時の取り込みは失敗しない"""
+    from src.crud.timelines import backfill_home_timeline, fan_out_tweet
+
+    make_user("alice")
+    make_user("bob")
+    tweet_ids = [create_tweet(db, TweetCreate(tweet_content=f"alice {i}"), user_id="alice").tweet_id for i in range(2)]
+    db.add(Follow(follower_user_id="bob", followed_user_id="alice"))
+    fan_out_tweet(db, tweet_ids[1], "alice", to_author=False)
+    backfill_home_timeline(db, "bob", "alice")
+    backfill_home_timeline(db, "bob", "alice")
+    db.commit()
+    assert [tweet_id for tweet_id, _ in get_home_timeline_entries(db, "bob", limit=10)] == tweet_ids[::-1]
@@ -0,0 +1,37 @@
+# tests/test_trending.py
+import numpy as np
+import pytest
+
+from src.trending.tracker import TrendingWindow, compute_scores
+
+def test_incremental_scores_match_batch_recompute():
+    """逐次加算したスコアと一括計算したスコアが一致し、新しいエンゲージメントほど重く数えられる"""
+    now = 1_000_000.0
+    events = [(1, 3000, 1.0), (1, 2900, 1.0), (2, 10, 1.0), (3, 600, 2.0), (4, 4000, 5.0)]
+
+    window = TrendingWindow("1h", length=3600, capacity=10)
+    window.base_time = now - 3600
+    for tweet_id, age, weight in events:
+        window.add(tweet_id, weight, now - age)
+    incremental = dict(window.top(10, now))
+
+    tweet_ids, scores, _ = compute_scores(
+        np.array([e[0] for e in events]), np.array([float(e[1]) for e in events]),
+        np.array([e[2] for e in events]), length=3600, capacity=10,
+    )
+    batch = dict(zip(tweet_ids.tolist(), scores.tolist()))
+
+    assert 4 not in batch  # 集計期間外
+    assert [tweet_id for tweet_id, _ in window.top(3, now)] == [3, 2, 1]
+    for tweet_id, score in batch.items():
+        assert incremental[tweet_id] == pytest.approx(score)
+
+def test_window_keeps_bounded_top_entries():
+    window = TrendingWindow("1h", length=3600, capacity=4)
+    window.base_time = 0.0
+    for tweet_id in range(1, 21):
+        window.add(tweet_id, float(tweet_id), 100.0)
+    window.add(5, -100.0, 100.0)  # 取り消しで 0 未満にはならない
+
+    assert len(window.entries) <= 4 * 1.25
+    assert [tweet_id for tweet_id, _ in window.top(3, 100.0)] == [20, 19, 18]
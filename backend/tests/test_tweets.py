@@ -0,0 +1,142 @@
+# tests/test_tweets.py
+from datetime import datetime
+
+from sqlalchemy import delete, update
+
+from src.database.instrumentation import instrument_engine, track_queries
+from src.models.tweet import Tweet, TweetStats
+from src.tweets.schemas import TweetCreate
+from src.crud.tweets import (
+    create_tweet, get_tweet, get_tweets, get_viewer_states,
+    add_like, remove_like, add_retweet, add_bookmark, remove_bookmark
+)
+from src.crud.tweet_stats import reconcile_tweet_stats
+
+def _post(db, user_id: str, count: int) -> list:
+    return [create_tweet(db, TweetCreate(tweet_content=f"ツイート{i}"), user_id=user_id).tweet_id for i in range(count)]
+
+def test_viewer_states_are_resolved_per_page_in_one_query(db, db_engine, make_user):
+    """閲覧者のいいね・リツイート・ブックマーク状態はページの件数に関わらず同じクエリ数で取得する"""
+    instrument_engine(db_engine)
+    make_user("alice")
+    make_user("bob")
+    tweet_ids = _post(db, "alice", 6)
+    add_like(db, tweet_id=tweet_ids[0], user_id="bob")
+    add_retweet(db, tweet_id=tweet_ids[1], user_id="bob")
+    add_bookmark(db, tweet_id=tweet_ids[1], user_id="bob")
+
+    states = get_viewer_states(db, tweet_ids[:3], "bob")
+    assert states[tweet_ids[0]] == {"is_liked": True, "is_retweeted": False, "is_bookmarked": False}
+    assert states[tweet_ids[1]] == {"is_liked": False, "is_retweeted": True, "is_bookmarked": True}
+    assert not any(states[tweet_ids[2]].values())
+    assert not any(state for tweet in get_viewer_states(db, tweet_ids, None).values() for state in tweet.values())
+
+    counts = []
+    for limit in (2, 6):
+        with track_queries() as stats:
+            tweets, _ = get_tweets(db, limit=limit, current_user_id="bob", include_total=False)
+        counts.append(stats.count)
+    assert counts[0] == counts[1]
+    assert {tweet["tweet_id"]: tweet["is_liked"] for tweet in tweets}[tweet_ids[0]]
+
+def test_engagement_counters_are_maintained_and_reconciled(db, make_user):
+    """重複した追加や存在しない削除ではカウンターが変わらず、ずれたカウンターは再計算で直る"""
+    for user_id in ("alice", "bob", "carol"):
+        make_user(user_id)
+    tweet_id, other_id = _post(db, "alice", 2)
+    add_like(db, tweet_id=tweet_id, user_id="bob")
+    add_like(db, tweet_id=tweet_id, user_id="bob")
+    add_like(db, tweet_id=tweet_id, user_id="carol")
+    add_retweet(db, tweet_id=tweet_id, user_id="carol")
+    add_bookmark(db, tweet_id=tweet_id, user_id="bob")
+    remove_bookmark(db, tweet_id=tweet_id, user_id="bob")
+    assert not remove_like(db, tweet_id=tweet_id, user_id="alice")
+
+    tweet = get_tweet(db, tweet_id)
+    assert (tweet["like_count"], tweet["retweet_count"], tweet["bookmark_count"]) == (2, 1, 0)
+    assert reconcile_tweet_stats(db) == 0
+
+    db.execute(update(TweetStats).where(TweetStats.tweet_id == tweet_id).values(like_count=7))
+    db.commit()
+    assert reconcile_tweet_stats(db, tweet_ids=[tweet_id, other_id]) == 1
+    assert get_tweet(db, tweet_id)["like_count"] == 2
+
+def test_cursor_pages_do_not_skip_or_repeat_tweets_with_equal_created_at(db, make_user):
+    """created_at が同じツイートは tweet_id の降順で並べ、カーソルで辿っても欠けや重複がない"""
+    make_user("alice")
+    tweet_ids = _post(db, "alice", 5)
+    db.execute(update(Tweet).where(Tweet.tweet_id.in_(tweet_ids[1:4])).values(created_at=datetime(2024, 1, 1, 12, 0, 0)))
+    db.execute(update(Tweet).where(Tweet.tweet_id == tweet_ids[0]).values(created_at=datetime(2024, 1, 1, 11, 0, 0)))
+    db.execute(update(Tweet).where(Tweet.tweet_id == tweet_ids[4]).values(created_at=datetime(2024, 1, 1, 13, 0, 0)))
+    db.commit()
+
+    first, total = get_tweets(db, limit=2)
+    assert total == 5
+    seen = [tweet["tweet_id"] for tweet in first]
+    while True:
+        last = seen[-1]
+        created_at = db.query(Tweet.created_at).filter(Tweet.tweet_id == last).scalar()
+        page, total = get_tweets(db, limit=2, cursor=(created_at, last), include_total=False)
+        assert total is None
+        if not page:
+            break
+        seen += [tweet["tweet_id"] for tweet in page]
+    assert seen == [tweet_ids[4], tweet_ids[3], tweet_ids[2], tweet_ids[1], tweet_ids[0]]
+
+def test_bulk_interactions_are_idempotent(api_client, db, make_user):
+    """同じ操作を繰り返しても行とカウンターは1回分だけ変わり、結果は applied / unchanged / not_found で返る"""
+    make_user("alice")
+    make_user("bob")
+    tweet_id, = _post(db, "alice", 1)
+    client = api_client("bob")
+    operations = [
+        {"tweet_id": tweet_id, "type": "like", "action": "add"},
+        {"tweet_id": tweet_id, "type": "like", "action": "add"},
+        {"tweet_id": tweet_id, "type": "bookmark", "action": "remove"},
+        {"tweet_id": 999999, "type": "retweet", "action": "add"},
+    ]
+
+    response = client.post("/api/tweets/interactions", json={"operations": operations})
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()["results"]] == ["applied", "unchanged", "not_found", "not_found"]
+
+    response = client.post("/api/tweets/interactions", json={"operations": operations[:1]})
+    assert response.json()["results"][0]["status"] == "unchanged"
+    assert client.post(f"/api/tweets/{tweet_id}/like").status_code == 200
+
+    db.expire_all()
+    tweet = get_tweet(db, tweet_id, current_user_id="bob")
+    assert (tweet["like_count"], tweet["is_liked"]) == (1, True)
+    assert reconcile_tweet_stats(db) == 0
+
+def test_batch_returns_tweets_in_requested_order_with_missing_ids(api_client, db, make_user):
+    """指定した順序（重複は除く）で返し、存在しないIDは missing_ids に入る"""
+    make_user("alice")
+    first, second = _post(db, "alice", 2)
+    client = api_client("alice")
+
+    response = client.get(f"/api/tweets/batch?ids={second},999999,{first}&ids={second}")
+    assert response.status_code == 200
+    body = response.json()
+    assert [tweet["tweet_id"] for tweet in body["tweets"]] == [second, first]
+    assert body["missing_ids"] == [999999]
+
+    assert client.get("/api/tweets/batch?ids=abc").status_code == 400
+    assert client.get("/api/tweets/batch").status_code == 400
+    assert client.get("/api/tweets/batch?ids=" + ",".join(str(i) for i in range(1, 102))).status_code == 400
+
+def test_tweet_counters_do_not_go_below_zero_and_missing_stats_rows_are_created(db, make_user):
+    """ずれて 0 になったカウンターの減算は 0 に留め、集計行のないツイートは最初の更新で行を作る"""
+    make_user("alice")
+    make_user("bob")
+    tweet_id, = _post(db, "alice", 1)
+    db.execute(delete(TweetStats).where(TweetStats.tweet_id == tweet_id))
+    db.commit()
+
+    add_like(db, tweet_id=tweet_id, user_id="bob")
+    assert db.query(TweetStats.like_count).filter(TweetStats.tweet_id == tweet_id).scalar() == 1
+
+    db.execute(update(TweetStats).where(TweetStats.tweet_id == tweet_id).values(like_count=0))
+    db.commit()
+    assert remove_like(db, tweet_id=tweet_id, user_id="bob")
+    assert db.query(TweetStats.like_count).filter(TweetStats.tweet_id == tweet_id).scalar() == 0
@@ -0,0 +1,76 @@
+# tests/test_user_profile.py
+from sqlalchemy import create_engine, delete, update
+from sqlalchemy.orm import Session
+
+import src.models  # noqa: F401  全モデルをメタデータに登録
+from src.database.session import Base
+from src.models.user import UserStats
+from src.auth.schemas import UserCreate
+from src.tweets.schemas import TweetCreate
+from src.crud.users import create_user, get_user_profile
+from src.crud.tweets import create_tweet, delete_tweet, add_like, remove_like, get_user_tweets
+from src.crud.follows import follow_user
+from src.crud.user_stats import reconcile_user_stats
+
+def test_profile_counts_are_maintained_on_writes(tmp_path):
+    """書き込み時に更新したカウンターが再計算の結果と一致し、ツイート一覧をカーソルで辿れる"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    Base.metadata.create_all(engine)
+
+    with Session(engine) as db:
+        for user_id in ("alice", "bob"):
+            create_user(db, UserCreate(e_mail=f"{user_id}@example.com", password="password123", user_id=user_id, user_name=user_id), hashed_password="hashed")
+        tweet_ids = [create_tweet(db, TweetCreate(tweet_content=f"ツイート{i}"), user_id="alice").tweet_id for i in range(5)]
+        delete_tweet(db, tweet_ids[0], user_id="alice")
+        follow_user(db, follower_user_id="bob", followed_user_id="alice")
+        for tweet_id in tweet_ids[1:4]:
+            add_like(db, tweet_id=tweet_id, user_id="bob")
+        remove_like(db, tweet_id=tweet_ids[1], user_id="bob")
+
+        alice = get_user_profile(db, "alice", current_user_id="bob")
+        bob = get_user_profile(db, "bob", current_user_id="bob")
+        assert (alice["tweet_count"], alice["follower_count"], alice["e_mail"]) == (4, 1, None)
+        assert (bob["following_count"], bob["like_count"], bob["e_mail"]) == (1, 2, "bob@example.com")
+        assert reconcile_user_stats(db) == 0
+
+        first, position = get_user_tweets(db, "alice", limit=3, current_user_id="bob")
+        rest, end = get_user_tweets(db, "alice", limit=3, current_user_id="bob", cursor=position)
+        assert [tweet["tweet_id"] for tweet in first + rest] == tweet_ids[:0:-1]
+        assert end is None
+        assert get_user_tweets(db, "nobody") is None
+
+    engine.dispose()
+
+def test_deleting_a_tweet_removes_its_likes_from_likers_counts(db, make_user):
+    """削除されたツイートへのいいねは、いいねしたユーザーのいいね数からも同じトランザクションで差し引く"""
+    for user_id in ("alice", "bob", "carol"):
+        make_user(user_id)
+    deleted = create_tweet(db, TweetCreate(tweet_content="消すツイート"), user_id="alice").tweet_id
+    kept = create_tweet(db, TweetCreate(tweet_content="残すツイート"), user_id="alice").tweet_id
+    add_like(db, tweet_id=deleted, user_id="bob")
+    add_like(db, tweet_id=kept, user_id="bob")
+    add_like(db, tweet_id=deleted, user_id="carol")
+
+    assert delete_tweet(db, deleted, user_id="alice")
+    assert get_user_profile(db, "bob")["like_count"] == 1
+    assert get_user_profile(db, "carol")["like_count"] == 0
+    assert reconcile_user_stats(db) == 0
+
+def test_user_counters_do_not_go_below_zero_and_missing_stats_rows_are_created(db, make_user):
+    """ずれて 0 になったいいね数の減算は 0 に留め、集計行のないユーザーは最初の更新で行を作る"""
+    make_user("alice")
+    make_user("bob")
+    liked = create_tweet(db, TweetCreate(tweet_content="いいね対象"), user_id="alice").tweet_id
+    deleted = create_tweet(db, TweetCreate(tweet_content="消すツイート"), user_id="alice").tweet_id
+    db.execute(delete(UserStats).where(UserStats.user_id == "bob"))
+    db.commit()
+
+    add_like(db, tweet_id=liked, user_id="bob")
+    add_like(db, tweet_id=deleted, user_id="bob")
+    assert get_user_profile(db, "bob")["like_count"] == 2
+
+    db.execute(update(UserStats).where(UserStats.user_id == "bob").values(like_count=0))
+    db.commit()
+    assert remove_like(db, tweet_id=liked, user_id="bob")
+    assert delete_tweet(db, deleted, user_id="alice")
+    assert get_user_profile(db, "bob")["like_count"] == 0
@@ -0,0 +1,35 @@
+# tests/test_write_buffer.py
+import asyncio
+
+from sqlalchemy.orm import Session
+
+import src.tweets.write_buffer as write_buffer
+from src.tweets.schemas import TweetCreate
+from src.tweets.write_buffer import InteractionWriteBuffer
+from src.crud.tweets import create_tweet, get_tweet
+
+def test_failed_change_is_retried_alone_and_dropped(db, db_engine, make_user, monkeypatch):
+    """書き込めない変更があっても他の変更は書き込み、その変更は max_attempts 回の失敗で破棄する"""
+    monkeypatch.setattr(write_buffer, "open_session", lambda: Session(db_engine))
+    make_user("alice")
+    make_user("bob")
+    tweet_id = create_tweet(db, TweetCreate(tweet_content="いいね対象"), user_id="alice").tweet_id
+    buffer = InteractionWriteBuffer(enabled=True, max_pending=100, flush_interval=1, max_attempts=2)
+
+    buffer.record("bob", tweet_id, "like", True)
+    buffer.record("bob", tweet_id, "unknown", True)  # 書き込めない変更
+    assert asyncio.run(buffer.flush()) == 1
+    assert list(buffer.pending) == [("bob", tweet_id, "unknown")]
+
+    # 失敗した変更だけが残っている間はDB側の障害と区別できないため破棄しない
+    asyncio.run(buffer.flush())
+    assert list(buffer.pending) == [("bob", tweet_id, "unknown")]
+
+    buffer.record("alice", tweet_id, "bookmark", True)
+    assert asyncio.run(buffer.flush()) == 1
+    assert buffer.pending == {}
+    assert buffer.stats()["dropped"] == 1
+
+    db.expire_all()
+    tweet = get_tweet(db, tweet_id)
+    assert (tweet["like_count"], tweet["bookmark_count"]) == (1, 1)
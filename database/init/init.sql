@@ -34,6 +34,8 @@ CREATE TABLE IF NOT EXISTS `Tweets` (
   `tweet_content` TEXT NOT NULL,
   `created_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
   `updated_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  KEY `idx_tweets_created_at` (`created_at`, `tweet_id`),
+  KEY `idx_tweets_user_created` (`user_id`, `created_at`, `tweet_id`),
   CONSTRAINT `fk_tweets_user` FOREIGN KEY (`user_id`) REFERENCES `Users` (`user_id`) ON DELETE CASCADE ON UPDATE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
@@ -44,8 +46,13 @@ CREATE TABLE IF NOT EXISTS `Replies` (
   `tweet_id` BIGINT UNSIGNED NOT NULL,
   `parent_reply_id` BIGINT UNSIGNED NULL,
   `reply_content` TEXT NOT NULL,
+  `path` VARCHAR(700) NOT NULL DEFAULT '',
+  `depth` INT NOT NULL DEFAULT 0,
+  `child_reply_count` INT NOT NULL DEFAULT 0,
   `created_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
   `updated_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  KEY `idx_replies_tweet_parent_created` (`tweet_id`, `parent_reply_id`, `created_at`, `reply_id`),
+  KEY `idx_replies_path` (`path`),
   CONSTRAINT `fk_replies_user` FOREIGN KEY (`user_id`) REFERENCES `Users` (`user_id`) ON DELETE CASCADE ON UPDATE CASCADE,
   CONSTRAINT `fk_replies_tweet` FOREIGN KEY (`tweet_id`) REFERENCES `Tweets` (`tweet_id`) ON DELETE CASCADE ON UPDATE CASCADE,
   CONSTRAINT `fk_replies_parent` FOREIGN KEY (`parent_reply_id`) REFERENCES `Replies` (`reply_id`) ON DELETE SET NULL ON UPDATE CASCADE
@@ -107,4 +114,91 @@ CREATE TABLE IF NOT EXISTS `Bookmarks` (
   CONSTRAINT `fk_bookmarks_tweet` FOREIGN KEY (`tweet_id`) REFERENCES `Tweets` (`tweet_id`) ON DELETE CASCADE ON UPDATE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
+-- TweetStatsテーブル（ツイートごとのいいね・リツイート・ブックマーク数）
+CREATE TABLE IF NOT EXISTS `TweetStats` (
+  `tweet_id` BIGINT UNSIGNED PRIMARY KEY,
+  `like_count` INT UNSIGNED NOT NULL DEFAULT 0,
+  `retweet_count` INT UNSIGNED NOT NULL DEFAULT 0,
+  `bookmark_count` INT UNSIGNED NOT NULL DEFAULT 0,
+  `version` BIGINT UNSIGNED NOT NULL DEFAULT 0,
+  `reply_version` BIGINT UNSIGNED NOT NULL DEFAULT 0,
+  `updated_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  CONSTRAINT `fk_tweet_stats_tweet` FOREIGN KEY (`tweet_id`) REFERENCES `Tweets` (`tweet_id`) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- TweetImpressionsテーブル（ツイートごとの表示回数とユニーク閲覧者数の推定値）
+CREATE TABLE IF NOT EXISTS `TweetImpressions` (
+  `tweet_id` BIGINT UNSIGNED PRIMARY KEY,
+  `view_count` BIGINT UNSIGNED NOT NULL DEFAULT 0,
+  `unique_viewers` BIGINT UNSIGNED NOT NULL DEFAULT 0,
+  `viewer_sketch` BLOB NULL,
+  `updated_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  CONSTRAINT `fk_tweet_impressions_tweet` FOREIGN KEY (`tweet_id`) REFERENCES `Tweets` (`tweet_id`) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- UserStatsテーブル（ユーザーごとのフォロー数・フォロワー数・ツイート数・いいね数）
+CREATE TABLE IF NOT EXISTS `UserStats` (
+  `user_id` VARCHAR(50) NOT NULL PRIMARY KEY,
+  `follower_count` INT UNSIGNED NOT NULL DEFAULT 0,
+  `following_count` INT UNSIGNED NOT NULL DEFAULT 0,
+  `tweet_count` INT UNSIGNED NOT NULL DEFAULT 0,
+  `like_count` INT UNSIGNED NOT NULL DEFAULT 0,
+  `interaction_version` BIGINT UNSIGNED NOT NULL DEFAULT 0,
+  `updated_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  KEY `ix_UserStats_follower_count` (`follower_count`),
+  CONSTRAINT `fk_user_stats_user` FOREIGN KEY (`user_id`) REFERENCES `Users` (`user_id`) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- HomeTimelinesテーブル（フォロワーごとに実体化したホームタイムライン）
+CREATE TABLE IF NOT EXISTS `HomeTimelines` (
+  `user_id` VARCHAR(50) NOT NULL,
+  `tweet_id` BIGINT UNSIGNED NOT NULL,
+  `author_user_id` VARCHAR(50) NOT NULL,
+  `created_at` TIMESTAMP NOT NULL,
+  PRIMARY KEY (`user_id`, `tweet_id`),
+  KEY `idx_home_timelines_user_created` (`user_id`, `created_at`, `tweet_id`),
+  KEY `idx_home_timelines_user_author` (`user_id`, `author_user_id`),
+  CONSTRAINT `fk_home_timelines_user` FOREIGN KEY (`user_id`) REFERENCES `Users` (`user_id`) ON DELETE CASCADE ON UPDATE CASCADE,
+  CONSTRAINT `fk_home_timelines_tweet` FOREIGN KEY (`tweet_id`) REFERENCES `Tweets` (`tweet_id`) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- TweetSearchTokensテーブル（ツイート本文の n-gram 転置インデックス）
+CREATE TABLE IF NOT EXISTS `TweetSearchTokens` (
+  `token` VARCHAR(2) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL,
+  `tweet_id` BIGINT UNSIGNED NOT NULL,
+  `created_at` TIMESTAMP NOT NULL,
+  PRIMARY KEY (`token`, `tweet_id`),
+  KEY `idx_tweet_search_tokens_token_created` (`token`, `created_at`, `tweet_id`),
+  KEY `idx_tweet_search_tokens_tweet` (`tweet_id`),
+  CONSTRAINT `fk_tweet_search_tokens_tweet` FOREIGN KEY (`tweet_id`) REFERENCES `Tweets` (`tweet_id`) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- OutboxEventsテーブル（書き込みと同じトランザクションで記録し、バックグラウンドで処理する副作用。処理済みの行は削除する）
+CREATE TABLE IF NOT EXISTS `OutboxEvents` (
+  `event_id` BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+  `event_type` VARCHAR(50) NOT NULL,
+  `aggregate_id` BIGINT UNSIGNED NOT NULL,
+  `partition_no` INT UNSIGNED NOT NULL,
+  `payload` TEXT NOT NULL,
+  `status` VARCHAR(10) NOT NULL DEFAULT 'pending',
+  `attempts` INT UNSIGNED NOT NULL DEFAULT 0,
+  `last_error` TEXT NULL,
+  `created_at_ms` BIGINT UNSIGNED NOT NULL,
+  `available_at_ms` BIGINT UNSIGNED NOT NULL,
+  KEY `idx_outbox_events_partition_status` (`partition_no`, `status`, `event_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- OutboxLeasesテーブル（アウトボックスのパーティションを処理するプロセスの排他）
+CREATE TABLE IF NOT EXISTS `OutboxLeases` (
+  `partition_no` INT UNSIGNED PRIMARY KEY,
+  `owner` VARCHAR(100) NOT NULL DEFAULT '',
+  `expires_at_ms` BIGINT UNSIGNED NOT NULL DEFAULT 0
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- OutboxWorkersテーブル（稼働中のプロセス。パーティションをプロセス数で均等に分けるために使用）
+CREATE TABLE IF NOT EXISTS `OutboxWorkers` (
+  `owner` VARCHAR(100) PRIMARY KEY,
+  `expires_at_ms` BIGINT UNSIGNED NOT NULL DEFAULT 0
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
 SET FOREIGN_KEY_CHECKS = 1;
@@ -56,7 +56,7 @@ export class HomeComponent implements OnInit {
     this.tweetService.getTweets(this.currentPage, this.pageSize).subscribe({
       next: (response: TweetList) => {
         this.tweets = response.tweets;
-        this.totalTweets = response.total;
+        this.totalTweets = response.total ?? this.totalTweets;
         this.isLoading = false;
       },
       error: (error) => {
@@ -19,7 +19,8 @@ export interface TweetCreate {
 
 export interface TweetList {
   tweets: Tweet[];
-  total: number;
+  total: number | null;
   page: number;
   page_size: number;
+  next_cursor?: string | null;
 }